@@ -0,0 +1,182 @@
+# asset_loader.py
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from objloader import OBJ
+from mesh_renderer import build_batches
+from texture_registry import textures
+
+class ModelJob:
+    """An OBJ model being loaded by an AssetLoader"""
+
+    def __init__(self, filename, swapyz=False, chunk_size=None):
+        self.filename = filename
+        self.swapyz = swapyz
+        self.chunk_size = chunk_size
+        self.future = None
+        self.prepared = None
+        self.model = None
+        self.error = None
+        self.gl_tasks = []
+        self.gl_done = 0
+        self.queued = False
+        self.done = False
+
+    def progress(self):
+        """0..1: half for the worker-side preparation, half for GL uploads"""
+        if self.done:
+            return 1.0
+        if not self.queued:
+            return 0.0
+        return 0.5 + 0.5 * self.gl_done / max(1, len(self.gl_tasks))
+
+class AssetLoader:
+    """Loads OBJ models on a worker pool and uploads them to GL in per-frame slices
+
+    Parsing, material parsing, image decoding, triangulation and mesh
+    simplification run on the pool; update() must be called from the GL
+    thread once per frame and runs queued texture/buffer uploads until its
+    time budget is used up.
+    """
+
+    def __init__(self, max_workers=4):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.jobs = []
+        self.gl_queue = deque()
+        self.decoded = {}  # image path -> [Event set when decoded, (pixels, size) or None]
+        self.timings = {}
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def add_time(self, stage, seconds):
+        with self.lock:
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def load_obj(self, filename, swapyz=False, chunk_size=None):
+        """Queue an OBJ model; the returned job has .model once .done is set"""
+        job = ModelJob(filename, swapyz, chunk_size)
+        job.future = self.pool.submit(self.prepare_obj, job)
+        self.jobs.append(job)
+        return job
+
+    def prepare_obj(self, job):
+        """Worker side: everything that does not need the GL context"""
+        t = time.perf_counter()
+        model = OBJ(job.filename, job.swapyz, defer_gl=True, chunk_size=job.chunk_size)
+        self.add_time('parse', time.perf_counter() - t)
+
+        t = time.perf_counter()
+        decoded = {}
+        for mtl in model.mtl.values():
+            imagefile = mtl.get('map_Kd_file')
+            if imagefile and imagefile not in decoded and os.path.exists(imagefile) \
+                    and not textures.contains(imagefile):
+                image = self.decode_once(imagefile)
+                if image is not None:
+                    decoded[imagefile] = image
+        self.add_time('decode', time.perf_counter() - t)
+
+        t = time.perf_counter()
+        batches = build_batches(model.mesh, model.chunk_size) if OBJ.generate_on_init else None
+        self.add_time('triangulate', time.perf_counter() - t)
+
+        t = time.perf_counter()
+        lods = model.build_lods(batches) if batches is not None else None
+        self.add_time('simplify', time.perf_counter() - t)
+
+        return model, decoded, batches, lods
+
+    def decode_once(self, imagefile):
+        """Decode an image, or wait for another worker already decoding it"""
+        with self.lock:
+            entry = self.decoded.get(imagefile)
+            owner = entry is None
+            if owner:
+                entry = self.decoded[imagefile] = [threading.Event(), None]
+
+        if owner:
+            try:
+                entry[1] = textures.decode(imagefile)
+            except Exception as e:
+                print(f"Could not decode texture {imagefile}: {e}")
+            finally:
+                entry[0].set()
+        else:
+            entry[0].wait()
+        return entry[1]
+
+    def queue_uploads(self, job):
+        """GL side: turn a prepared model into upload tasks"""
+        try:
+            model, decoded, batches, lods = job.future.result()
+        except Exception as e:
+            job.error = e
+            job.done = True
+            return
+
+        def upload_texture(name, mtl):
+            return lambda: OBJ.loadMaterialTextures({name: mtl}, decoded)
+
+        def upload_buffers():
+            model.generate(batches, lods)
+
+        # One slice per material texture so a frame never uploads more than one image
+        tasks = [('upload_textures', upload_texture(name, mtl))
+                 for name, mtl in model.mtl.items() if 'map_Kd_file' in mtl]
+        if batches is not None:
+            tasks.append(('upload_buffers', upload_buffers))
+
+        job.prepared = model
+        job.gl_tasks = tasks
+        job.queued = True
+        if not tasks:
+            # Nothing to upload (no textures, generate_on_init off): done once prepared
+            job.model = model
+            job.done = True
+        for task in tasks:
+            self.gl_queue.append((job, task))
+
+    def update(self, budget=0.008):
+        """Run queued GL uploads for up to budget seconds; returns True when everything is loaded"""
+        for job in self.jobs:
+            if not job.queued and not job.done and job.future.done():
+                self.queue_uploads(job)
+
+        deadline = time.perf_counter() + budget
+        while self.gl_queue and time.perf_counter() < deadline:
+            job, (stage, task) = self.gl_queue.popleft()
+            t = time.perf_counter()
+            task()
+            self.add_time(stage, time.perf_counter() - t)
+            job.gl_done += 1
+            if job.gl_done == len(job.gl_tasks):
+                job.model = job.prepared
+                job.done = True
+
+        if self.done and self.finished is None:
+            self.finished = time.perf_counter()
+        return self.done
+
+    @property
+    def done(self):
+        return all(job.done for job in self.jobs)
+
+    def progress(self):
+        """Overall progress from 0 to 1"""
+        if not self.jobs:
+            return 1.0
+        return sum(job.progress() for job in self.jobs) / len(self.jobs)
+
+    def report(self):
+        """Print per-stage timings; worker stages are summed across threads"""
+        wall = (self.finished or time.perf_counter()) - self.started
+        print(f"Assets loaded in {wall * 1000:.1f} ms")
+        for stage, seconds in self.timings.items():
+            print(f"  {stage}: {seconds * 1000:.1f} ms")
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False)
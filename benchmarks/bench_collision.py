@@ -0,0 +1,48 @@
+# benchmarks/bench_collision.py
+"""Player collision queries per second: linear scan, grid index and vectorized batch"""
+import random
+import sys
+import time
+
+import numpy as np
+
+from common import load_map_headless, random_positions, rate
+
+def check_box_masks(game, positions):
+    """Compare CollisionBoxes.hits with check_collision_with_box face by face"""
+    soa = game.collision_world.grid.soa
+    min_y = game.EYE_Y - game.PLAYER_HEIGHT/2
+    max_y = game.EYE_Y + game.PLAYER_HEIGHT/2
+    mismatches = 0
+    for x, z in positions:
+        expected = [game.check_collision_with_box(x, z, face['vertices'], face['min_y'], face['max_y'])
+                    for face in game.collision_faces]
+        mismatches += int((soa.hits(x, z, game.PLAYER_RADIUS, min_y, max_y) != np.array(expected)).sum())
+    return mismatches
+
+def main(filename='backroom.obj', count=2000, seed=1):
+    game = load_map_headless(filename)
+    positions = random_positions(random.Random(seed), count, game.MAP_BOUNDARY)
+
+    linear, linear_rate = rate(game.check_collision_linear, positions)
+    grid, grid_rate = rate(game.check_collision, positions)
+
+    xs = np.array([p[0] for p in positions])
+    zs = np.array([p[1] for p in positions])
+    start = time.perf_counter()
+    batch = game.collision_world.collides_many(xs, zs, game.PLAYER_RADIUS, game.EYE_Y, game.PLAYER_HEIGHT)
+    batch_rate = count / (time.perf_counter() - start)
+
+    mismatches = sum(1 for a, b in zip(linear, grid) if a != b)
+    mismatches += sum(1 for a, b in zip(linear, batch.tolist()) if a != b)
+    mismatches += check_box_masks(game, positions[:50])
+
+    print(f"{filename}: {len(game.collision_faces)} collision faces, {count} queries")
+    print(f"  linear scan:  {linear_rate:12.0f} queries/s")
+    print(f"  grid index:   {grid_rate:12.0f} queries/s  ({grid_rate / linear_rate:.1f}x)")
+    print(f"  grid batch:   {batch_rate:12.0f} queries/s  ({batch_rate / linear_rate:.1f}x)")
+    print(f"  mismatches:   {mismatches}")
+    return mismatches == 0
+
+if __name__ == "__main__":
+    sys.exit(0 if main(*sys.argv[1:2]) else 1)
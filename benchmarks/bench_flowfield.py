@@ -0,0 +1,66 @@
+# benchmarks/bench_flowfield.py
+"""Per-frame cost of steering 1/10/100 monsters toward a moving player
+
+Worst case for per-monster searches: every monster replans every frame.
+The flow field is rebuilt only when the player changes cells and then
+answers each monster with a lookup.
+"""
+import contextlib
+import io
+import random
+import sys
+import time
+
+from common import load_map_headless, player_walk
+
+def spawn(count, world, rng):
+    """Monsters standing on random walkable cells"""
+    from monster import Monster
+
+    monsters = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(count):
+            monsters.append(Monster(model=False))  # No model: skip loading monster.obj
+
+    occupancy = monsters[0].get_occupancy(world)
+    cells = [(ix + occupancy.origin[0], iz + occupancy.origin[1])
+             for ix, iz in zip(*occupancy.walkable.nonzero())]
+    for monster in monsters:
+        monster.x, monster.z = monster.grid_to_world(*rng.choice(cells))
+    return monsters
+
+def frame_cost(monsters, positions, step):
+    """Mean seconds per frame to run step for every monster"""
+    start = time.perf_counter()
+    for player in positions:
+        for monster in monsters:
+            step(monster, player)
+    return (time.perf_counter() - start) / len(positions)
+
+def main(filename='backroom.obj', frames=120, seed=1):
+    game = load_map_headless(filename)
+    world = game.collision_world
+    rng = random.Random(seed)
+    positions = player_walk(game, frames, rng)
+
+    def search(monster, player):
+        monster.astar_pathfind((monster.x, monster.z), player, world)
+
+    def flow(monster, player):
+        monster.flow_step(player[0], player[1], world)
+
+    print(f"{filename}: {frames} frames of a wandering player")
+    for count in (1, 10, 100):
+        monsters = spawn(count, world, rng)
+        field = monsters[0].get_occupancy(world).flow_field()
+        field.goal = None
+        rebuilds = field.rebuilds
+
+        search_cost = frame_cost(monsters, positions, search)
+        flow_cost = frame_cost(monsters, positions, flow)
+        print(f"  {count:3d} monsters: A* per monster {search_cost * 1000:8.3f} ms/frame, "
+              f"flow field {flow_cost * 1000:8.3f} ms/frame "
+              f"({field.rebuilds - rebuilds} rebuilds, {search_cost / flow_cost:.1f}x)")
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,77 @@
+# benchmarks/bench_frustum.py
+"""Map chunks submitted per camera pose with frustum culling, and what the culling costs
+
+Draws are GL recorded. That culling matches the chunk boxes and never drops
+a visible triangle is asserted in tests/test_frustum.py.
+"""
+import contextlib
+import io
+import math
+import random
+import sys
+import time
+
+import numpy as np
+
+from common import load_map_headless
+
+def camera_poses(game, rng, count, headings=8):
+    """(eye, center) for random valid player positions looking in evenly spaced directions"""
+    poses = []
+    while len(poses) < count * headings:
+        x, z = rng.uniform(-game.MAP_BOUNDARY, game.MAP_BOUNDARY), rng.uniform(-game.MAP_BOUNDARY, game.MAP_BOUNDARY)
+        if not game.is_valid_move(x, z):
+            continue
+        for i in range(headings):
+            angle = 2 * math.pi * i / headings
+            eye = (x, game.EYE_Y, z)
+            poses.append((eye, (x + math.cos(angle), game.EYE_Y, z + math.sin(angle))))
+    return poses
+
+def main(filename='backroom.obj', positions=50, chunk_size=4.0, seed=1):
+    game = load_map_headless(filename)
+    import mesh_renderer
+    from frustum import Frustum
+    from gl_recorder import GLRecorder
+
+    recorder = GLRecorder()
+    model = game.map_model
+    with contextlib.redirect_stdout(io.StringIO()):
+        buffers = mesh_renderer.MeshBuffers(model.mesh, chunk_size=float(chunk_size))
+    aspect = game.SCREEN_WIDTH / game.SCREEN_HEIGHT
+    frusta = [Frustum.from_camera(game.FOVY, aspect, game.ZNEAR, game.ZFAR, eye, center)
+              for eye, center in camera_poses(game, random.Random(seed), positions)]
+
+    triangles = buffers.indices.reshape(-1, 3)
+    drawn_chunks, drawn_triangles, draw_calls = [], [], []
+    with recorder.patch(mesh_renderer):
+        buffers.upload()
+        for frustum in frusta:
+            recorder.reset()
+            buffers.draw(model.mtl, frustum)
+            drawn_chunks.append(buffers.drawn_chunks)
+            drawn_triangles.append(buffers.drawn_triangles)
+            draw_calls.append(recorder.count('glDrawElements'))
+
+    start = time.perf_counter()
+    for frustum in frusta:
+        buffers.visible_groups(frustum)
+    cull_cost = (time.perf_counter() - start) / len(frusta)
+    start = time.perf_counter()
+    for eye, center in camera_poses(game, random.Random(seed), positions):
+        Frustum.from_camera(game.FOVY, aspect, game.ZNEAR, game.ZFAR, eye, center)
+    frustum_cost = (time.perf_counter() - start) / len(frusta)
+    unculled_calls = len(buffers.groups)
+
+    print(f"{filename}: {len(buffers.chunks)} chunks of {chunk_size} units, "
+          f"{len(triangles)} triangles, {len(frusta)} camera poses")
+    print(f"  chunks drawn:    {np.mean(drawn_chunks):6.1f} mean, {min(drawn_chunks)}-{max(drawn_chunks)} "
+          f"({np.mean(drawn_chunks) / len(buffers.chunks) * 100:.0f}%)")
+    print(f"  triangles drawn: {np.mean(drawn_triangles):8.0f} mean "
+          f"({np.mean(drawn_triangles) / len(triangles) * 100:.0f}%)")
+    print(f"  draw calls:      {np.mean(draw_calls):6.1f} mean (all chunks: {unculled_calls}, "
+          f"unchunked: {len(mesh_renderer.build_batches(model.mesh)[2])})")
+    print(f"  culling cost:    {cull_cost * 1e6:6.1f} us/frame + {frustum_cost * 1e6:.1f} us frustum setup")
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2], chunk_size=float(sys.argv[2]) if len(sys.argv) > 2 else 4.0)
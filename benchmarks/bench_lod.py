@@ -0,0 +1,83 @@
+# benchmarks/bench_lod.py
+"""Triangles submitted per frame with levels of detail and the fog draw cutoff, recorded without a GPU
+
+A player walks the map with the monster at random positions. Each frame is
+rendered with ZFAR 1000 and full detail (the old behavior), then with the
+game's DRAW_DISTANCE and LEVEL_OF_DETAIL. No frame may submit more
+triangles with them, and the LOD cache must load the levels it saved.
+"""
+import contextlib
+import io
+import math
+import random
+import sys
+
+import numpy as np
+
+from common import load_map_headless, player_walk, random_positions
+
+def main(filename='backroom.obj', frames=600, seed=1):
+    game = load_map_headless(filename)
+    import collectible
+    import mesh_lod
+    import mesh_renderer
+    import monster as monster_module
+    import objloader
+    from gl_recorder import GLRecorder
+
+    rng = random.Random(seed)
+    walk = player_walk(game, frames + 1, rng)
+    monster_positions = random_positions(rng, frames, game.MAP_BOUNDARY)
+
+    recorder = GLRecorder()
+    with contextlib.redirect_stdout(io.StringIO()), \
+            recorder.patch(game, objloader, mesh_renderer, collectible, monster_module):
+        game.map_model.generate()
+        game.monster = monster_module.Monster(model=False)
+        game.collectible_manager = None
+        game.game_state = "playing"
+
+        def render_walk(zfar, level_of_detail):
+            game.ZFAR, game.LEVEL_OF_DETAIL = zfar, level_of_detail
+            counts = []
+            for (x, z), (nx, nz), (mx, mz) in zip(walk, walk[1:], monster_positions):
+                game.EYE_X = game.PREV_EYE_X = x
+                game.EYE_Z = game.PREV_EYE_Z = z
+                if (nx, nz) != (x, z):
+                    game.theta = game.PREV_THETA = math.degrees(math.atan2(nz - z, nx - x))
+                game.monster.x = game.monster.prev_x = mx
+                game.monster.z = game.monster.prev_z = mz
+                game.render_scene()
+                counts.append((game.map_model.buffers.drawn_triangles, game.monster.drawn_triangles))
+            return np.array(counts)
+
+        zfar, level_of_detail = game.ZFAR, game.LEVEL_OF_DETAIL
+        before = render_walk(1000.0, False)
+        after = render_walk(zfar, level_of_detail)
+        game.ZFAR, game.LEVEL_OF_DETAIL = zfar, level_of_detail
+
+    buffers = game.map_model.buffers
+    batches = (buffers.vertices, buffers.indices[:buffers.triangle_count * 3],
+               buffers.groups, buffers.chunks)
+    cell_sizes = objloader.OBJ.lod_cell_sizes
+    cached = mesh_lod.load(mesh_lod.lod_cache_path(game.map_model.filename),
+                           mesh_lod.cache_key(batches, cell_sizes), len(cell_sizes))
+    built = mesh_lod.build_lods(batches, cell_sizes)
+    cache_ok = cached is not None and all(
+        np.array_equal(a[0], b[0]) and np.array_equal(a[1], b[1]) for a, b in zip(cached, built))
+
+    levels = [sum(count for chunk in level for _, _, count in chunk) // 3 for level in buffers.levels]
+    print(f"{filename}: {frames} frames, map levels of {' / '.join(map(str, levels))} triangles "
+          f"(cells {cell_sizes}, from {objloader.OBJ.lod_distances} units)")
+    for name, counts in (('ZFAR 1000, full detail', before),
+                         (f'DRAW_DISTANCE {game.DRAW_DISTANCE:g}, LOD', after)):
+        total = counts.sum(axis=1)
+        print(f"  {name:24s} map {counts[:, 0].mean():7.0f}, monster {counts[:, 1].mean():5.0f}, "
+              f"total {total.mean():7.0f} triangles/frame (max {total.max()})")
+    worse = int((after.sum(axis=1) > before.sum(axis=1)).sum())
+    print(f"  triangles per frame reduced {before.sum() / max(1, after.sum()):.2f}x; "
+          f"frames with more triangles: {worse}; LOD cache matches: {cache_ok}")
+    return worse == 0 and cache_ok
+
+if __name__ == "__main__":
+    sys.exit(0 if main(*sys.argv[1:2]) else 1)
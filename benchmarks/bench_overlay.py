@@ -0,0 +1,65 @@
+# benchmarks/bench_overlay.py
+"""GL calls per frame for the HUD, game over and win overlays, recorded without a GPU
+
+Also compares a whole game over frame drawn over the live scene with one
+drawn over the captured last gameplay frame.
+"""
+import contextlib
+import io
+import sys
+
+from common import load_map_headless
+
+def record(recorder, draw, frames=3):
+    """GL calls of the first frame (which builds caches), then (GL calls, draw calls) per frame"""
+    recorder.reset()
+    draw()
+    first = len(recorder.calls)
+    recorder.reset()
+    for _ in range(frames):
+        draw()
+    return first, len(recorder.calls) / frames, recorder.draw_calls() / frames
+
+def main(filename='backroom.obj'):
+    game = load_map_headless(filename)
+    import collectible
+    import game_over
+    import glyph_atlas
+    import mesh_renderer
+    import objloader
+    import overlay
+    import win_screen
+    from collectible import CollectibleManager
+    from gl_recorder import GLRecorder
+
+    recorder = GLRecorder()
+    with contextlib.redirect_stdout(io.StringIO()), \
+            recorder.patch(game, game_over, win_screen, glyph_atlas, overlay,
+                                    objloader, mesh_renderer, collectible):
+        game.collectible_manager = CollectibleManager(num_items=3)
+        game.game_state = "playing"
+        overlays = {
+            'hud': game.draw_hud,
+            'game over': game_over.GameOverScreen().draw_game_over,
+            'win': win_screen.WinScreen().draw_win_screen,
+        }
+        counts = {name: record(recorder, draw) for name, draw in overlays.items()}
+
+        game.map_model.generate()
+        game.game_state = "game_over"
+        screen = game_over.GameOverScreen()
+        counts['end frame, live scene'] = record(
+            recorder, lambda: (game.render_scene(), screen.draw_game_over()))
+        game.render_scene()
+        game.end_background = overlay.FrameCapture(game.SCREEN_WIDTH, game.SCREEN_HEIGHT)
+        game.end_background.capture()
+        counts['end frame, captured'] = record(
+            recorder, lambda: (game.draw_end_background(), screen.draw_game_over()))
+
+    for name, (first, calls, draws) in counts.items():
+        print(f"  {name:22s} first frame {first:4d} GL calls, then {calls:4.0f} GL calls/frame, "
+              f"{draws:2.0f} draw calls/frame")
+    return counts
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
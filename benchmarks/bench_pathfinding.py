@@ -0,0 +1,143 @@
+# benchmarks/bench_pathfinding.py
+"""Monster pathfinding cost: occupancy grid vs collision queries, A* vs BFS, path repair"""
+import math
+import random
+import sys
+import time
+
+from common import load_map_headless, random_positions
+
+def run(search, pairs):
+    start = time.perf_counter()
+    paths = [search(a, b) for a, b in pairs]
+    return paths, (time.perf_counter() - start) / len(pairs)
+
+def is_valid_path(monster, occupancy, start, path):
+    """Every waypoint is a walkable 8-neighbor of the one before it"""
+    cell = monster.world_to_grid(*start)
+    for waypoint in path:
+        step = monster.world_to_grid(waypoint[0] + 1e-9, waypoint[1] + 1e-9)
+        if step not in occupancy.neighbors(cell):
+            return False
+        cell = step
+    return True
+
+def flood(occupancy, start):
+    """Every cell reachable from start, including start itself"""
+    seen = {start}
+    frontier = [start]
+    while frontier:
+        cell = frontier.pop()
+        for neighbor in occupancy.neighbors(cell):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                frontier.append(neighbor)
+    return seen
+
+def compare_occupancy(monster, world, pairs):
+    from monster import Monster
+
+    start = time.perf_counter()
+    monster.get_occupancy(world)
+    build_time = time.perf_counter() - start
+
+    search = lambda a, b: monster.bfs_pathfind(a, b, world)
+    Monster.use_occupancy_grid = False
+    scan_paths, scan_time = run(search, pairs)
+    Monster.use_occupancy_grid = True
+    grid_paths, grid_time = run(search, pairs)
+
+    mismatches = sum(1 for a, b in zip(scan_paths, grid_paths) if a != b)
+    print(f"  bfs_pathfind neighbor expansion:")
+    print(f"    occupancy grid build: {build_time * 1000:9.2f} ms (once per map)")
+    print(f"    collision queries:    {scan_time * 1e6:9.1f} us/path")
+    print(f"    occupancy grid:       {grid_time * 1e6:9.1f} us/path  ({scan_time / grid_time:.1f}x)")
+    print(f"    mismatches:           {mismatches}")
+    return mismatches == 0
+
+def compare_astar(monster, world, pairs):
+    occupancy = monster.get_occupancy(world)
+    # A goal is reachable when an unbounded flood fill from the start cell gets to it
+    reachable = [monster.world_to_grid(*b) in flood(occupancy, monster.world_to_grid(*a))
+                 for a, b in pairs]
+    total = max(1, sum(reachable))
+
+    ok = True
+    for name, search in (('bfs', lambda a, b: monster.bfs_pathfind(a, b, world)),
+                         ('astar', lambda a, b: monster.astar_pathfind(a, b, world))):
+        paths, per_path = run(search, pairs)
+        found = sum(1 for path, r, (a, b) in zip(paths, reachable, pairs)
+                    if r and (path or monster.world_to_grid(*a) == monster.world_to_grid(*b)))
+        invalid = sum(1 for path, (a, _) in zip(paths, pairs)
+                      if not is_valid_path(monster, occupancy, a, path))
+        print(f"  {name:6s} {per_path * 1e6:9.1f} us/query, "
+              f"success {found}/{sum(reachable)} reachable ({100 * found / total:.1f}%), "
+              f"invalid paths {invalid}")
+        ok &= invalid == 0
+    return ok
+
+def path_length(start, path):
+    points = [start] + list(path)
+    return sum(math.dist(a, b) for a, b in zip(points, points[1:]))
+
+def compare_repair(monster, world, pairs, rng):
+    """Replan after the target moves up to a cell: full A* vs repairing the old path"""
+    occupancy = monster.get_occupancy(world)
+    full_nodes = repair_nodes = full_length = repair_length = 0.0
+    full_time = repair_time = 0.0
+    invalid = trials = 0
+
+    for a, b in pairs:
+        path = monster.astar_pathfind(a, b, world)
+        if len(path) < 4:
+            continue
+        moved = (b[0] + rng.uniform(-1.5, 1.5), b[1] + rng.uniform(-1.5, 1.5))
+        if not occupancy.is_walkable(*monster.world_to_grid(*moved)):
+            continue
+
+        # The monster has walked two waypoints along the old path
+        monster.path, monster.path_goal, monster.current_path_index = path, b, 2
+        position = path[1]
+
+        start = time.perf_counter()
+        full = monster.astar_pathfind(position, moved, world)
+        full_time += time.perf_counter() - start
+        full_nodes += monster.last_replan_nodes
+
+        start = time.perf_counter()
+        repaired = monster.repair_path(moved, world)
+        repair_time += time.perf_counter() - start
+        repair_nodes += monster.last_replan_nodes
+        if not full or not repaired:
+            continue
+
+        trials += 1
+        full_length += path_length(position, full)
+        repair_length += path_length(position, repaired)
+        invalid += not is_valid_path(monster, occupancy, position, repaired)
+
+    trials = max(1, trials)
+    print(f"  replan after the target moved (<= 1.5 units), {trials} replans:")
+    print(f"    full A*:  {full_nodes / trials:7.1f} nodes, {full_time / trials * 1e6:7.1f} us")
+    print(f"    repair:   {repair_nodes / trials:7.1f} nodes, {repair_time / trials * 1e6:7.1f} us, "
+          f"path {100 * (repair_length / full_length - 1):.1f}% longer, invalid paths {invalid}")
+    return invalid == 0
+
+def main(filename='backroom.obj', count=200, seed=1):
+    game = load_map_headless(filename)
+    from monster import Monster
+
+    monster = Monster(start_x=8.0, start_z=8.0)
+    world = game.collision_world
+    rng = random.Random(seed)
+    pairs = list(zip(random_positions(rng, count, game.MAP_BOUNDARY),
+                     random_positions(rng, count, game.MAP_BOUNDARY)))
+
+    print(f"{filename}: {count} random start/goal pairs")
+    ok = compare_occupancy(monster, world, pairs)
+    ok &= compare_astar(monster, world, pairs)
+    ok &= compare_repair(monster, world, pairs, rng)
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if main(*sys.argv[1:2]) else 1)
@@ -0,0 +1,69 @@
+# benchmarks/bench_perception.py
+"""Replay scripted player walks against the monster with and without the perception cache
+
+Each replay runs Monster.update at 60 Hz and reports the time spent in
+can_see_player, the cache hit rate and the first frame, if any, where the
+two runs differ. tests/test_perception.py asserts that headless games play
+out the same with the cache on and off.
+"""
+import contextlib
+import io
+import random
+import sys
+import time
+
+from common import load_map_headless, player_walk
+
+def replay(world, positions, cached):
+    """Monster (state, x, z) per frame, seconds spent in can_see_player and the perception stats"""
+    from monster import Monster
+
+    Monster.use_perception_cache = cached
+    trace = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        monster = Monster(start_x=8.0, start_z=8.0, model=False)
+
+        seeing = [0.0]
+        can_see_player = monster.can_see_player
+        def timed_can_see_player(*args):
+            start = time.perf_counter()
+            result = can_see_player(*args)
+            seeing[0] += time.perf_counter() - start
+            return result
+        monster.can_see_player = timed_can_see_player
+
+        for frame, (x, z) in enumerate(positions):
+            caught = monster.update(x, z, world, frame / 60.0)
+            trace.append((monster.state, monster.x, monster.z))
+            if caught:
+                break
+    return trace, seeing[0], monster.perception.stats()
+
+def main(filename='backroom.obj', replays=5, frames=3600, repeats=3):
+    game = load_map_headless(filename)
+    world = game.collision_world
+
+    print(f"{filename}: {replays} replays of up to {frames} frames")
+    totals = [0.0, 0.0]
+    for seed in range(replays):
+        positions = player_walk(game, frames, random.Random(seed))
+        # Best of a few runs, as single runs this short are noisy
+        plain, plain_time, _ = min((replay(world, positions, False) for _ in range(repeats)),
+                                   key=lambda run: run[1])
+        cached, cached_time, stats = min((replay(world, positions, True) for _ in range(repeats)),
+                                         key=lambda run: run[1])
+        totals[0] += plain_time
+        totals[1] += cached_time
+
+        diverged = next((i for i, (a, b) in enumerate(zip(plain, cached)) if a != b), None)
+        if len(plain) != len(cached) and diverged is None:
+            diverged = min(len(plain), len(cached))
+        print(f"  seed {seed}: {len(plain):5d} frames, can_see_player "
+              f"{plain_time / len(plain) * 1e6:6.1f} -> {cached_time / len(cached) * 1e6:6.1f} us/frame, "
+              f"hit rate {stats['hit_rate'] * 100:5.1f}% ({stats['hits']} hits, {stats['misses']} misses), "
+              f"{'identical' if diverged is None else f'diverged at frame {diverged}'}")
+    print(f"  total perception time {totals[0] * 1000:.1f} -> {totals[1] * 1000:.1f} ms "
+          f"({totals[0] / totals[1]:.2f}x)")
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
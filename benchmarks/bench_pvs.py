@@ -0,0 +1,82 @@
+# benchmarks/bench_pvs.py
+"""Map chunks drawn with the potentially visible sets on top of frustum culling
+
+The PVS is sampled, so it is checked against denser rays cast from random
+player positions: every chunk those rays reach must be in the PVS of the
+position's cell.
+"""
+import contextlib
+import io
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from bench_frustum import camera_poses
+from common import ROOT, load_map_headless
+
+def main(filename='backroom.obj', positions=50, rays=2048, seed=1):
+    game = load_map_headless(filename)
+    import mesh_renderer
+    import visibility
+    from frustum import Frustum
+    from gl_recorder import GLRecorder
+
+    model = game.map_model
+    with contextlib.redirect_stdout(io.StringIO()):
+        buffers = mesh_renderer.MeshBuffers(model.mesh, chunk_size=game.MAP_CHUNK_SIZE)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        pvs = visibility.PotentiallyVisibleSet.load_or_build(
+            visibility.pvs_cache_path(os.path.join(ROOT, filename)), game.collision_world, buffers.chunk_mins,
+            buffers.chunk_maxs, game.MAP_BOUNDARY, game.is_valid_move)
+    load_time = time.perf_counter() - start
+
+    # Dense rays from random valid positions, with no margin around the chunks
+    rng = random.Random(seed)
+    blocked, origin = visibility.occlusion_raster(game.collision_world, 0.1, 0.05, 2.15)
+    angles = np.linspace(0, 2 * math.pi, rays, endpoint=False)
+    directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+    missed = 0
+    checked = 0
+    while checked < positions * 4:
+        x, z = rng.uniform(-game.MAP_BOUNDARY, game.MAP_BOUNDARY), rng.uniform(-game.MAP_BOUNDARY, game.MAP_BOUNDARY)
+        if not game.is_valid_move(x, z):
+            continue
+        lengths = visibility.ray_lengths(blocked, origin, 0.1, x, z, directions, 4 * game.MAP_BOUNDARY)
+        reached = visibility.rays_reach(x, z, directions, lengths, buffers.chunk_mins, buffers.chunk_maxs)
+        missed += int((reached & ~pvs.visible_chunks(x, z)).sum())
+        checked += 1
+
+    recorder = GLRecorder()
+    aspect = game.SCREEN_WIDTH / game.SCREEN_HEIGHT
+    frustum_chunks, pvs_chunks, frustum_triangles, pvs_triangles = [], [], [], []
+    with recorder.patch(mesh_renderer):
+        buffers.upload()
+        for eye, center in camera_poses(game, random.Random(seed), positions):
+            frustum = Frustum.from_camera(game.FOVY, aspect, game.ZNEAR, game.ZFAR, eye, center)
+            buffers.draw(model.mtl, frustum)
+            frustum_chunks.append(buffers.drawn_chunks)
+            frustum_triangles.append(buffers.drawn_triangles)
+            buffers.draw(model.mtl, frustum, pvs.visible_chunks(eye[0], eye[2]))
+            pvs_chunks.append(buffers.drawn_chunks)
+            pvs_triangles.append(buffers.drawn_triangles)
+
+    triangles = buffers.triangle_count
+    print(f"{filename}: {len(buffers.chunks)} chunks, {pvs.visible.shape[0] * pvs.visible.shape[1]} cells "
+          f"of {pvs.cell_size} units (loaded in {load_time:.2f} s)")
+    print(f"  PVS visible fraction:   {pvs.visible_fraction() * 100:.1f}% of chunks per cell")
+    print(f"  triangles drawn, frustum only: {np.mean(frustum_triangles):8.0f} mean "
+          f"({np.mean(frustum_triangles) / triangles * 100:.0f}%), "
+          f"{np.mean(frustum_chunks):.1f} chunks")
+    print(f"  triangles drawn, frustum+PVS:  {np.mean(pvs_triangles):8.0f} mean "
+          f"({np.mean(pvs_triangles) / triangles * 100:.0f}%), "
+          f"{np.mean(pvs_chunks):.1f} chunks")
+    print(f"  chunks reached by {rays} rays but not in the PVS: {missed} ({checked} positions)")
+    return missed == 0
+
+if __name__ == "__main__":
+    sys.exit(0 if main(*sys.argv[1:2]) else 1)
@@ -0,0 +1,37 @@
+# benchmarks/bench_text_textures.py
+"""Cost of a cached text texture lookup vs rendering and uploading the text, GL recorded
+
+tests/test_text_textures.py asserts the texture count stays bounded.
+"""
+import contextlib
+import io
+import sys
+
+from common import rate
+
+def main(frames=5000):
+    import game_over
+    import texture_registry
+    from gl_recorder import GLRecorder
+
+    frames = int(frames)
+    recorder = GLRecorder()
+    cache = texture_registry.text_textures
+    with contextlib.redirect_stdout(io.StringIO()), recorder.patch(texture_registry):
+        screen = game_over.GameOverScreen()
+        # A clock that changes every second plus a title that never does
+        texts = [(f"Time: {frame // 60}s",) for frame in range(frames)]
+        _, clock_rate = rate(screen.render_text_to_texture, texts)
+        _, title_rate = rate(screen.render_text_to_texture, [("GAME OVER",)] * frames)
+        _, miss_rate = rate(screen.render_text_to_texture, [(f"Text {i}",) for i in range(frames)])
+        stats = cache.stats()
+        cache.clear()
+
+    print(f"{frames} frames: {stats['created']} textures created, {stats['hits']} hits "
+          f"(capacity {cache.capacity})")
+    print(f"  changing clock: {1e6 / clock_rate:7.1f} us/frame")
+    print(f"  fixed title:    {1e6 / title_rate:7.1f} us/frame")
+    print(f"  always new:     {1e6 / miss_rate:7.1f} us/frame")
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
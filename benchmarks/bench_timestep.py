@@ -0,0 +1,31 @@
+# benchmarks/bench_timestep.py
+"""Headless ticks per second at several render rates
+
+The logic runs on a fixed 60 Hz timestep, so only the number of frames
+changes with the render rate; tests/test_timestep.py asserts the outcome
+is the same at every rate.
+"""
+import contextlib
+import io
+import os
+import sys
+
+from common import ROOT
+
+def main(filename='backroom.obj', ticks=6000, seeds=3):
+    import main as game
+
+    print(f"{filename}: {ticks} ticks per run")
+    for seed in range(seeds):
+        results = {}
+        for fps in (30, 60, 144, 1000, 0):
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[fps] = game.run_headless(os.path.join(ROOT, filename), ticks, seed, fps=fps)
+        print(f"  seed {seed}: " +
+              ", ".join(f"{fps or 'uneven'} fps {result['ticks_per_second']:6.0f} ticks/s"
+                        for fps, result in results.items()) +
+              f" (won {results[60]['won']}, caught {results[60]['caught']}, "
+              f"collected {results[60]['collected']})")
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
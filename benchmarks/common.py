@@ -0,0 +1,44 @@
+# benchmarks/common.py
+import math
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+def load_map_headless(filename='backroom.obj'):
+    """Load a map into main's globals without creating any GL objects"""
+    import main
+
+    main.load_map_headless(os.path.join(ROOT, filename))
+    return main
+
+def random_positions(rng, count, boundary):
+    """Uniform random (x, z) positions inside the square map boundary"""
+    return [(rng.uniform(-boundary, boundary), rng.uniform(-boundary, boundary))
+            for _ in range(count)]
+
+def player_walk(game, frames, rng):
+    """(x, z) per frame of a player wandering the map at walking speed"""
+    x, z = 0.0, 0.0
+    heading = 0.0
+    positions = []
+    for _ in range(frames):
+        heading += rng.uniform(-0.2, 0.2)
+        nx = x + 0.1 * math.cos(heading)
+        nz = z + 0.1 * math.sin(heading)
+        if game.is_valid_move(nx, nz):
+            x, z = nx, nz
+        else:
+            heading += math.pi / 2
+        positions.append((x, z))
+    return positions
+
+def rate(fn, items):
+    """Call fn on every item; returns (results, calls per second)"""
+    start = time.perf_counter()
+    results = [fn(*item) for item in items]
+    elapsed = time.perf_counter() - start
+    return results, len(items) / elapsed if elapsed > 0 else float('inf')
@@ -0,0 +1,147 @@
+# benchmarks/run_all.py
+"""Time the loader, collision and AI hot paths and save the results as JSON
+
+Runs without a GPU: GL calls made while loading models go to a GLRecorder.
+Every case reports the best and median time per operation over a few
+repeats. Results go to benchmarks/results/<commit>.json by default; pass
+--compare with an earlier file to print the speedup of each case.
+
+    python benchmarks/run_all.py
+    python benchmarks/run_all.py --compare benchmarks/results/abc1234.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+
+from common import ROOT, load_map_headless, random_positions
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+def measure(fn, ops, repeats):
+    """Seconds per operation of fn (which runs `ops` operations) over several repeats"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) / ops)
+    return {'ops': ops, 'repeats': repeats, 'best_s': min(times), 'median_s': statistics.median(times)}
+
+def load_obj(filename, cached):
+    """OBJ.__init__ with GL stubbed out, then free the model again"""
+    import mesh_renderer
+    import objloader
+    import texture_registry
+    from gl_recorder import GLRecorder
+
+    objloader.OBJ.use_cache = cached
+    try:
+        with GLRecorder().patch(objloader, mesh_renderer, texture_registry):
+            model = objloader.OBJ(os.path.join(ROOT, filename))
+            model.free()
+    finally:
+        objloader.OBJ.use_cache = True
+
+def cases(args):
+    """(name, fn, ops) for every benchmark case"""
+    game = load_map_headless(args.map)
+    from monster import Monster
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        monster = Monster(model=False)
+    world = game.collision_world
+    rng = random.Random(args.seed)
+    positions = random_positions(rng, args.count, game.MAP_BOUNDARY)
+    pairs = list(zip(random_positions(rng, args.pairs, game.MAP_BOUNDARY),
+                     random_positions(rng, args.pairs, game.MAP_BOUNDARY)))
+
+    def check_collision():
+        for x, z in positions:
+            game.check_collision(x, z)
+
+    def pathfind(method):
+        def run():
+            for start, goal in pairs:
+                method(start, goal, world)
+        return run
+
+    def can_see_player():
+        for (mx, mz), (px, pz) in pairs:
+            monster.x, monster.z = mx, mz
+            monster.can_see_player(px, pz, world)
+
+    for filename in ('backroom.obj', 'backroomOG.obj'):
+        if os.path.exists(os.path.join(ROOT, filename)):
+            yield f'obj_load_cached[{filename}]', lambda f=filename: load_obj(f, True), 1
+            yield f'obj_load_parse[{filename}]', lambda f=filename: load_obj(f, False), 1
+    yield 'extract_collision_data', game.extract_collision_data, 1
+    yield 'check_collision', check_collision, len(positions)
+    yield 'bfs_pathfind', pathfind(monster.bfs_pathfind), len(pairs)
+    yield 'astar_pathfind', pathfind(monster.astar_pathfind), len(pairs)
+    yield 'can_see_player', can_see_player, len(pairs)
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def compare(results, baseline_path):
+    """Print each case's speedup over a saved run"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"vs {baseline_path} (commit {baseline.get('commit')}):")
+    for name, result in results.items():
+        old = baseline['results'].get(name)
+        if old:
+            print(f"  {name:34s} {old['best_s'] * 1e6:12.1f} -> {result['best_s'] * 1e6:12.1f} us "
+                  f"({old['best_s'] / result['best_s']:.2f}x)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--map', default='backroom.obj', help="map for the collision and AI cases")
+    parser.add_argument('--count', type=int, default=2000, help="collision query positions")
+    parser.add_argument('--pairs', type=int, default=200, help="pathfinding / sight pairs")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--only', help="run only cases whose name contains this")
+    parser.add_argument('--output', help="JSON file (default benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', metavar='JSON', help="earlier results to compare against")
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        selected = [case for case in cases(args) if not args.only or args.only in case[0]]
+    for name, fn, ops in selected:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()  # Warm up caches (occupancy grid, sweep tables, mesh cache)
+            results[name] = measure(fn, ops, args.repeats)
+        print(f"{name:36s} {results[name]['best_s'] * 1e6:12.1f} us/op "
+              f"(median {results[name]['median_s'] * 1e6:.1f}, {ops} ops x {args.repeats})")
+
+    output = args.output or os.path.join(RESULTS_DIR, f'{commit}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'commit': commit,
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'settings': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+            'results': results,
+        }, f, indent=1)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,502 @@
+# collision.py
+import math
+import numpy as np
+
+from pathfinding import OccupancyGrid
+
+def calculate_face_normal(vertices):
+    """Calculate the normal vector of a face"""
+    if len(vertices) < 3:
+        return [0, 1, 0]
+    
+    v1 = vertices[0]
+    v2 = vertices[1]
+    v3 = vertices[2]
+    
+    edge1 = [v2[0] - v1[0], v2[1] - v1[1], v2[2] - v1[2]]
+    edge2 = [v3[0] - v1[0], v3[1] - v1[1], v3[2] - v1[2]]
+    
+    normal = [
+        edge1[1] * edge2[2] - edge1[2] * edge2[1],
+        edge1[2] * edge2[0] - edge1[0] * edge2[2],
+        edge1[0] * edge2[1] - edge1[1] * edge2[0]
+    ]
+    
+    length = math.sqrt(normal[0]**2 + normal[1]**2 + normal[2]**2)
+    if length > 0:
+        normal = [normal[0]/length, normal[1]/length, normal[2]/length]
+    
+    return normal
+
+def classify_face(normal, vertices, min_y, max_y):
+    """Classify a face as floor, ceiling, wall, or obstacle"""
+    if abs(normal[1]) > 0.8:
+        if min_y < 0.5:
+            return 'floor'
+        else:
+            return 'ceiling'
+    
+    horizontal_strength = math.sqrt(normal[0]**2 + normal[2]**2)
+    if horizontal_strength > 0.3:
+        height = max_y - min_y
+        if height > 1.0:
+            return 'wall'
+        else:
+            return 'obstacle'
+    
+    return 'other'
+
+def extract_collision_faces(model):
+    """Extract wall and obstacle faces from a loaded OBJ model"""
+    collision_faces = []
+    
+    for face_data in model.faces:
+        vertices_indices, normals, texture_coords, material = face_data
+        
+        face_vertices = []
+        for vertex_index in vertices_indices:
+            if vertex_index <= len(model.vertices):
+                vertex = model.vertices[vertex_index - 1]
+                face_vertices.append([vertex[0], vertex[1], vertex[2]])
+        
+        if len(face_vertices) >= 3:
+            normal = calculate_face_normal(face_vertices)
+            min_y = min([v[1] for v in face_vertices])
+            max_y = max([v[1] for v in face_vertices])
+            face_type = classify_face(normal, face_vertices, min_y, max_y)
+            
+            if face_type in ['wall', 'obstacle']:
+                collision_faces.append({
+                    'vertices': face_vertices,
+                    'normal': normal,
+                    'type': face_type,
+                    'min_y': min_y,
+                    'max_y': max_y
+                })
+    
+    return collision_faces
+
+def face_aabb(vertices):
+    """(min_x, max_x, min_z, max_z) of a face's vertices"""
+    return (min([v[0] for v in vertices]), max([v[0] for v in vertices]),
+            min([v[2] for v in vertices]), max([v[2] for v in vertices]))
+
+def segment_box_distance(x0, z0, x1, z1, min_x, max_x, min_z, max_z):
+    """Distance in XZ from the segment (x0, z0)-(x1, z1) to a box, 0 if they overlap
+
+    Two disjoint convex shapes are closest at a vertex of one of them, so
+    the distance is the smallest of the segment endpoints to the box and
+    the box corners to the segment.
+    """
+    dx = x1 - x0
+    dz = z1 - z0
+
+    # Slab clip (Liang-Barsky): does the segment pass through the box?
+    t0, t1 = 0.0, 1.0
+    for start, delta, low, high in ((x0, dx, min_x, max_x), (z0, dz, min_z, max_z)):
+        if delta == 0:
+            if start < low or start > high:
+                t0, t1 = 1.0, 0.0
+                break
+            continue
+        a = (low - start) / delta
+        b = (high - start) / delta
+        if a > b:
+            a, b = b, a
+        t0 = max(t0, a)
+        t1 = min(t1, b)
+        if t0 > t1:
+            break
+    if t0 <= t1:
+        return 0.0
+
+    best = math.inf
+    for px, pz in ((x0, z0), (x1, z1)):
+        closest_x = max(min_x, min(px, max_x))
+        closest_z = max(min_z, min(pz, max_z))
+        best = min(best, math.sqrt((px - closest_x)**2 + (pz - closest_z)**2))
+
+    length_sq = dx * dx + dz * dz
+    for px in (min_x, max_x):
+        for pz in (min_z, max_z):
+            t = ((px - x0) * dx + (pz - z0) * dz) / length_sq if length_sq else 0.0
+            t = max(0.0, min(1.0, t))
+            best = min(best, math.sqrt((px - (x0 + t * dx))**2 + (pz - (z0 + t * dz))**2))
+    return best
+
+class CollisionBoxes:
+    """Bounding boxes of collision faces as a struct of float64 arrays
+
+    hits() is the vectorized form of main.check_collision_with_box and gives
+    bit-identical answers: the same min/max clamping, squares, sqrt and strict
+    comparison, all in IEEE double precision.
+    """
+
+    def __init__(self, faces):
+        rows = [face_aabb(face['vertices']) + (face['min_y'], face['max_y']) for face in faces]
+        data = np.array(rows, dtype=np.float64).reshape(-1, 6)
+        self.min_x = np.ascontiguousarray(data[:, 0])
+        self.max_x = np.ascontiguousarray(data[:, 1])
+        self.min_z = np.ascontiguousarray(data[:, 2])
+        self.max_z = np.ascontiguousarray(data[:, 3])
+        self.min_y = np.ascontiguousarray(data[:, 4])
+        self.max_y = np.ascontiguousarray(data[:, 5])
+
+    def __len__(self):
+        return len(self.min_x)
+
+    def rows(self):
+        """Boxes as (min_x, max_x, min_z, max_z, min_y, max_y) tuples of Python floats"""
+        return list(zip(self.min_x.tolist(), self.max_x.tolist(), self.min_z.tolist(),
+                        self.max_z.tolist(), self.min_y.tolist(), self.max_y.tolist()))
+
+    def hits(self, x, z, radius, min_y, max_y, indices=None):
+        """Circle-vs-box test of point(s) (x, z) against boxes; returns a bool array
+
+        x and z broadcast against indices (all boxes when None), so one point
+        can be tested against many boxes or many (point, box) pairs at once.
+        """
+        if indices is None:
+            indices = slice(None)
+        box_min_x = self.min_x[indices]
+        box_max_x = self.max_x[indices]
+        box_min_z = self.min_z[indices]
+        box_max_z = self.max_z[indices]
+
+        vertical = ~((max_y < self.min_y[indices]) | (min_y > self.max_y[indices]))
+
+        closest_x = np.maximum(box_min_x, np.minimum(x, box_max_x))
+        closest_z = np.maximum(box_min_z, np.minimum(z, box_max_z))
+
+        distance = np.sqrt((x - closest_x)**2 + (z - closest_z)**2)
+        return vertical & (distance < radius)
+
+class CollisionGrid:
+    """Uniform grid over the XZ plane indexing collision faces by their bounding boxes
+
+    Each face's AABB is computed once; a query only visits the faces stored in
+    the cells overlapped by the query circle.
+    """
+
+    def __init__(self, faces, cell_size=1.0):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.sweep_tables = {}
+        self.soa = CollisionBoxes(faces)
+        self.boxes = self.soa.rows()
+
+        for index, (min_x, max_x, min_z, max_z, _, _) in enumerate(self.boxes):
+            for cx in range(self.cell(min_x), self.cell(max_x) + 1):
+                for cz in range(self.cell(min_z), self.cell(max_z) + 1):
+                    self.cells.setdefault((cx, cz), []).append(index)
+
+        self.build_csr()
+
+    def build_csr(self):
+        """Flatten the cell dict into dense start/count arrays for vectorized lookups"""
+        if not self.cells:
+            self.origin = (0, 0)
+            self.shape = (0, 0)
+            self.cell_start = np.zeros(1, dtype=np.int64)
+            self.cell_items = np.zeros(0, dtype=np.int64)
+            return
+
+        xs = [cx for cx, cz in self.cells]
+        zs = [cz for cx, cz in self.cells]
+        self.origin = (min(xs), min(zs))
+        self.shape = (max(xs) - self.origin[0] + 1, max(zs) - self.origin[1] + 1)
+
+        counts = np.zeros(self.shape[0] * self.shape[1], dtype=np.int64)
+        for (cx, cz), items in self.cells.items():
+            counts[self.flat_cell(cx, cz)] = len(items)
+        self.cell_start = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.cell_start[1:])
+
+        self.cell_items = np.zeros(self.cell_start[-1], dtype=np.int64)
+        for (cx, cz), items in self.cells.items():
+            start = self.cell_start[self.flat_cell(cx, cz)]
+            self.cell_items[start:start + len(items)] = items
+
+    def flat_cell(self, cx, cz):
+        return (cx - self.origin[0]) * self.shape[1] + (cz - self.origin[1])
+
+    def cell(self, coord):
+        return math.floor(coord / self.cell_size)
+
+    def candidates(self, x, z, radius):
+        """Indices of faces whose cells overlap the circle's bounding square"""
+        # Pad by a hair so rounding in x +/- radius never drops a touching face
+        pad = radius + 1e-9
+        found = set()
+        for cx in range(self.cell(x - pad), self.cell(x + pad) + 1):
+            for cz in range(self.cell(z - pad), self.cell(z + pad) + 1):
+                found.update(self.cells.get((cx, cz), ()))
+        return found
+
+    def collides(self, x, z, radius, min_y, max_y):
+        """True if a vertical cylinder overlaps any indexed face's box
+
+        Same test as main.check_collision_with_box: vertical overlap, then
+        distance from (x, z) to the closest point of the box in XZ.
+        """
+        boxes = self.boxes
+        for index in self.candidates(x, z, radius):
+            box_min_x, box_max_x, box_min_z, box_max_z, box_min_y, box_max_y = boxes[index]
+            if max_y < box_min_y or min_y > box_max_y:
+                continue
+
+            closest_x = max(box_min_x, min(x, box_max_x))
+            closest_z = max(box_min_z, min(z, box_max_z))
+
+            distance = math.sqrt((x - closest_x)**2 + (z - closest_z)**2)
+            if distance < radius:
+                return True
+
+        return False
+
+    def segment_cells(self, x0, z0, x1, z1):
+        """Cells crossed by a segment, walked with a DDA (Amanatides & Woo)
+
+        Returns (cell, t_in, t_out) in order along the segment, where t is the
+        segment parameter (0 at (x0, z0), 1 at (x1, z1)) where it enters and
+        leaves the cell.
+        """
+        cx, cz = self.cell(x0), self.cell(z0)
+        end_x, end_z = self.cell(x1), self.cell(z1)
+        dx = x1 - x0
+        dz = z1 - z0
+        step_x = 1 if dx > 0 else -1
+        step_z = 1 if dz > 0 else -1
+        # Parameter at which the segment reaches the next cell boundary on each axis
+        next_x = ((cx + (dx > 0)) * self.cell_size - x0) / dx if dx else math.inf
+        next_z = ((cz + (dz > 0)) * self.cell_size - z0) / dz if dz else math.inf
+        delta_x = self.cell_size / abs(dx) if dx else math.inf
+        delta_z = self.cell_size / abs(dz) if dz else math.inf
+
+        cells = []
+        t_in = 0.0
+        for _ in range(abs(end_x - cx) + abs(end_z - cz)):
+            # Never step past the end cell on an axis, whatever the rounding in next_x/next_z
+            if cz != end_z and (cx == end_x or next_z <= next_x):
+                t_out = min(max(next_z, t_in), 1.0)
+                cells.append(((cx, cz), t_in, t_out))
+                cz += step_z
+                next_z += delta_z
+            else:
+                t_out = min(max(next_x, t_in), 1.0)
+                cells.append(((cx, cz), t_in, t_out))
+                cx += step_x
+                next_x += delta_x
+            t_in = t_out
+        cells.append(((cx, cz), t_in, 1.0))
+        return cells
+
+    def sweep_cells(self, radius, min_y, max_y):
+        """Boxes an actor of this size could touch from each cell, built once per size
+
+        Maps cell -> list of (min_x, max_x, min_z, max_z) for the boxes that
+        overlap the actor's vertical span and come within radius of the cell.
+        """
+        key = (radius, min_y, max_y)
+        cells = self.sweep_tables.get(key)
+        if cells is not None:
+            return cells
+
+        cells = {}
+        pad = radius + 1e-9
+        for box_min_x, box_max_x, box_min_z, box_max_z, box_min_y, box_max_y in self.boxes:
+            if max_y < box_min_y or min_y > box_max_y:
+                continue
+            box = (box_min_x, box_max_x, box_min_z, box_max_z)
+            for cx in range(self.cell(box_min_x - pad), self.cell(box_max_x + pad) + 1):
+                for cz in range(self.cell(box_min_z - pad), self.cell(box_max_z + pad) + 1):
+                    cells.setdefault((cx, cz), []).append(box)
+        self.sweep_tables[key] = cells
+        return cells
+
+    def sweep_hit(self, x0, z0, x1, z1, radius, min_y, max_y):
+        """First box (min_x, max_x, min_z, max_z) hit by a cylinder moved along the
+        segment (x0, z0)-(x1, z1), or None if the path is clear
+
+        Walks the cells along the segment in order and tests each piece of
+        the segment only against the boxes that can reach its cell, so the
+        cost grows with the cells crossed and stops at the first hit.
+        """
+        sweep_cells = self.sweep_cells(radius, min_y, max_y)
+        dx = x1 - x0
+        dz = z1 - z0
+        for cell, t_in, t_out in self.segment_cells(x0, z0, x1, z1):
+            boxes = sweep_cells.get(cell)
+            if not boxes:
+                continue
+            ax, az = x0 + t_in * dx, z0 + t_in * dz
+            bx, bz = x0 + t_out * dx, z0 + t_out * dz
+            lo_x, hi_x = min(ax, bx) - radius, max(ax, bx) + radius
+            lo_z, hi_z = min(az, bz) - radius, max(az, bz) + radius
+            for box in boxes:
+                box_min_x, box_max_x, box_min_z, box_max_z = box
+                if box_max_x < lo_x or box_min_x > hi_x or box_max_z < lo_z or box_min_z > hi_z:
+                    continue
+                if segment_box_distance(ax, az, bx, bz, box_min_x, box_max_x,
+                                        box_min_z, box_max_z) < radius:
+                    return box
+        return None
+
+    def sweep_clearance(self, x0, z0, x1, z1, radius, min_y, max_y, limit):
+        """(box hit, None) like sweep_hit, or (None, clearance) for a clear path
+
+        clearance is a lower bound on how much farther than radius the nearest
+        box is from the segment, capped at limit: any segment whose points each
+        stay within clearance of this one is clear as well. Boxes that can't
+        be hit are measured against the bounding box of the segment piece,
+        which is cheap and never overestimates.
+        """
+        sweep_cells = self.sweep_cells(radius + limit, min_y, max_y)
+        clearance = limit
+        dx = x1 - x0
+        dz = z1 - z0
+        for cell, t_in, t_out in self.segment_cells(x0, z0, x1, z1):
+            boxes = sweep_cells.get(cell)
+            if not boxes:
+                continue
+            ax, az = x0 + t_in * dx, z0 + t_in * dz
+            bx, bz = x0 + t_out * dx, z0 + t_out * dz
+            lo_x, hi_x = min(ax, bx), max(ax, bx)
+            lo_z, hi_z = min(az, bz), max(az, bz)
+            for box in boxes:
+                box_min_x, box_max_x, box_min_z, box_max_z = box
+                gap_x = max(box_min_x - hi_x, lo_x - box_max_x, 0.0)
+                gap_z = max(box_min_z - hi_z, lo_z - box_max_z, 0.0)
+                reach = radius + clearance
+                if gap_x >= reach or gap_z >= reach:
+                    continue
+                distance = math.sqrt(gap_x * gap_x + gap_z * gap_z)
+                if distance < radius:
+                    distance = segment_box_distance(ax, az, bx, bz, box_min_x, box_max_x,
+                                                    box_min_z, box_max_z)
+                    if distance < radius:
+                        return box, None
+                clearance = min(clearance, distance - radius)
+        return None, clearance
+
+    def sweep_collides(self, x0, z0, x1, z1, radius, min_y, max_y):
+        """True if a cylinder moved along the segment (x0, z0)-(x1, z1) overlaps any face's box"""
+        return self.sweep_hit(x0, z0, x1, z1, radius, min_y, max_y) is not None
+
+    def collides_many(self, xs, zs, radius, min_y, max_y):
+        """Vectorized collides() for arrays of points; returns a bool array"""
+        xs = np.atleast_1d(np.asarray(xs, dtype=np.float64))
+        zs = np.atleast_1d(np.asarray(zs, dtype=np.float64))
+        result = np.zeros(len(xs), dtype=bool)
+        if not len(xs) or not len(self.cell_items):
+            return result
+
+        pad = radius + 1e-9
+        cx0 = np.floor((xs - pad) / self.cell_size).astype(np.int64)
+        cx1 = np.floor((xs + pad) / self.cell_size).astype(np.int64)
+        cz0 = np.floor((zs - pad) / self.cell_size).astype(np.int64)
+        cz1 = np.floor((zs + pad) / self.cell_size).astype(np.int64)
+        span_x = int((cx1 - cx0).max()) + 1
+        span_z = int((cz1 - cz0).max()) + 1
+
+        # (point, cell) pairs for every cell overlapped by each point's square
+        points = []
+        cells = []
+        for dx in range(span_x):
+            for dz in range(span_z):
+                cx = cx0 + dx
+                cz = cz0 + dz
+                ok = (cx <= cx1) & (cz <= cz1)
+                gx = cx - self.origin[0]
+                gz = cz - self.origin[1]
+                ok &= (gx >= 0) & (gx < self.shape[0]) & (gz >= 0) & (gz < self.shape[1])
+                points.append(np.nonzero(ok)[0])
+                cells.append(gx[ok] * self.shape[1] + gz[ok])
+        points = np.concatenate(points)
+        cells = np.concatenate(cells)
+
+        # Expand to (point, box) pairs through the CSR cell table
+        starts = self.cell_start[cells]
+        counts = self.cell_start[cells + 1] - starts
+        pair_points = np.repeat(points, counts)
+        first = np.cumsum(counts) - counts
+        offsets = np.arange(len(pair_points)) - np.repeat(first, counts)
+        pair_boxes = self.cell_items[np.repeat(starts, counts) + offsets]
+
+        hit = self.soa.hits(xs[pair_points], zs[pair_points], radius, min_y, max_y, pair_boxes)
+        result[pair_points[hit]] = True
+        return result
+
+class CollisionWorld:
+    """Collision geometry of the map, shared by the player and the monsters
+
+    Owns the face index and the map boundary; queries take the actor's radius,
+    center height and height so one world serves actors of any size.
+    """
+
+    def __init__(self, faces, boundary, cell_size=1.0):
+        self.faces = faces
+        self.boundary = boundary
+        self.grid = CollisionGrid(faces, cell_size)
+        self.occupancy_grids = {}
+
+    @classmethod
+    def from_obj(cls, model, boundary, cell_size=1.0):
+        """Build a world from a loaded OBJ map (or an empty one for None)"""
+        faces = extract_collision_faces(model) if model else []
+        return cls(faces, boundary, cell_size)
+
+    def in_bounds(self, x, z, boundary=None):
+        if boundary is None:
+            boundary = self.boundary
+        return not (abs(x) > boundary or abs(z) > boundary)
+
+    def collides(self, x, z, radius, y, height):
+        """True if a cylinder of the given radius/height centered at y hits a wall or obstacle"""
+        return self.grid.collides(x, z, radius, y - height/2, y + height/2)
+
+    def collides_many(self, xs, zs, radius, y, height):
+        """Vectorized collides() over arrays of positions"""
+        return self.grid.collides_many(xs, zs, radius, y - height/2, y + height/2)
+
+    def sweep_collides(self, x0, z0, x1, z1, radius, y, height):
+        """True if a cylinder moved in a straight line from (x0, z0) to (x1, z1) hits anything"""
+        return self.grid.sweep_collides(x0, z0, x1, z1, radius, y - height/2, y + height/2)
+
+    def sweep_hit(self, x0, z0, x1, z1, radius, y, height):
+        """The box such a sweep hits first (see CollisionGrid.sweep_hit), or None"""
+        return self.grid.sweep_hit(x0, z0, x1, z1, radius, y - height/2, y + height/2)
+
+    def sweep_clearance(self, x0, z0, x1, z1, radius, y, height, limit):
+        """(box hit, None) or (None, clearance) for such a sweep (see CollisionGrid.sweep_clearance)"""
+        return self.grid.sweep_clearance(x0, z0, x1, z1, radius, y - height/2, y + height/2, limit)
+
+    def is_segment_clear(self, x0, z0, x1, z1, radius, y, height, boundary=None):
+        """Every point of the segment is a valid position (the square boundary is convex,
+        so checking both endpoints covers the whole segment)"""
+        return (self.in_bounds(x0, z0, boundary) and self.in_bounds(x1, z1, boundary) and
+                not self.sweep_collides(x0, z0, x1, z1, radius, y, height))
+
+    def is_position_valid(self, x, z, radius, y, height, boundary=None):
+        """Inside the boundary and not colliding"""
+        return self.in_bounds(x, z, boundary) and not self.collides(x, z, radius, y, height)
+
+    def occupancy(self, grid_size, offset, radius, y, height, boundary=None, cache_path=None):
+        """OccupancyGrid for an actor's size, built once per world and optionally cached on disk"""
+        if boundary is None:
+            boundary = self.boundary
+        params = (grid_size, offset, radius, y, height, boundary)
+        grid = self.occupancy_grids.get(params)
+        if grid is not None:
+            return grid
+
+        key = OccupancyGrid.cache_key(self, *params) if cache_path else None
+        if cache_path:
+            grid = OccupancyGrid.load(cache_path, key)
+        if grid is None:
+            grid = OccupancyGrid.build(self, *params)
+            if cache_path:
+                grid.save(cache_path, key)
+
+        self.occupancy_grids[params] = grid
+        return grid
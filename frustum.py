@@ -0,0 +1,104 @@
+# frustum.py
+import math
+
+import numpy as np
+
+def perspective_matrix(fovy, aspect, znear, zfar):
+    """The matrix gluPerspective builds"""
+    f = 1.0 / math.tan(math.radians(fovy) / 2)
+    return np.array([
+        [f / aspect, 0, 0, 0],
+        [0, f, 0, 0],
+        [0, 0, (zfar + znear) / (znear - zfar), 2 * zfar * znear / (znear - zfar)],
+        [0, 0, -1, 0],
+    ])
+
+def look_at_matrix(eye, center, up):
+    """The matrix gluLookAt builds"""
+    eye = np.asarray(eye, dtype=float)
+    forward = np.asarray(center, dtype=float) - eye
+    forward /= np.linalg.norm(forward)
+    side = np.cross(forward, up)
+    side /= np.linalg.norm(side)
+    true_up = np.cross(side, forward)
+    m = np.identity(4)
+    m[0, :3] = side
+    m[1, :3] = true_up
+    m[2, :3] = -forward
+    m[:3, 3] = -m[:3, :3] @ eye
+    return m
+
+class Frustum:
+    """The six clip planes of a camera, for testing bounding boxes against the view
+
+    planes is a (6, 4) array of (a, b, c, d) with normals pointing inward:
+    a point p is inside a plane when a*x + b*y + c*z + d >= 0.
+    """
+
+    def __init__(self, planes):
+        self.planes = planes
+
+    @classmethod
+    def from_matrix(cls, clip):
+        """Planes of a combined projection * modelview matrix (Gribb/Hartmann)"""
+        planes = np.array([
+            clip[3] + clip[0], clip[3] - clip[0],  # Left, right
+            clip[3] + clip[1], clip[3] - clip[1],  # Bottom, top
+            clip[3] + clip[2], clip[3] - clip[2],  # Near, far
+        ])
+        return cls(planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True))
+
+    @classmethod
+    def from_camera(cls, fovy, aspect, znear, zfar, eye, center, up=(0, 1, 0)):
+        """Frustum of the view set up by gluPerspective and gluLookAt with these arguments
+
+        Built directly from the camera basis, which is the same as
+        from_matrix(perspective_matrix(...) @ look_at_matrix(...)) but
+        cheap enough to do every frame.
+        """
+        ex, ey, ez = eye
+        fx, fy, fz = center[0] - ex, center[1] - ey, center[2] - ez
+        length = math.sqrt(fx * fx + fy * fy + fz * fz)
+        fx, fy, fz = fx / length, fy / length, fz / length
+        # side = forward x up, true up = side x forward
+        sx, sy, sz = fy * up[2] - fz * up[1], fz * up[0] - fx * up[2], fx * up[1] - fy * up[0]
+        length = math.sqrt(sx * sx + sy * sy + sz * sz)
+        sx, sy, sz = sx / length, sy / length, sz / length
+        ux, uy, uz = sy * fz - sz * fy, sz * fx - sx * fz, sx * fy - sy * fx
+
+        tan_v = math.tan(math.radians(fovy) / 2)
+        tan_h = tan_v * aspect
+        planes = []
+        for (ax, ay, az), tan in (((sx, sy, sz), tan_h), ((-sx, -sy, -sz), tan_h),
+                                  ((ux, uy, uz), tan_v), ((-ux, -uy, -uz), tan_v)):
+            # Side planes through the eye: a point is inside when its offset along the
+            # axis is at least -tan times its depth along forward
+            nx, ny, nz = ax + tan * fx, ay + tan * fy, az + tan * fz
+            length = math.sqrt(nx * nx + ny * ny + nz * nz)
+            nx, ny, nz = nx / length, ny / length, nz / length
+            planes.append((nx, ny, nz, -(nx * ex + ny * ey + nz * ez)))
+        depth = fx * ex + fy * ey + fz * ez
+        planes.append((fx, fy, fz, -depth - znear))
+        planes.append((-fx, -fy, -fz, depth + zfar))
+        return cls(np.array(planes))
+
+    def boxes_visible(self, mins, maxs):
+        """Boolean per axis-aligned box (rows of mins/maxs) that is at least partly inside
+
+        Conservative: a box near a frustum corner may pass without
+        intersecting it, but no box that intersects it is rejected.
+        """
+        normals = self.planes[:, :3]
+        # For each plane, the box corner furthest along its normal
+        far_corners = np.where(normals[None] > 0, maxs[:, None], mins[:, None])
+        distances = (far_corners * normals[None]).sum(axis=2) + self.planes[:, 3]
+        return (distances >= 0).all(axis=1)
+
+    def box_visible(self, box_min, box_max):
+        for a, b, c, d in self.planes:
+            x = box_max[0] if a > 0 else box_min[0]
+            y = box_max[1] if b > 0 else box_min[1]
+            z = box_max[2] if c > 0 else box_min[2]
+            if a * x + b * y + c * z + d < 0:
+                return False
+        return True
@@ -0,0 +1,78 @@
+# gl_recorder.py
+from collections import Counter
+from contextlib import contextmanager
+import itertools
+
+DRAW_CALLS = ('glDrawElements', 'glDrawArrays', 'glCallList', 'glBegin')
+
+class GLRecorder:
+    """Records OpenGL calls instead of issuing them, so rendering code can run without a GPU
+
+    Usage:
+        recorder = GLRecorder()
+        with recorder.patch(objloader, mesh_renderer):
+            model = OBJ('backroom.obj')
+            recorder.reset()
+            model.render()
+        recorder.draw_calls()
+    """
+
+    def __init__(self):
+        self.calls = []
+        self._names = itertools.count(1)
+
+    def reset(self):
+        """Forget recorded calls (object names keep counting up)"""
+        self.calls = []
+
+    def counts(self):
+        """Number of calls per GL function"""
+        return Counter(name for name, args in self.calls)
+
+    def count(self, name):
+        return sum(1 for call, args in self.calls if call == name)
+
+    def draw_calls(self):
+        """Number of calls that submit geometry"""
+        return sum(1 for name, args in self.calls if name in DRAW_CALLS)
+
+    def _gen_names(self, n=1, *args):
+        if n == 1:
+            return next(self._names)
+        return [next(self._names) for _ in range(n)]
+
+    def _result(self, name, args):
+        if name in ('glGenBuffers', 'glGenTextures', 'glGenFramebuffers', 'glGenRenderbuffers'):
+            return self._gen_names(*args)
+        if name == 'glGenLists':
+            first = next(self._names)
+            for _ in range(1, args[0]):
+                next(self._names)
+            return first
+        if name == 'gluNewQuadric':
+            return object()
+        if name in ('glGetError', 'glCheckFramebufferStatus'):
+            return 0
+        return None
+
+    def _recording(self, name):
+        def call(*args):
+            self.calls.append((name, args))
+            return self._result(name, args)
+        call.__name__ = name
+        return call
+
+    @contextmanager
+    def patch(self, *modules):
+        """Replace the gl*/glu* functions imported into each module for the duration"""
+        saved = []
+        for module in modules:
+            for name, value in list(vars(module).items()):
+                if name.startswith('gl') and callable(value):
+                    saved.append((module, name, value))
+                    setattr(module, name, self._recording(name))
+        try:
+            yield self
+        finally:
+            for module, name, value in saved:
+                setattr(module, name, value)
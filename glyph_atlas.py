@@ -0,0 +1,156 @@
+# glyph_atlas.py
+import numpy as np
+import pygame
+from OpenGL.GL import *
+
+CHARSET = ''.join(chr(c) for c in range(32, 127)) + 'ÁÉÍÓÚÑÜáéíóúñü¡¿'
+
+class GlyphAtlas:
+    """One pygame font rasterized once into a single texture, drawing each string as one quad batch
+
+    Layouts (glyph quads at the origin) are cached per string, so text that
+    doesn't change costs no Python work after the first frame. Characters
+    outside the charset are drawn as '?'.
+    """
+
+    def __init__(self, size, font_name=None, charset=CHARSET, padding=1, max_layouts=256):
+        pygame.font.init()
+        self.size = size
+        self.font = pygame.font.Font(font_name, size)
+        self.line_height = self.font.get_linesize()
+        self.max_layouts = max_layouts
+        self.layouts = {}  # text -> (positions, texcoords, width, height)
+        self.texture = 0
+        self.build(charset, padding)
+
+    def build(self, charset, padding):
+        """Render every glyph into one surface, packed in rows, and record its texcoords"""
+        surfaces = {ch: self.font.render(ch, True, (255, 255, 255)) for ch in charset}
+        glyph_height = max(s.get_height() for s in surfaces.values())
+        width = 512
+        while True:
+            x, rows = padding, 1
+            for surface in surfaces.values():
+                if x + surface.get_width() + padding > width:
+                    x, rows = padding, rows + 1
+                x += surface.get_width() + padding
+            height = rows * (glyph_height + padding) + padding
+            if height <= width:
+                break
+            width *= 2
+
+        atlas = pygame.Surface((width, height), pygame.SRCALPHA)
+        atlas.fill((255, 255, 255, 0))
+        self.glyphs = {}  # char -> (advance, height, u0, v0, u1, v1)
+        x, y = padding, padding
+        for ch, surface in surfaces.items():
+            w, h = surface.get_size()
+            if x + w + padding > width:
+                x, y = padding, y + glyph_height + padding
+            atlas.blit(surface, (x, y))
+            # The pixels are uploaded bottom row first, so v runs up from the bottom
+            self.glyphs[ch] = (w, h, x / width, 1 - (y + h) / height, (x + w) / width, 1 - y / height)
+            x += w + padding
+
+        self.pixels = pygame.image.tostring(atlas, "RGBA", True)
+        self.atlas_size = (width, height)
+
+    def upload(self):
+        """Create the atlas texture if it doesn't exist yet (needs a GL context; done on first draw)"""
+        if self.texture:
+            return
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, *self.atlas_size, 0, GL_RGBA, GL_UNSIGNED_BYTE,
+                     self.pixels)
+
+    def measure(self, text):
+        """(width, height) in pixels of text drawn at scale 1"""
+        return self.layout(text)[2:]
+
+    def layout(self, text):
+        """Quad corners and texcoords for text with its first line's bottom-left at the origin"""
+        cached = self.layouts.get(text)
+        if cached is not None:
+            return cached
+
+        positions, texcoords = [], []
+        width = 0
+        lines = text.split('\n')
+        for row, line in enumerate(lines):
+            x = 0
+            y = -row * self.line_height
+            for ch in line:
+                w, h, u0, v0, u1, v1 = self.glyphs.get(ch) or self.glyphs['?']
+                positions += [(x, y), (x + w, y), (x + w, y + h), (x, y + h)]
+                texcoords += [(u0, v0), (u1, v0), (u1, v1), (u0, v1)]
+                x += w
+            width = max(width, x)
+        height = len(lines) * self.line_height
+        cached = (np.array(positions, dtype=np.float32).reshape(-1, 2),
+                  np.array(texcoords, dtype=np.float32).reshape(-1, 2), width, height)
+
+        if len(self.layouts) >= self.max_layouts:
+            self.layouts.clear()
+        self.layouts[text] = cached
+        return cached
+
+    def draw(self, text, x, y, color=(1.0, 1.0, 1.0, 1.0), scale=1.0, align='left'):
+        """Draw text in the current 2D projection with one glDrawArrays
+
+        (x, y) is the bottom-left of the first line, or its bottom-center
+        with align='center'. color is RGB or RGBA.
+        """
+        positions, texcoords, width, height = self.layout(text)
+        if not len(positions):
+            return
+        self.upload()
+        if align == 'center':
+            x -= width * scale / 2
+
+        glPushAttrib(GL_ENABLE_BIT | GL_COLOR_BUFFER_BIT | GL_CURRENT_BIT | GL_TEXTURE_BIT)
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        glEnable(GL_TEXTURE_2D)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        if len(color) == 4:
+            glColor4f(*color)
+        else:
+            glColor3f(*color)
+
+        glPushMatrix()
+        glTranslatef(x, y, 0)
+        glScalef(scale, scale, 1)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, positions)
+        glTexCoordPointer(2, GL_FLOAT, 0, texcoords)
+        glDrawArrays(GL_QUADS, 0, len(positions))
+        glPopMatrix()
+
+        glPopClientAttrib()
+        glPopAttrib()
+
+    def free(self):
+        """Delete the atlas texture"""
+        if self.texture:
+            glDeleteTextures([self.texture])
+            self.texture = 0
+
+atlases = {}
+
+def get_atlas(size, font_name=None):
+    """Shared atlas for a font and size, built on first use"""
+    key = (font_name, size)
+    atlas = atlases.get(key)
+    if atlas is None:
+        atlas = atlases[key] = GlyphAtlas(size, font_name)
+    return atlas
+
+def free_atlases():
+    for atlas in atlases.values():
+        atlas.free()
+    atlases.clear()
@@ -5,6 +5,8 @@ from pygame.locals import *
 import os
 import sys
 import time
+import random
+import argparse
 
 # OpenGL libraries
 from OpenGL.GL import *
@@ -19,6 +21,15 @@ from monster import Monster
 from game_over import GameOverScreen
 from collectible import CollectibleManager
 from win_screen import WinScreen
+from asset_loader import AssetLoader
+from collision import CollisionWorld
+from timestep import FixedTimestep
+from frustum import Frustum
+from visibility import PotentiallyVisibleSet, pvs_cache_path
+from profiler import profiler
+from glyph_atlas import get_atlas, free_atlases
+from texture_registry import text_textures
+from overlay import CompiledOverlay, FrameCapture, begin_2d, draw_rect, end_2d
 
 # Game constants
 SCREEN_WIDTH = 1200
@@ -27,12 +38,21 @@ PLAYER_RADIUS = 0.3
 PLAYER_HEIGHT = 1.0
 MOVEMENT_SPEED = 0.3
 ROTATION_SPEED = 3.5
+HUD_FONT_SIZE = 36
+MAP_CHUNK_SIZE = 4.0  # Side of the map's render chunks (None: one unculled buffer)
+FRUSTUM_CULLING = True  # Skip map chunks outside the view
+PVS_CULLING = True  # Skip map chunks the player's cell can't see (see visibility.py)
+DRAW_DISTANCE = 16.0  # Fog end and far clip plane: nothing further away is drawn
+FOG_START = 8.0  # Distance where the fog starts to thicken
+LEVEL_OF_DETAIL = True  # Simplify distant map chunks and the monster, and skip it past DRAW_DISTANCE
 MAP_BOUNDARY = 10.0 # 20.0 PARA EL OG
+TICK_RATE = 60  # Game updates per second
+MAX_FPS = 0  # Frame rate cap for rendering (0: uncapped)
 
 # Camera/Observer variables
 FOVY = 60.0
 ZNEAR = 0.1
-ZFAR = 1000.0
+ZFAR = DRAW_DISTANCE
 
 # Initial camera position
 EYE_X = 0.0
@@ -49,38 +69,31 @@ UP_Z = 0
 direction = [1.0, 0.0, 0.0]
 theta = 0.0
 
+camera_frustum = None  # View frustum of the last update_camera
+camera_eye = (EYE_X, EYE_Y, EYE_Z)  # and its interpolated eye position
+camera_chunks = None  # Map chunks potentially visible from its eye (None: all)
+
+# Player state at the previous tick, for interpolated rendering
+PREV_EYE_X = EYE_X
+PREV_EYE_Z = EYE_Z
+PREV_THETA = theta
+
 # Game objects
 map_model = None
 collision_faces = []
+collision_world = None
+map_pvs = None  # Potentially visible map chunks per cell of the player area
 monster = None
 game_over_screen = None
 win_screen = None
 collectible_manager = None
 game_state = "playing"  # "playing", "game_over", or "won"
-
-def calculate_face_normal(vertices):
-    """Calculate the normal vector of a face"""
-    if len(vertices) < 3:
-        return [0, 1, 0]
-    
-    v1 = vertices[0]
-    v2 = vertices[1]
-    v3 = vertices[2]
-    
-    edge1 = [v2[0] - v1[0], v2[1] - v1[1], v2[2] - v1[2]]
-    edge2 = [v3[0] - v1[0], v3[1] - v1[1], v3[2] - v1[2]]
-    
-    normal = [
-        edge1[1] * edge2[2] - edge1[2] * edge2[1],
-        edge1[2] * edge2[0] - edge1[0] * edge2[2],
-        edge1[0] * edge2[1] - edge1[1] * edge2[0]
-    ]
-    
-    length = math.sqrt(normal[0]**2 + normal[1]**2 + normal[2]**2)
-    if length > 0:
-        normal = [normal[0]/length, normal[1]/length, normal[2]/length]
-    
-    return normal
+end_background = None  # Last gameplay frame, shown behind the end screens
+hud_overlay = None  # HUD display list and the text it shows
+hud_text = None
+show_profiler = False  # F3: frame-time graph over the HUD
+PROFILER_COLORS = [(0.2, 0.6, 1.0), (1.0, 0.4, 0.2), (0.3, 0.9, 0.3), (1.0, 0.9, 0.2),
+                   (0.8, 0.3, 0.9), (0.2, 0.9, 0.9)]
 
 def init_opengl():
     """Initialize OpenGL settings"""
@@ -98,6 +111,13 @@ def init_opengl():
     
     glClearColor(0.1, 0.1, 0.1, 1.0)
     glEnable(GL_DEPTH_TEST)
+    
+    # Fog in the clear color, thickening up to the far plane, hides where drawing stops
+    glEnable(GL_FOG)
+    glFogi(GL_FOG_MODE, GL_LINEAR)
+    glFogfv(GL_FOG_COLOR, [0.1, 0.1, 0.1, 1.0])
+    glFogf(GL_FOG_START, FOG_START)
+    glFogf(GL_FOG_END, DRAW_DISTANCE)
     glEnable(GL_LIGHTING)
     glEnable(GL_LIGHT0)
     
@@ -114,10 +134,11 @@ def load_map(obj_filename):
     global map_model, collision_faces
     try:
         if os.path.exists(obj_filename):
-            map_model = OBJ(obj_filename, swapyz=False)
+            map_model = OBJ(obj_filename, swapyz=False, chunk_size=MAP_CHUNK_SIZE)
             extract_collision_data()
             print(f"Map loaded successfully: {obj_filename}")
             print(f"Collision faces extracted: {len(collision_faces)}")
+            load_visibility(obj_filename)
         else:
             print(f"Map file not found: {obj_filename}")
             print("Creating a simple floor plane instead...")
@@ -126,59 +147,122 @@ def load_map(obj_filename):
         print(f"Error loading map: {e}")
         map_model = None
 
+def draw_loading_screen(progress):
+    """Draw a progress bar while assets load"""
+    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+    
+    glPushAttrib(GL_ENABLE_BIT | GL_CURRENT_BIT)
+    glDisable(GL_DEPTH_TEST)
+    glDisable(GL_LIGHTING)
+    
+    glMatrixMode(GL_PROJECTION)
+    glPushMatrix()
+    glLoadIdentity()
+    glOrtho(0, SCREEN_WIDTH, 0, SCREEN_HEIGHT, -1, 1)
+    glMatrixMode(GL_MODELVIEW)
+    glPushMatrix()
+    glLoadIdentity()
+    
+    left = SCREEN_WIDTH * 0.25
+    right = SCREEN_WIDTH * 0.75
+    bottom = SCREEN_HEIGHT * 0.5 - 10
+    top = SCREEN_HEIGHT * 0.5 + 10
+    
+    # Bar outline
+    glColor3f(0.5, 0.5, 0.3)
+    glBegin(GL_LINE_LOOP)
+    glVertex2f(left, bottom)
+    glVertex2f(right, bottom)
+    glVertex2f(right, top)
+    glVertex2f(left, top)
+    glEnd()
+    
+    # Filled part, in the backrooms yellow
+    fill = left + (right - left) * progress
+    glColor3f(0.8, 0.8, 0.4)
+    glBegin(GL_QUADS)
+    glVertex2f(left, bottom)
+    glVertex2f(fill, bottom)
+    glVertex2f(fill, top)
+    glVertex2f(left, top)
+    glEnd()
+    
+    glPopMatrix()
+    glMatrixMode(GL_PROJECTION)
+    glPopMatrix()
+    glMatrixMode(GL_MODELVIEW)
+    glPopAttrib()
+
+def load_assets(map_filename):
+    """Load the map and monster model on worker threads while showing a loading bar
+
+    Returns the preloaded monster model (or None), or False if the window was closed.
+    """
+    global map_model
+    
+    loader = AssetLoader()
+    map_job = (loader.load_obj(map_filename, chunk_size=MAP_CHUNK_SIZE)
+               if os.path.exists(map_filename) else None)
+    monster_job = loader.load_obj('monster.obj')
+    clock = pygame.time.Clock()
+    
+    while not loader.update():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                loader.shutdown()
+                return False
+        draw_loading_screen(loader.progress())
+        pygame.display.flip()
+        clock.tick(60)
+    
+    loader.report()
+    loader.shutdown()
+    
+    if map_job is None:
+        print(f"Map file not found: {map_filename}")
+        print("Creating a simple floor plane instead...")
+        map_model = None
+    elif map_job.error:
+        print(f"Error loading map: {map_job.error}")
+        map_model = None
+    else:
+        map_model = map_job.model
+        print(f"Map loaded successfully: {map_filename}")
+    
+    extract_collision_data()
+    print(f"Collision faces extracted: {len(collision_faces)}")
+    load_visibility(map_filename)
+    
+    return monster_job.model
+
 def extract_collision_data():
     """Extract collision geometry from the loaded OBJ model"""
-    global collision_faces
-    collision_faces = []
-    
-    if not map_model:
-        return
+    global collision_faces, collision_world
     
-    print("Analyzing map geometry...")
+    if map_model:
+        print("Analyzing map geometry...")
     
-    for face_data in map_model.faces:
-        vertices_indices, normals, texture_coords, material = face_data
-        
-        face_vertices = []
-        for vertex_index in vertices_indices:
-            if vertex_index <= len(map_model.vertices):
-                vertex = map_model.vertices[vertex_index - 1]
-                face_vertices.append([vertex[0], vertex[1], vertex[2]])
-        
-        if len(face_vertices) >= 3:
-            normal = calculate_face_normal(face_vertices)
-            min_y = min([v[1] for v in face_vertices])
-            max_y = max([v[1] for v in face_vertices])
-            face_type = classify_face(normal, face_vertices, min_y, max_y)
-            
-            if face_type in ['wall', 'obstacle']:
-                collision_faces.append({
-                    'vertices': face_vertices,
-                    'normal': normal,
-                    'type': face_type,
-                    'min_y': min_y,
-                    'max_y': max_y
-                })
-    
-    print(f"Found {len(collision_faces)} collision faces")
-
-def classify_face(normal, vertices, min_y, max_y):
-    """Classify a face as floor, ceiling, wall, or obstacle"""
-    if abs(normal[1]) > 0.8:
-        if min_y < 0.5:
-            return 'floor'
-        else:
-            return 'ceiling'
+    collision_world = CollisionWorld.from_obj(map_model, MAP_BOUNDARY)
+    collision_faces = collision_world.faces
     
-    horizontal_strength = math.sqrt(normal[0]**2 + normal[2]**2)
-    if horizontal_strength > 0.3:
-        height = max_y - min_y
-        if height > 1.0:
-            return 'wall'
-        else:
-            return 'obstacle'
+    if map_model:
+        print(f"Found {len(collision_faces)} collision faces")
+
+def load_visibility(obj_filename):
+    """Load the map's potentially visible sets from their cache (built offline by visibility.py)"""
+    global map_pvs
+    map_pvs = None
+    if not (PVS_CULLING and map_model and map_model.buffers and map_model.buffers.chunks):
+        return
     
-    return 'other'
+    buffers = map_model.buffers
+    map_pvs = PotentiallyVisibleSet.load_cached(pvs_cache_path(obj_filename), collision_world,
+                                                buffers.chunk_mins, buffers.chunk_maxs, MAP_BOUNDARY)
+    if map_pvs is None:
+        print(f"No potentially visible sets for {obj_filename}; run 'python visibility.py "
+              f"{obj_filename}' to build them")
+    else:
+        print(f"Map chunks potentially visible per cell: {map_pvs.visible_fraction() * 100:.0f}%")
 
 def check_collision_with_box(new_x, new_z, box_vertices, box_min_y, box_max_y):
     """Check collision between player cylinder and a box-shaped obstacle"""
@@ -203,6 +287,13 @@ def check_collision_with_box(new_x, new_z, box_vertices, box_min_y, box_max_y):
 
 def check_collision(new_x, new_z, radius=PLAYER_RADIUS):
     """Improved collision detection for Backrooms geometry"""
+    if collision_world is None:
+        return False
+    
+    return collision_world.collides(new_x, new_z, radius, EYE_Y, PLAYER_HEIGHT)
+
+def check_collision_linear(new_x, new_z, radius=PLAYER_RADIUS):
+    """Test every collision face in turn (reference for the grid index)"""
     for face in collision_faces:
         vertices = face['vertices']
         face_type = face['type']
@@ -268,65 +359,98 @@ def draw_axes():
     glEnable(GL_LIGHTING)
 
 def draw_hud():
-    """Draw HUD with collectible count"""
+    """Draw HUD with collectible count (recompiled only when the count changes)"""
+    global hud_overlay, hud_text
     if game_state != "playing" or not collectible_manager:
         return
     
-    # Save current OpenGL state
-    glPushAttrib(GL_ALL_ATTRIB_BITS)
-    glPushMatrix()
-    
-    # Configure for 2D rendering
-    glDisable(GL_DEPTH_TEST)
-    glDisable(GL_LIGHTING)
-    
-    # Switch to orthographic projection
-    glMatrixMode(GL_PROJECTION)
-    glPushMatrix()
-    glLoadIdentity()
-    glOrtho(0, SCREEN_WIDTH, 0, SCREEN_HEIGHT, -1, 1)
-    
-    glMatrixMode(GL_MODELVIEW)
-    glLoadIdentity()
-    
     # Draw collectible counter
     collected = collectible_manager.get_collected_count()
     total = collectible_manager.num_items
+    text = f"Items: {collected}/{total}"
+    
+    if text != hud_text or hud_overlay is None:
+        if hud_overlay:
+            hud_overlay.free()
+        hud_text = text
+        hud_overlay = CompiledOverlay(lambda: draw_hud_overlay(text), [get_atlas(HUD_FONT_SIZE)])
+    hud_overlay.draw()
+
+def draw_hud_overlay(text):
+    """GL calls of the HUD showing text"""
+    font = get_atlas(HUD_FONT_SIZE)
+    width, height = font.measure(text)
+    begin_2d(SCREEN_WIDTH, SCREEN_HEIGHT)
     
     # Background for counter
-    # glColor4f(0.0, 0.0, 0.0, 0.7)
-    # glBegin(GL_QUADS)
-    # glVertex2f(10, SCREEN_HEIGHT - 60)
-    # glVertex2f(200, SCREEN_HEIGHT - 60)
-    # glVertex2f(200, SCREEN_HEIGHT - 10)
-    # glVertex2f(10, SCREEN_HEIGHT - 10)
-    # glEnd()
-    
-    # Text (simplified - just showing concept)
-    glColor3f(1.0, 1.0, 1.0)
-    glLineWidth(2.0)
+    draw_rect(10, SCREEN_HEIGHT - 20 - height, 30 + width, SCREEN_HEIGHT - 10, (0.0, 0.0, 0.0, 0.7))
     
-    # Draw "Items: X/Y" using simple lines
-    # This is a simplified representation - in a real game you'd use proper text rendering
+    # "Items: X/Y"
+    font.draw(text, 20, SCREEN_HEIGHT - 15 - height, (1.0, 1.0, 1.0))
     
-    # Restore projection
-    glMatrixMode(GL_PROJECTION)
-    glPopMatrix()
-    glMatrixMode(GL_MODELVIEW)
+    end_2d()
+
+def draw_profiler_overlay(bar_width=2, ms_height=10):
+    """Stacked bars of the recorded frames' section times, with a line at the tick budget"""
+    if not profiler.frames:
+        return
+    names = profiler.columns()[0]
+    frames = list(profiler.frames)[-(SCREEN_WIDTH - 20) // bar_width:]
     
-    # Restore OpenGL state
-    glPopMatrix()
-    glPopAttrib()
+    begin_2d(SCREEN_WIDTH, SCREEN_HEIGHT)
+    
+    glBegin(GL_QUADS)
+    for i, frame in enumerate(frames):
+        x = 10 + i * bar_width
+        y = 10.0
+        for j, name in enumerate(names):
+            height = frame['times'].get(name, 0.0) * 1000 * ms_height
+            glColor3f(*PROFILER_COLORS[j % len(PROFILER_COLORS)])
+            glVertex2f(x, y)
+            glVertex2f(x + bar_width, y)
+            glVertex2f(x + bar_width, y + height)
+            glVertex2f(x, y + height)
+            y += height
+    glEnd()
+    
+    budget = 10 + 1000.0 / TICK_RATE * ms_height
+    glColor3f(1.0, 1.0, 1.0)
+    glBegin(GL_LINES)
+    glVertex2f(10, budget)
+    glVertex2f(10 + len(frames) * bar_width, budget)
+    glEnd()
+    
+    end_2d()
+
+def enable_profiler():
+    """Record frame times, draw calls and collision queries from now on"""
+    import collectible, mesh_renderer, objloader, monster as monster_module
+    profiler.enable(sys.modules[__name__], objloader, mesh_renderer, collectible, monster_module)
 
-def update_camera():
-    """Update camera position and orientation"""
-    global CENTER_X, CENTER_Z
-    CENTER_X = EYE_X + direction[0]
-    CENTER_Z = EYE_Z + direction[2]
+def update_camera(alpha=1.0):
+    """Update camera position and orientation, alpha of the way from the previous tick"""
+    global CENTER_X, CENTER_Z, camera_frustum, camera_chunks, camera_eye
+    eye_x = PREV_EYE_X + (EYE_X - PREV_EYE_X) * alpha
+    eye_z = PREV_EYE_Z + (EYE_Z - PREV_EYE_Z) * alpha
+    rads = math.radians(PREV_THETA + (theta - PREV_THETA) * alpha)
+    CENTER_X = eye_x + math.cos(rads)
+    CENTER_Z = eye_z + math.sin(rads)
     
     glMatrixMode(GL_MODELVIEW)
     glLoadIdentity()
-    gluLookAt(EYE_X, EYE_Y, EYE_Z, CENTER_X, CENTER_Y, CENTER_Z, UP_X, UP_Y, UP_Z)
+    gluLookAt(eye_x, EYE_Y, eye_z, CENTER_X, CENTER_Y, CENTER_Z, UP_X, UP_Y, UP_Z)
+    camera_frustum = Frustum.from_camera(FOVY, SCREEN_WIDTH/SCREEN_HEIGHT, ZNEAR, ZFAR,
+                                         (eye_x, EYE_Y, eye_z), (CENTER_X, CENTER_Y, CENTER_Z),
+                                         (UP_X, UP_Y, UP_Z))
+    camera_chunks = map_pvs.visible_chunks(eye_x, eye_z) if map_pvs else None
+    camera_eye = (eye_x, EYE_Y, eye_z)
+
+def save_previous_state():
+    """Remember the player state before a tick so frames can interpolate from it"""
+    global PREV_EYE_X, PREV_EYE_Z, PREV_THETA
+    PREV_EYE_X = EYE_X
+    PREV_EYE_Z = EYE_Z
+    PREV_THETA = theta
 
 def rotate_camera(angle):
     """Rotate camera by given angle"""
@@ -335,7 +459,6 @@ def rotate_camera(angle):
     rads = math.radians(theta)
     direction[0] = math.cos(rads)
     direction[2] = math.sin(rads)
-    update_camera()
 
 def move_forward(speed):
     """Move camera forward with collision detection"""
@@ -346,7 +469,6 @@ def move_forward(speed):
     if is_valid_move(new_x, new_z):
         EYE_X = new_x
         EYE_Z = new_z
-        update_camera()
 
 def move_backward(speed):
     """Move camera backward with collision detection"""
@@ -357,20 +479,25 @@ def move_backward(speed):
     if is_valid_move(new_x, new_z):
         EYE_X = new_x
         EYE_Z = new_z
-        update_camera()
 
-def render_scene():
-    """Render the complete scene"""
+def render_scene(alpha=1.0):
+    """Render the complete scene, alpha of the way between the last two ticks"""
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+    update_camera(alpha)
     
     # Draw axes for debugging (comment out later)
     draw_axes()
     
     # Draw the map or simple floor
+    lod_eye = camera_eye if LEVEL_OF_DETAIL else None
     if map_model:
         glPushMatrix()
         glColor3f(1.0, 0.0, 0.0)  # Backrooms yellowish color
-        map_model.render()
+        map_model.render(camera_frustum if FRUSTUM_CULLING else None,
+                         camera_chunks if PVS_CULLING else None, lod_eye)
+        if map_model.buffers:
+            profiler.count('map_chunks', map_model.buffers.drawn_chunks)
+            profiler.count('map_triangles', map_model.buffers.drawn_triangles)
         glPopMatrix()
     else:
         draw_simple_floor()
@@ -381,30 +508,75 @@ def render_scene():
     
     # Draw monster if game is playing
     if game_state == "playing" and monster:
-        monster.render()
+        monster.render(alpha, lod_eye, DRAW_DISTANCE)
+        profiler.count('monster_triangles', monster.drawn_triangles)
     
     # Draw HUD
     draw_hud()
+    if show_profiler:
+        draw_profiler_overlay()
 
-def handle_input():
-    """Handle keyboard input during gameplay"""
-    if game_state != "playing":
-        return
-        
+def read_input():
+    """Held movement keys as a string of w/s/a/d"""
     keys = pygame.key.get_pressed()
-    
-    # Movement
+    held = ""
     if keys[pygame.K_UP] or keys[pygame.K_w]:
-        move_forward(MOVEMENT_SPEED)
+        held += "w"
     if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-        move_backward(MOVEMENT_SPEED)
+        held += "s"
     if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-        rotate_camera(-ROTATION_SPEED)
+        held += "a"
     if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        held += "d"
+    return held
+
+def apply_input(held):
+    """Move the player for one tick with the given w/s/a/d keys held"""
+    if "w" in held:
+        move_forward(MOVEMENT_SPEED)
+    if "s" in held:
+        move_backward(MOVEMENT_SPEED)
+    if "a" in held:
+        rotate_camera(-ROTATION_SPEED)
+    if "d" in held:
         rotate_camera(ROTATION_SPEED)
 
-def reset_game():
-    """Reset game to initial state"""
+def update_game(current_time):
+    """Advance collectibles and the monster by one tick; returns the game state"""
+    global game_state
+    if monster:
+        monster.save_previous_state()
+    
+    # Update collectibles
+    if collectible_manager:
+        with profiler.section('collectibles'):
+            collectible_manager.update(current_time, EYE_X, EYE_Z)
+        
+        # Check win condition
+        if collectible_manager.all_collected():
+            game_state = "won"
+    
+    # Update monster AI
+    if monster:
+        with profiler.section('monster'):
+            caught = monster.update(EYE_X, EYE_Z, collision_world, current_time)
+        if caught:
+            game_state = "game_over"
+    return game_state
+
+def draw_end_background():
+    """The frame the game ended on, or the live scene if it wasn't captured"""
+    if end_background and end_background.valid:
+        end_background.draw()
+    else:
+        render_scene()
+
+def reset_game(model=None, timestep=None):
+    """Reset game to initial state (model=False skips loading the monster model)
+
+    timestep's clock restarts too, so the new game's tick times start at 0
+    like the monster's and collectibles' timers.
+    """
     global EYE_X, EYE_Y, EYE_Z, theta, direction, game_state, monster, collectible_manager
     
     # Reset player position
@@ -413,42 +585,55 @@ def reset_game():
     EYE_Z = 0.0
     theta = 0.0
     direction = [1.0, 0.0, 0.0]
+    save_previous_state()
     
-    # Reset monster
-    monster = Monster(start_x=8.0, start_z=8.0) 
+    # Reset monster, releasing the old model's GL buffers and texture references
+    if monster and monster.model:
+        monster.model.free()
+    monster = Monster(start_x=8.0, start_z=8.0, model=model)
     
     # Reset collectibles
     collectible_manager = CollectibleManager(num_items=3)  # Spawn 3 collectible items
     
     # Reset game state
     game_state = "playing"
+    if timestep:
+        timestep.reset()
+    if end_background:
+        end_background.valid = False
     
-    update_camera()
     print("Game reset!")
     print(f"Collect all {collectible_manager.num_items} items to win!")
 
-def main():
-    """Main game loop"""
-    global monster, game_over_screen, win_screen, collectible_manager, game_state
+def main(profile_path=None):
+    """Main game loop (profile_path: record a frame profile and write it there on exit)"""
+    global monster, game_over_screen, win_screen, collectible_manager, game_state, show_profiler
+    global end_background
     
     pygame.init()
     
     # Initialize OpenGL
     init_opengl()
     
-    # Load map
+    # Load map and monster model in the background
     map_filename = 'backroom.obj'
-    load_map(map_filename)
+    monster_model = load_assets(map_filename)
+    if monster_model is False:
+        pygame.quit()
+        return
     
     # Initialize game objects
-    monster = Monster(start_x=8.0, start_z=8.0)
+    monster = Monster(start_x=8.0, start_z=8.0, model=monster_model)
     #monster =  None
     game_over_screen = GameOverScreen()
     win_screen = WinScreen()
+    end_background = FrameCapture(SCREEN_WIDTH, SCREEN_HEIGHT)
     collectible_manager = CollectibleManager(num_items=3)  # 3 collectible items to win
     
-    # Game loop
+    # Game loop: logic runs at TICK_RATE, frames are drawn as fast as MAX_FPS allows
     clock = pygame.time.Clock()
+    timestep = FixedTimestep(TICK_RATE)
+    last_frame = time.perf_counter()
     running = True
     
     print("=== BACKROOMS: COLLECT AND ESCAPE ===")
@@ -456,11 +641,18 @@ def main():
     print("- Arrow Keys or WASD: Move and rotate")
     print("- ESC: Exit")
     print("- R: Restart (during game over or win)")
+    print("- F3: Frame profiler")
     print(f"¡Collect all {collectible_manager.num_items} glowing cubes to win!")
     print("¡Cuidado! El monstruo te está siguiendo...")
     
+    if profile_path:
+        enable_profiler()
+    
     while running:
-        current_time = time.time()
+        now = time.perf_counter()
+        frame_time = now - last_frame
+        last_frame = now
+        profiler.begin_frame()
         
         # Handle events
         for event in pygame.event.get():
@@ -470,67 +662,206 @@ def main():
                 if event.key == pygame.K_ESCAPE:
                     running = False
                 elif event.key == pygame.K_r and game_state in ["game_over", "won"]:
-                    reset_game()
+                    reset_game(timestep=timestep)
+                elif event.key == pygame.K_F3:
+                    show_profiler = not show_profiler
+                    if show_profiler:
+                        enable_profiler()
+                    elif not profile_path:
+                        profiler.disable()
         
         if game_state == "playing":
-            # Handle gameplay input
-            handle_input()
-            
-            # Update collectibles
-            if collectible_manager:
-                collectible_manager.update(current_time, EYE_X, EYE_Z)
+            # Keys are read once per frame and held for every tick it runs
+            held = read_input()
+            for current_time in timestep.ticks(frame_time):
+                save_previous_state()
+                with profiler.section('input'):
+                    apply_input(held)
                 
-                # Check win condition
-                if collectible_manager.all_collected():
-                    game_state = "won"
-                    print("¡CONGRATULATIONS! You collected all items!")
-                    print("Press R to play again or ESC to exit")
-            
-            # Update monster AI
-            if monster:
-                game_over = monster.update(EYE_X, EYE_Z, collision_faces, current_time)
-                if game_over:
-                    game_state = "game_over"
-                    print("¡EL MONSTRUO TE ATRAPÓ!")
-                    print("Press R to restart or ESC to exit")
+                # Update collectibles and monster AI
+                if update_game(current_time) != "playing":
+                    break
+            if game_state == "won":
+                print("¡CONGRATULATIONS! You collected all items!")
+                print("Press R to play again or ESC to exit")
+            elif game_state == "game_over":
+                print("¡EL MONSTRUO TE ATRAPÓ!")
+                print("Press R to restart or ESC to exit")
             
             # Render game
-            render_scene()
+            with profiler.section('render'):
+                render_scene(timestep.alpha if game_state == "playing" else 1.0)
+                if game_state != "playing":
+                    # The scene won't change until a restart: keep this frame for the end screen
+                    end_background.capture()
             
         elif game_state == "game_over":
-            # Render game over screen
-            render_scene()  # Render scene in background
-            game_over_screen.draw_game_over()
+            # Render game over screen over the captured last frame
+            with profiler.section('render'):
+                draw_end_background()
+                game_over_screen.draw_game_over()
             
             # Handle game over input
             game_over_action = game_over_screen.handle_game_over_input()
             if game_over_action == "exit":
                 running = False
             elif game_over_action == "restart":
-                reset_game()
+                reset_game(timestep=timestep)
                 
         elif game_state == "won":
-            # Render win screen
-            render_scene()  # Render scene in background
-            win_screen.draw_win_screen()
+            # Render win screen over the captured last frame
+            with profiler.section('render'):
+                draw_end_background()
+                win_screen.draw_win_screen()
             
             # Handle win screen input
             win_action = win_screen.handle_win_input()
             if win_action == "exit":
                 running = False
             elif win_action == "restart":
-                reset_game()
+                reset_game(timestep=timestep)
         
         # Update display
-        pygame.display.flip()
-        clock.tick(60)  # 60 FPS
+        with profiler.section('flip'):
+            pygame.display.flip()
+        profiler.end_frame()
+        clock.tick(MAX_FPS)
     
     # Cleanup
+    if profile_path:
+        profiler.export(profile_path)
+    for screen in (hud_overlay, game_over_screen, win_screen, end_background):
+        if screen:
+            screen.free()
+    free_atlases()
+    text_textures.clear()
     if map_model:
         map_model.free()
     if monster and monster.model:
         monster.model.free()
     pygame.quit()
 
+def load_map_headless(obj_filename):
+    """Load the map's geometry and collision data without a window or GL context"""
+    global map_model
+    map_model = OBJ(obj_filename, defer_gl=True, chunk_size=MAP_CHUNK_SIZE)
+    extract_collision_data()
+
+def random_inputs(rng):
+    """Endless random key presses, each held for a short while"""
+    choices = ["w", "w", "wa", "wd", "a", "d", "s", ""]
+    while True:
+        held = rng.choice(choices)
+        for _ in range(rng.randint(10, 60)):
+            yield held
+
+def scripted_inputs(path):
+    """Key presses from a script, repeated forever
+
+    Each line is "<ticks> <keys>", e.g. "60 w" holds W for 60 ticks and
+    "30" waits 30 ticks. Blank lines and lines starting with # are skipped.
+    """
+    steps = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split()
+            steps.append((int(parts[0]), parts[1].lower() if len(parts) > 1 else ""))
+    if not steps:
+        raise ValueError(f"No input steps in {path}")
+    while True:
+        for ticks, held in steps:
+            for _ in range(ticks):
+                yield held
+
+def frame_times(fps, rng):
+    """Endless frame durations: steady at fps, or uneven (1-50 ms) when fps is 0"""
+    while True:
+        yield 1.0 / fps if fps else rng.uniform(0.001, 0.05)
+
+def run_headless(map_filename='backroom.obj', ticks=36000, seed=0, script=None, fps=60,
+                 profile_path=None):
+    """Run the game logic with no window as fast as possible and report ticks per second
+
+    Frames of 1 / fps seconds drive the same fixed timestep as the windowed
+    game, but inputs change per tick, so the ticks (and the outcome) are the
+    same at any fps for a given seed and script. Finished games restart
+    until all ticks have run. Returns the ticks per second and the outcome.
+    profile_path records the last frames' profile and writes it there.
+    """
+    random.seed(seed)  # Collectible spawns
+    inputs = scripted_inputs(script) if script else random_inputs(random.Random(seed))
+    frames = frame_times(fps, random.Random(seed + 1))
+    load_map_headless(map_filename)
+    reset_game(model=False)
+    
+    if profile_path:
+        enable_profiler()
+    timestep = FixedTimestep(TICK_RATE, max_frame_time=float('inf'))
+    outcomes = {"won": 0, "game_over": 0}
+    collected = 0
+    frame_count = 0
+    ticks_run = 0
+    start = time.perf_counter()
+    while ticks_run < ticks:
+        frame_count += 1
+        profiler.begin_frame()
+        for current_time in timestep.ticks(next(frames)):
+            ticks_run += 1
+            save_previous_state()
+            with profiler.section('input'):
+                apply_input(next(inputs))
+            if update_game(current_time) != "playing":
+                outcomes[game_state] += 1
+                collected += collectible_manager.collected_count
+                reset_game(model=False, timestep=timestep)
+            if ticks_run == ticks:
+                break
+        profiler.end_frame()
+    elapsed = time.perf_counter() - start
+    collected += collectible_manager.collected_count
+    
+    result = {
+        "ticks_per_second": ticks / elapsed,
+        "won": outcomes["won"],
+        "caught": outcomes["game_over"],
+        "collected": collected,
+        "player": (EYE_X, EYE_Z, theta),
+        "monster": (monster.x, monster.z, monster.state),
+    }
+    print(f"=== HEADLESS: {map_filename}, {ticks} ticks, seed {seed}"
+          f"{f', script {script}' if script else ''}, "
+          f"{f'{fps} fps' if fps else 'uneven frames'} ({frame_count} frames) ===")
+    print(f"{elapsed:.2f} s, {ticks / elapsed:.0f} ticks/s "
+          f"({ticks / elapsed / TICK_RATE:.1f}x real time)")
+    print(f"Games won: {result['won']}, caught: {result['caught']}, "
+          f"items collected: {collected}")
+    print(f"Player at ({EYE_X:.2f}, {EYE_Z:.2f}), monster at ({monster.x:.2f}, {monster.z:.2f}) "
+          f"{monster.state}")
+    if profile_path:
+        profiler.export(profile_path)
+        profiler.disable()
+    return result
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Backrooms-3D: collect and escape")
+    parser.add_argument("--headless", action="store_true",
+                        help="run the game logic without a window and report ticks/s")
+    parser.add_argument("--map", default="backroom.obj", help="map OBJ file")
+    parser.add_argument("--ticks", type=int, default=36000, help="headless ticks to run")
+    parser.add_argument("--seed", type=int, default=0, help="headless random seed")
+    parser.add_argument("--script", help="headless input script instead of random input")
+    parser.add_argument("--fps", type=float, default=60,
+                        help="headless render rate driving the timestep (0: uneven frames)")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="write a per-frame profile of the run to PATH (.csv or .json)")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.headless:
+        run_headless(args.map, args.ticks, args.seed, args.script, args.fps, args.profile)
+    else:
+        main(args.profile)
\ No newline at end of file
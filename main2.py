@@ -19,6 +19,7 @@ from monster import Monster
 from game_over import GameOverScreen
 from collectible import CollectibleManager
 from win_screen import WinScreen
+from collision import CollisionWorld
 
 # Game constants
 SCREEN_WIDTH = 1200
@@ -52,36 +53,13 @@ theta = 0.0
 # Game objects
 map_model = None
 collision_faces = []
+collision_world = None
 monster = None
 game_over_screen = None
 win_screen = None
 collectible_manager = None
 game_state = "playing"  # "playing", "game_over", or "won"
 
-def calculate_face_normal(vertices):
-    """Calculate the normal vector of a face"""
-    if len(vertices) < 3:
-        return [0, 1, 0]
-    
-    v1 = vertices[0]
-    v2 = vertices[1]
-    v3 = vertices[2]
-    
-    edge1 = [v2[0] - v1[0], v2[1] - v1[1], v2[2] - v1[2]]
-    edge2 = [v3[0] - v1[0], v3[1] - v1[1], v3[2] - v1[2]]
-    
-    normal = [
-        edge1[1] * edge2[2] - edge1[2] * edge2[1],
-        edge1[2] * edge2[0] - edge1[0] * edge2[2],
-        edge1[0] * edge2[1] - edge1[1] * edge2[0]
-    ]
-    
-    length = math.sqrt(normal[0]**2 + normal[1]**2 + normal[2]**2)
-    if length > 0:
-        normal = [normal[0]/length, normal[1]/length, normal[2]/length]
-    
-    return normal
-
 def init_opengl():
     #configuración de OpenGL
     screen = pygame.display.set_mode(
@@ -128,55 +106,13 @@ def load_map(obj_filename):
 
 def extract_collision_data():
     """Extract collision geometry from the loaded OBJ model"""
-    global collision_faces
-    collision_faces = []
+    global collision_faces, collision_world
     
-    if not map_model:
-        return
-        
-    for face_data in map_model.faces:
-        vertices_indices, normals, texture_coords, material = face_data
-        
-        face_vertices = []
-        for vertex_index in vertices_indices:
-            if vertex_index <= len(map_model.vertices):
-                vertex = map_model.vertices[vertex_index - 1]
-                face_vertices.append([vertex[0], vertex[1], vertex[2]])
-        
-        if len(face_vertices) >= 3:
-            normal = calculate_face_normal(face_vertices)
-            min_y = min([v[1] for v in face_vertices])
-            max_y = max([v[1] for v in face_vertices])
-            face_type = classify_face(normal, face_vertices, min_y, max_y)
-            
-            if face_type in ['wall', 'obstacle']:
-                collision_faces.append({
-                    'vertices': face_vertices,
-                    'normal': normal,
-                    'type': face_type,
-                    'min_y': min_y,
-                    'max_y': max_y
-                })
-    
-    print(f"Found {len(collision_faces)} collision faces")
-
-def classify_face(normal, vertices, min_y, max_y):
-    """Classify a face as floor, ceiling, wall, or obstacle"""
-    if abs(normal[1]) > 0.8:
-        if min_y < 0.5:
-            return 'floor'
-        else:
-            return 'ceiling'
-    
-    horizontal_strength = math.sqrt(normal[0]**2 + normal[2]**2)
-    if horizontal_strength > 0.3:
-        height = max_y - min_y
-        if height > 1.0:
-            return 'wall'
-        else:
-            return 'obstacle'
+    collision_world = CollisionWorld.from_obj(map_model, MAP_BOUNDARY)
+    collision_faces = collision_world.faces
     
-    return 'other'
+    if map_model:
+        print(f"Found {len(collision_faces)} collision faces")
 
 def check_collision_with_box(new_x, new_z, box_vertices, box_min_y, box_max_y):
     """Check collision between player cylinder and a box-shaped obstacle"""
@@ -201,17 +137,9 @@ def check_collision_with_box(new_x, new_z, box_vertices, box_min_y, box_max_y):
 
 def check_collision(new_x, new_z, radius=PLAYER_RADIUS):
     # deteccción de colisones para el mapa backrooms (su geometría)
-    for face in collision_faces:
-        vertices = face['vertices']
-        face_type = face['type']
-        min_y = face['min_y']
-        max_y = face['max_y']
-        
-        if face_type in ['wall', 'obstacle']:
-            if check_collision_with_box(new_x, new_z, vertices, min_y, max_y):
-                return True
-    
-    return False
+    if collision_world is None:
+        return False
+    return collision_world.collides(new_x, new_z, radius, EYE_Y, PLAYER_HEIGHT)
 
 def is_valid_move(new_x, new_z):
     #verificar límites del mapa
@@ -476,7 +404,7 @@ def main():
             
             # Update monster AI
             if monster:
-                game_over = monster.update(EYE_X, EYE_Z, collision_faces, current_time)
+                game_over = monster.update(EYE_X, EYE_Z, collision_world, current_time)
                 if game_over:
                     game_state = "game_over"
                     print("Press R to restart or ESC to exit")
@@ -0,0 +1,236 @@
+# mesh_arrays.py
+import re
+from itertools import repeat
+import numpy as np
+
+# Patterns anchor on the preceding newline (the text is parsed with one
+# prepended), which is much faster than re.M with ^
+_VERTEX_RE = re.compile(r'\nv[ \t]+([^\n]*)')
+_NORMAL_RE = re.compile(r'\nvn[ \t]+([^\n]*)')
+_TEXCOORD_RE = re.compile(r'\nvt[ \t]+([^\n]*)')
+_FACE_RE = re.compile(r'\nf[ \t]+([^\n]*)')
+_USEMTL_RE = re.compile(r'\n(?:usemtl|usemat)[ \t]+(\S+)[^\n]*')
+_MTLLIB_RE = re.compile(r'\nmtllib[ \t]+(\S+)')
+
+class MeshArrays:
+    """Flat array form of an OBJ mesh
+
+    Face corners are stored as raw 1-based OBJ indices (0 when a corner has no
+    texcoord/normal), with face i spanning face_offsets[i]:face_offsets[i + 1].
+    material_runs holds one (material, first_face, face_count) row per
+    consecutive block of faces sharing a material; material -1 means none.
+    """
+
+    ARRAY_FIELDS = ('vertices', 'normals', 'texcoords', 'face_vertices', 'face_normals',
+                    'face_texcoords', 'face_offsets', 'material_runs')
+
+    def __init__(self, vertices, normals, texcoords, face_vertices, face_normals,
+                 face_texcoords, face_offsets, material_runs, material_names, mtllibs):
+        self.vertices = vertices
+        self.normals = normals
+        self.texcoords = texcoords
+        self.face_vertices = face_vertices
+        self.face_normals = face_normals
+        self.face_texcoords = face_texcoords
+        self.face_offsets = face_offsets
+        self.material_runs = material_runs
+        self.material_names = material_names
+        self.mtllibs = mtllibs
+
+    @property
+    def face_count(self):
+        return len(self.face_offsets) - 1
+
+    def face_materials(self):
+        """Material index of every face"""
+        return np.repeat(self.material_runs[:, 0], self.material_runs[:, 2])
+
+    def nbytes(self):
+        """Memory held by the arrays"""
+        return sum(getattr(self, name).nbytes for name in self.ARRAY_FIELDS)
+
+    def to_dict(self):
+        """Arrays keyed by name, for np.savez"""
+        data = {name: getattr(self, name) for name in self.ARRAY_FIELDS}
+        data['material_names'] = np.array(self.material_names, dtype=str)
+        data['mtllibs'] = np.array(self.mtllibs, dtype=str)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse of to_dict"""
+        arrays = {name: data[name] for name in cls.ARRAY_FIELDS}
+        return cls(material_names=data['material_names'].tolist(),
+                   mtllibs=data['mtllibs'].tolist(), **arrays)
+
+    @classmethod
+    def from_lists(cls, vertices, normals, texcoords, faces, mtllibs):
+        """Build arrays from the per-face tuples of the text parser"""
+        material_names = []
+        material_index = {}
+        runs = []
+        face_vertices = []
+        face_normals = []
+        face_texcoords = []
+        face_offsets = [0]
+
+        for i, (face, norms, texcoords_idx, material) in enumerate(faces):
+            face_vertices.extend(face)
+            face_normals.extend(norms)
+            face_texcoords.extend(texcoords_idx)
+            face_offsets.append(len(face_vertices))
+
+            if material is None:
+                m = -1
+            else:
+                if material not in material_index:
+                    material_index[material] = len(material_names)
+                    material_names.append(material)
+                m = material_index[material]
+
+            if runs and runs[-1][0] == m:
+                runs[-1][2] += 1
+            else:
+                runs.append([m, i, 1])
+
+        return cls(
+            vertices=np.array(vertices, dtype=np.float32).reshape(-1, 3),
+            normals=np.array(normals, dtype=np.float32).reshape(-1, 3),
+            texcoords=np.array(texcoords, dtype=np.float32).reshape(-1, 2),
+            face_vertices=np.array(face_vertices, dtype=np.int32),
+            face_normals=np.array(face_normals, dtype=np.int32),
+            face_texcoords=np.array(face_texcoords, dtype=np.int32),
+            face_offsets=np.array(face_offsets, dtype=np.int32),
+            material_runs=np.array(runs, dtype=np.int32).reshape(-1, 3),
+            material_names=material_names,
+            mtllibs=list(mtllibs),
+        )
+
+def _float_rows(rows, width):
+    """Turn the bodies of v/vn/vt statements into a (n, width) float32 array"""
+    values = np.fromstring('\n'.join(rows), dtype=np.float32, sep=' ')
+    if values.size == len(rows) * width:
+        return values.reshape(-1, width)
+    # Some rows carry extra components (w, vertex colors); keep the first width
+    return np.array([row.split()[:width] for row in rows], dtype=np.float32).reshape(-1, width)
+
+def _parse_corners(corners):
+    """Split 'v', 'v/t', 'v//n' and 'v/t/n' corner tokens into three int32 columns"""
+    n = len(corners)
+    corners = [corner.replace('//', '/0/') for corner in corners]
+    slashes = np.fromiter(map(str.count, corners, repeat('/', n)), dtype=np.int32, count=n)
+
+    if n and (slashes == slashes[0]).all() and slashes[0] <= 2:
+        width = int(slashes[0]) + 1
+        text = ' '.join(corners).replace('/', ' ')
+        columns = np.fromstring(text, dtype=np.int32, sep=' ').reshape(n, width)
+    else:
+        # Mixed corner formats in one file: pad each corner to v/t/n
+        rows = []
+        for corner in corners:
+            w = corner.split('/')
+            rows.append([int(w[0]),
+                         int(w[1]) if len(w) >= 2 and w[1] else 0,
+                         int(w[2]) if len(w) >= 3 and w[2] else 0])
+        columns = np.array(rows, dtype=np.int32).reshape(n, 3)
+
+    result = np.zeros((n, 3), dtype=np.int32)
+    result[:, :columns.shape[1]] = columns
+    return (np.ascontiguousarray(result[:, 0]), np.ascontiguousarray(result[:, 1]),
+            np.ascontiguousarray(result[:, 2]))
+
+def parse_obj(filename, swapyz=False):
+    """Parse a Wavefront OBJ file into MeshArrays using bulk tokenization"""
+    with open(filename, 'r') as f:
+        text = '\n' + f.read()
+
+    vertices = _float_rows(_VERTEX_RE.findall(text), 3)
+    normals = _float_rows(_NORMAL_RE.findall(text), 3)
+    texcoords = _float_rows(_TEXCOORD_RE.findall(text), 2)
+    if swapyz:
+        vertices = vertices[:, [0, 2, 1]]
+        normals = normals[:, [0, 2, 1]]
+
+    # Splitting on usemtl statements yields [faces, name, faces, name, faces, ...],
+    # which is exactly the material run table
+    chunks = _USEMTL_RE.split(text)
+    material_names = []
+    material_index = {}
+    face_bodies = []
+    runs = []
+    for i in range(0, len(chunks), 2):
+        bodies = _FACE_RE.findall(chunks[i])
+        if not bodies:
+            continue
+        if i == 0:
+            m = -1
+        else:
+            name = chunks[i - 1]
+            if name not in material_index:
+                material_index[name] = len(material_names)
+                material_names.append(name)
+            m = material_index[name]
+        if runs and runs[-1][0] == m:
+            runs[-1][2] += len(bodies)
+        else:
+            runs.append([m, len(face_bodies), len(bodies)])
+        face_bodies.extend(bodies)
+
+    counts = np.fromiter(map(len, map(str.split, face_bodies)), dtype=np.int32, count=len(face_bodies))
+    face_offsets = np.zeros(len(face_bodies) + 1, dtype=np.int32)
+    np.cumsum(counts, out=face_offsets[1:])
+
+    corners = ' '.join(face_bodies).split()
+    face_vertices, face_texcoords, face_normals = _parse_corners(corners)
+
+    return MeshArrays(
+        vertices=vertices,
+        normals=normals,
+        texcoords=texcoords,
+        face_vertices=face_vertices,
+        face_normals=face_normals,
+        face_texcoords=face_texcoords,
+        face_offsets=face_offsets,
+        material_runs=np.array(runs, dtype=np.int32).reshape(-1, 3),
+        material_names=material_names,
+        mtllibs=_MTLLIB_RE.findall(text),
+    )
+
+class FaceView:
+    """Read-only sequence of (face, norms, texcoords, material) tuples over MeshArrays
+
+    Matches the layout of the text parser's OBJ.faces so existing callers keep
+    working without the per-face lists being kept resident.
+    """
+
+    def __init__(self, mesh):
+        self.mesh = mesh
+
+    def __len__(self):
+        return self.mesh.face_count
+
+    def __getitem__(self, i):
+        mesh = self.mesh
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('face index out of range')
+        start, end = int(mesh.face_offsets[i]), int(mesh.face_offsets[i + 1])
+        run = np.searchsorted(mesh.material_runs[:, 1], i, side='right') - 1
+        m = int(mesh.material_runs[run, 0])
+        return (mesh.face_vertices[start:end].tolist(), mesh.face_normals[start:end].tolist(),
+                mesh.face_texcoords[start:end].tolist(),
+                mesh.material_names[m] if m >= 0 else None)
+
+    def __iter__(self):
+        mesh = self.mesh
+        face_vertices = mesh.face_vertices.tolist()
+        face_normals = mesh.face_normals.tolist()
+        face_texcoords = mesh.face_texcoords.tolist()
+        offsets = mesh.face_offsets.tolist()
+        for m, first, count in mesh.material_runs.tolist():
+            material = mesh.material_names[m] if m >= 0 else None
+            for i in range(first, first + count):
+                start, end = offsets[i], offsets[i + 1]
+                yield (face_vertices[start:end], face_normals[start:end],
+                       face_texcoords[start:end], material)
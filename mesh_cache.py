@@ -0,0 +1,82 @@
+# mesh_cache.py
+import os
+import hashlib
+import numpy as np
+
+from mesh_arrays import MeshArrays
+
+CACHE_VERSION = 2
+CACHE_SUFFIX = '.cache.npz'
+
+def cache_path(filename):
+    """Path of the compiled cache sidecar for an OBJ file"""
+    return filename + CACHE_SUFFIX
+
+def file_stamp(filename):
+    """Cheap change check for a source file: (size, mtime in ns)"""
+    st = os.stat(filename)
+    return [st.st_size, st.st_mtime_ns]
+
+def file_hash(filename):
+    """Content hash of a source file"""
+    with open(filename, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def source_files(filename, mtllibs):
+    """OBJ file followed by the material libraries it references"""
+    dirname = os.path.dirname(filename)
+    files = [filename]
+    for mtl in mtllibs:
+        mtl_file = os.path.join(dirname, mtl)
+        if os.path.exists(mtl_file):
+            files.append(mtl_file)
+    return files
+
+def load(filename, swapyz=False):
+    """Load the cached MeshArrays for an OBJ file, or None if missing or stale"""
+    path = cache_path(filename)
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+    except (OSError, ValueError):
+        return None
+
+    try:
+        if int(arrays['version']) != CACHE_VERSION or bool(arrays['swapyz']) != swapyz:
+            return None
+
+        files = source_files(filename, arrays['mtllibs'].tolist())
+        if files != arrays['source_files'].tolist():
+            return None
+
+        # mtime/size first; fall back to the content hash (e.g. after a git checkout)
+        stamps = [file_stamp(f) for f in files]
+        if stamps != arrays['source_stamps'].tolist():
+            hashes = [file_hash(f) for f in files]
+            if hashes != arrays['source_hashes'].tolist():
+                return None
+    except (OSError, KeyError):
+        return None
+
+    return MeshArrays.from_dict(arrays)
+
+def save(filename, mesh, swapyz=False):
+    """Write the cache sidecar for an OBJ file"""
+    files = source_files(filename, mesh.mtllibs)
+    data = mesh.to_dict()
+    data['version'] = np.array(CACHE_VERSION)
+    data['swapyz'] = np.array(bool(swapyz))
+    data['source_files'] = np.array(files, dtype=str)
+    data['source_stamps'] = np.array([file_stamp(f) for f in files], dtype=np.int64)
+    data['source_hashes'] = np.array([file_hash(f) for f in files], dtype=str)
+
+    path = cache_path(filename)
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not write mesh cache {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
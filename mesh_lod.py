@@ -0,0 +1,144 @@
+# mesh_lod.py
+"""Simplified levels of detail for the vertex buffers built by mesh_renderer.build_batches
+
+Each level is made by vertex clustering: vertices are snapped to the one
+nearest the middle of their cell of a cell_size grid, and triangles that
+collapse or duplicate another are dropped. The snapped-to vertices are
+already in the vertex buffer, so a level is only another index range.
+Vertices on chunk borders are never moved, so neighbouring chunks drawn at
+different levels still meet along the same edges.
+"""
+import hashlib
+import os
+
+import numpy as np
+
+from mesh_renderer import material_groups
+
+LOD_CACHE_VERSION = 2
+LOD_CACHE_SUFFIX = '.lod.cache.npz'
+
+def lod_cache_path(filename):
+    return filename + LOD_CACHE_SUFFIX
+
+def cluster_vertices(vertices, cell_size, pinned=None):
+    """Index of the vertex each vertex collapses into
+
+    Vertices are grouped by position cell and by rounded normal, so the
+    two sides of a thin wall or the faces at a corner stay apart. pinned
+    vertices (a boolean mask) each get a cluster of their own.
+    """
+    own = np.zeros(len(vertices), dtype=np.int64)
+    if pinned is not None:
+        own[pinned] = np.flatnonzero(pinned) + 1
+    keys = np.concatenate([np.floor(vertices[:, 0:3] / cell_size),
+                           np.round(vertices[:, 3:6]), own[:, None]], axis=1).astype(np.int64)
+    _, cluster = np.unique(keys, axis=0, return_inverse=True)
+    cluster = cluster.reshape(-1)
+
+    # Each cluster keeps its vertex closest to the cluster's mean position
+    counts = np.bincount(cluster)
+    means = np.stack([np.bincount(cluster, vertices[:, axis]) for axis in range(3)], axis=1) / counts[:, None]
+    distances = ((vertices[:, 0:3] - means[cluster]) ** 2).sum(axis=1)
+    order = np.lexsort((distances, cluster))
+    first = np.r_[0, np.flatnonzero(np.diff(cluster[order])) + 1]
+    representative = np.empty(len(counts), dtype=np.int64)
+    representative[cluster[order[first]]] = order[first]
+    return representative[cluster]
+
+def chunk_borders(vertices, triangles, tri_chunk):
+    """Boolean per vertex: its position is used by triangles of more than one chunk"""
+    _, position = np.unique(vertices[:, 0:3], axis=0, return_inverse=True)
+    position = position.reshape(-1)
+    used = np.unique(np.stack([position[triangles].reshape(-1), np.repeat(tri_chunk, 3)], axis=1), axis=0)
+    return np.bincount(used[:, 0], minlength=len(vertices))[position] > 1
+
+def group_rows(groups, chunks):
+    """(chunk, material, first index, index count) rows for the groups of build_batches"""
+    if chunks is None:
+        return np.array([(0, m, f, c) for m, f, c in groups], dtype=np.int64).reshape(-1, 4)
+    return np.array([(i, m, f, c) for i, chunk in enumerate(chunks) for m, f, c in chunk[2]],
+                    dtype=np.int64).reshape(-1, 4)
+
+def simplify(vertices, indices, rows, cell_size):
+    """(indices, rows) of one simplified level of the triangles in indices
+
+    Triangles keep their order, so rows still come out sorted by chunk and
+    then material.
+    """
+    triangles = indices.reshape(-1, 3)
+    tri_chunk = np.zeros(len(triangles), dtype=np.int64)
+    tri_material = np.zeros(len(triangles), dtype=np.int64)
+    for chunk, material, first, count in rows:
+        tri_chunk[first // 3:(first + count) // 3] = chunk
+        tri_material[first // 3:(first + count) // 3] = material
+
+    pinned = chunk_borders(vertices, triangles, tri_chunk)
+    snapped = cluster_vertices(vertices, cell_size, pinned)[triangles]
+    keep = ((snapped[:, 0] != snapped[:, 1]) & (snapped[:, 1] != snapped[:, 2]) &
+            (snapped[:, 0] != snapped[:, 2]))
+    kept = np.flatnonzero(keep)
+    # Drop repeats of the same corners and material within a chunk, keeping the first
+    keys = np.concatenate([np.sort(snapped[kept], axis=1), tri_material[kept, None],
+                           tri_chunk[kept, None]], axis=1)
+    _, unique = np.unique(keys, axis=0, return_index=True)
+    kept = kept[np.sort(unique)]
+
+    level_rows = []
+    bounds = np.flatnonzero(np.diff(tri_chunk[kept])) + 1
+    for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(kept)]):
+        if start == end:
+            continue
+        chunk = int(tri_chunk[kept[start]])
+        level_rows += [(chunk, m, f, c) for m, f, c in material_groups(tri_material[kept[start:end]], int(start))]
+    return (snapped[kept].reshape(-1).astype(np.uint32),
+            np.array(level_rows, dtype=np.int64).reshape(-1, 4))
+
+def build_lods(batches, cell_sizes):
+    """[(indices, rows)] per simplified level of a build_batches result, one per cell size"""
+    vertices, indices, groups, chunks = batches
+    rows = group_rows(groups, chunks)
+    return [simplify(vertices, indices, rows, cell_size) for cell_size in cell_sizes]
+
+def cache_key(batches, cell_sizes):
+    vertices, indices, _, _ = batches
+    h = hashlib.sha1(repr((LOD_CACHE_VERSION, tuple(cell_sizes))).encode())
+    h.update(np.ascontiguousarray(vertices).tobytes())
+    h.update(np.ascontiguousarray(indices).tobytes())
+    return h.hexdigest()
+
+def save(path, key, lods):
+    """Write the levels to path through a temporary file, so a partial write never replaces it"""
+    data = {'key': np.array(key)}
+    for level, (indices, rows) in enumerate(lods):
+        data[f'indices_{level}'] = indices
+        data[f'rows_{level}'] = rows
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not write LOD cache {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def load(path, key, levels):
+    """Saved levels, or None if missing or built from different buffers"""
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if str(data['key']) != key:
+                return None
+            return [(data[f'indices_{level}'], data[f'rows_{level}']) for level in range(levels)]
+    except (OSError, KeyError, ValueError):
+        return None
+
+def load_or_build(path, batches, cell_sizes):
+    """Levels for batches from the cache at path if it matches, else built and saved there"""
+    key = cache_key(batches, cell_sizes)
+    lods = load(path, key, len(cell_sizes)) if path else None
+    if lods is None:
+        lods = build_lods(batches, cell_sizes)
+        if path:
+            save(path, key, lods)
+    return lods
@@ -0,0 +1,273 @@
+# mesh_renderer.py
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+
+# Interleaved vertex layout: position (3), normal (3), texcoord (2)
+VERTEX_FLOATS = 8
+STRIDE = VERTEX_FLOATS * 4
+NORMAL_OFFSET = 3 * 4
+TEXCOORD_OFFSET = 6 * 4
+
+DEFAULT_COLOR = (0.8, 0.8, 0.6)  # Backrooms yellowish color
+
+def triangulate(mesh):
+    """Fan-triangulate every face, returning (corner index triples, face of each triangle)
+
+    Faces with fewer than three corners or out-of-range vertex indices are
+    dropped, as the immediate-mode path skipped them too.
+    """
+    offsets = mesh.face_offsets
+    counts = np.diff(offsets)
+    face_vertices = mesh.face_vertices
+    if len(face_vertices) == 0:
+        return np.zeros((0, 3), dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    valid_corner = (face_vertices >= 1) & (face_vertices <= len(mesh.vertices))
+    starts = np.minimum(offsets[:-1], len(face_vertices) - 1)
+    valid_face = np.logical_and.reduceat(valid_corner, starts) & (counts >= 3)
+
+    tri_counts = np.where(valid_face, counts - 2, 0)
+    face_of_tri = np.repeat(np.arange(len(counts)), tri_counts)
+    first_tri = np.cumsum(tri_counts) - tri_counts
+    k = np.arange(len(face_of_tri)) - np.repeat(first_tri, tri_counts)
+    base = offsets[face_of_tri].astype(np.int64)
+    corners = np.stack([base, base + k + 1, base + k + 2], axis=1)
+    return corners, face_of_tri
+
+def face_normals(mesh, corners):
+    """Flat normal of each triangle, used where the OBJ gives no vertex normal"""
+    p = mesh.vertices[mesh.face_vertices[corners] - 1]
+    n = np.cross(p[:, 1] - p[:, 0], p[:, 2] - p[:, 0])
+    length = np.linalg.norm(n, axis=1, keepdims=True)
+    return np.divide(n, length, out=np.zeros_like(n), where=length > 0)
+
+def build_batches(mesh, chunk_size=None):
+    """Interleave the mesh into one vertex array and per-material index ranges
+
+    Returns (vertices, indices, groups, chunks) where vertices is float32
+    (n, 8), indices is uint32 with triangles sorted by material in order of
+    first use, and groups is a list of (material index, first index, index
+    count). chunks is None, or with a chunk_size the triangles are first
+    split into square chunk_size cells of the XZ plane by centroid, and
+    chunks lists (bounds min, bounds max, groups) per non-empty cell; the
+    top-level groups are then every chunk's groups in order.
+    """
+    corners, face_of_tri = triangulate(mesh)
+    corner_ids = corners.reshape(-1)
+
+    attribs = np.zeros((len(corner_ids), VERTEX_FLOATS), dtype=np.float32)
+    attribs[:, 0:3] = mesh.vertices[mesh.face_vertices[corner_ids] - 1]
+
+    t = mesh.face_texcoords[corner_ids]
+    has_t = (t >= 1) & (t <= len(mesh.texcoords))
+    attribs[has_t, 6:8] = mesh.texcoords[t[has_t] - 1]
+
+    n = mesh.face_normals[corner_ids]
+    has_n = (n >= 1) & (n <= len(mesh.normals))
+    attribs[has_n, 3:6] = mesh.normals[n[has_n] - 1]
+    if not has_n.all():
+        flat = np.repeat(face_normals(mesh, corners), 3, axis=0)
+        attribs[~has_n, 3:6] = flat[~has_n]
+
+    # Corners with the same (v, vt, vn) indices collapse into a single vertex;
+    # corners using a flat face normal are never shared
+    v = mesh.face_vertices[corner_ids].astype(np.int64)
+    t = np.where(has_t, t, 0).astype(np.int64)
+    n = np.where(has_n, n, 0).astype(np.int64)
+    keys = (v * (len(mesh.texcoords) + 1) + t) * (len(mesh.normals) + 1) + n
+    if not has_n.all():
+        unshared = keys.max() + 1 + np.arange(len(keys))
+        keys = np.where(has_n, keys, unshared)
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    vertices = attribs[first]
+    triangles = inverse.reshape(-1, 3).astype(np.uint32)
+
+    # Material indices are numbered in order of first use (-1, no material, comes first)
+    tri_materials = mesh.face_materials()[face_of_tri]
+    if chunk_size is None:
+        order = np.argsort(tri_materials, kind='stable')
+        indices = triangles[order].reshape(-1)
+        return vertices, indices, material_groups(tri_materials[order], 0), None
+
+    positions = vertices[:, 0:3]
+    centroids = positions[triangles].mean(axis=1)
+    cells = np.floor(centroids[:, [0, 2]] / chunk_size).astype(np.int64)
+    _, chunk_of_tri = np.unique(cells, axis=0, return_inverse=True)
+    chunk_of_tri = chunk_of_tri.reshape(-1)
+    order = np.lexsort((tri_materials, chunk_of_tri))
+    indices = triangles[order].reshape(-1)
+
+    chunks, groups = [], []
+    sorted_chunks = chunk_of_tri[order]
+    bounds = np.flatnonzero(np.diff(sorted_chunks)) + 1
+    for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(order)]):
+        corners = positions[indices[start * 3:end * 3]]
+        chunk_groups = material_groups(tri_materials[order[start:end]], int(start))
+        chunks.append((corners.min(axis=0), corners.max(axis=0), chunk_groups))
+        groups += chunk_groups
+    return vertices, indices, groups, chunks
+
+def material_groups(sorted_materials, first_triangle):
+    """(material, first index, index count) per run of a sorted material array"""
+    materials, starts, counts = np.unique(sorted_materials, return_index=True, return_counts=True)
+    return [(int(m), (first_triangle + int(s)) * 3, int(c) * 3)
+            for m, s, c in zip(materials, starts, counts)]
+
+class MeshBuffers:
+    """Vertex/index buffers for a MeshArrays, drawn with one glDrawElements per material
+
+    When built with chunks, draw() can skip the chunks outside a frustum
+    or a potentially visible set. With levels of detail (see mesh_lod) it
+    draws each chunk, or the whole mesh, at the level for its distance
+    from the eye.
+    """
+
+    def __init__(self, mesh, batches=None, chunk_size=None, lods=None, lod_distances=()):
+        """batches is a precomputed build_batches(mesh, chunk_size) result, e.g. from a loader thread
+
+        lods are the simplified levels from mesh_lod.build_lods(batches, ...),
+        used from the matching lod_distances on.
+        """
+        self.vertices, self.indices, self.groups, self.chunks = batches or build_batches(mesh, chunk_size)
+        self.material_names = mesh.material_names
+        self.vbo = 0
+        self.ibo = 0
+        if self.chunks:
+            self.chunk_mins = np.array([chunk[0] for chunk in self.chunks])
+            self.chunk_maxs = np.array([chunk[1] for chunk in self.chunks])
+        else:
+            positions = self.vertices[:, 0:3]
+            self.chunk_mins = positions.min(axis=0, keepdims=True) if len(positions) else np.zeros((1, 3))
+            self.chunk_maxs = positions.max(axis=0, keepdims=True) if len(positions) else np.zeros((1, 3))
+
+        # Groups per chunk (one pseudo-chunk without chunks) for every level,
+        # with the simplified levels' indices appended to the index buffer
+        self.levels = [[chunk[2] for chunk in self.chunks] if self.chunks else [self.groups]]
+        self.lod_distances = tuple(lod_distances)[:len(lods or ())]
+        for level_indices, rows in (lods or [])[:len(self.lod_distances)]:
+            base = len(self.indices)
+            level = [[] for _ in self.levels[0]]
+            for chunk, material, first, count in rows.tolist():
+                level[chunk].append((material, base + first, count))
+            self.levels.append(level)
+            self.indices = np.concatenate([self.indices, level_indices])
+        self.drawn_chunks = 0  # Stats of the last draw()
+        self.drawn_triangles = 0
+
+    @property
+    def triangle_count(self):
+        """Triangles at full detail"""
+        return sum(count for _, _, count in self.groups) // 3
+
+    def upload(self):
+        """Copy the interleaved vertices and indices into GL buffer objects
+
+        If either upload fails, the buffers already created are deleted
+        before the error is raised.
+        """
+        try:
+            self.vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, GL_STATIC_DRAW)
+
+            self.ibo = glGenBuffers(1)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.indices.nbytes, self.indices, GL_STATIC_DRAW)
+        except Exception:
+            self.free()
+            raise
+        finally:
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def apply_material(self, mtl):
+        """Bind the texture or set the color for a material dict (None for no material)"""
+        if mtl and mtl.get('texture_Kd'):
+            # Textured faces keep the current color, as in the display-list path
+            glBindTexture(GL_TEXTURE_2D, mtl['texture_Kd'])
+        else:
+            glBindTexture(GL_TEXTURE_2D, 0)
+            if mtl and 'Kd' in mtl:
+                glColor3f(*mtl['Kd'][:3])
+            else:
+                glColor3f(*DEFAULT_COLOR)
+
+    def chunk_distances(self, eye):
+        """Distance from eye to each chunk's bounding box (0 inside it)"""
+        gaps = np.maximum(np.maximum(self.chunk_mins - eye, 0), np.asarray(eye) - self.chunk_maxs)
+        return np.sqrt((gaps * gaps).sum(axis=1))
+
+    def visible_groups(self, frustum, chunk_mask=None, eye=None):
+        """Material groups of the chunks that intersect the frustum and are set in chunk_mask
+
+        Without either (or without chunks) every chunk is kept. With an eye
+        position each chunk's groups come from its level of detail.
+        """
+        if eye is None or len(self.levels) == 1:
+            if (frustum is None and chunk_mask is None) or not self.chunks:
+                self.drawn_chunks = len(self.chunks) if self.chunks else 1
+                return self.groups
+        visible = np.ones(len(self.levels[0]), dtype=bool)
+        if self.chunks:
+            if frustum is not None:
+                visible &= frustum.boxes_visible(self.chunk_mins, self.chunk_maxs)
+            if chunk_mask is not None:
+                visible &= chunk_mask
+        visible = np.flatnonzero(visible)
+        self.drawn_chunks = len(visible)
+        if eye is None or len(self.levels) == 1:
+            levels = np.zeros(len(self.levels[0]), dtype=np.int64)
+        else:
+            levels = np.searchsorted(self.lod_distances, self.chunk_distances(eye), side='right')
+        # Material-major, so each material's texture is bound once
+        return sorted((group for i in visible for group in self.levels[levels[i]][i]),
+                      key=lambda g: g[0])
+
+    def draw(self, materials, frustum=None, chunk_mask=None, eye=None):
+        """Draw every material group; materials is the OBJ's name -> material dict
+
+        With a frustum, chunks whose bounding box lies outside it are skipped,
+        and with a chunk_mask (one bool per chunk) chunks not set in it. eye
+        (in model coordinates) picks the levels of detail.
+        """
+        if not self.vbo:
+            return
+        groups = self.visible_groups(frustum, chunk_mask, eye)
+        self.drawn_triangles = sum(count for _, _, count in groups) // 3
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glVertexPointer(3, GL_FLOAT, STRIDE, ctypes.c_void_p(0))
+        glNormalPointer(GL_FLOAT, STRIDE, ctypes.c_void_p(NORMAL_OFFSET))
+        glTexCoordPointer(2, GL_FLOAT, STRIDE, ctypes.c_void_p(TEXCOORD_OFFSET))
+
+        glEnable(GL_TEXTURE_2D)
+        glFrontFace(GL_CCW)
+
+        current = None
+        for material, first, count in groups:
+            if material != current:
+                name = self.material_names[material] if material >= 0 else None
+                self.apply_material(materials.get(name) if name else None)
+                current = material
+            glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT, ctypes.c_void_p(first * 4))
+
+        glDisable(GL_TEXTURE_2D)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def free(self):
+        """Delete the GL buffer objects"""
+        if self.vbo:
+            glDeleteBuffers(1, [self.vbo])
+            self.vbo = 0
+        if self.ibo:
+            glDeleteBuffers(1, [self.ibo])
+            self.ibo = 0
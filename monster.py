@@ -8,28 +8,56 @@ import time
 from collections import deque
 import random
 from objloader import OBJ
+from collision import segment_box_distance
+from perception import PerceptionCache
+from pathfinding import DIRECTIONS, OccupancyGrid, astar, octile
 
 class Monster:
-    def __init__(self, start_x=10.0, start_z=10.0):
+    use_occupancy_grid = True  # False: test each neighbor against the collision world
+    occupancy_cache_path = None  # e.g. 'monster_grid.cache.npz' to keep the grid between runs
+    pathfinder = 'astar'  # 'bfs' for the original breadth-first search
+    use_flow_field = False  # Hunt by following a flow field toward the player shared by all monsters
+    use_path_repair = True  # Splice onto the current path when the player moved only a little
+    use_swept_sight = True  # False: sample the sight line every 0.5 units
+    use_perception_cache = True  # Reuse line-of-sight answers between ticks (see perception.PerceptionCache)
+    perception_rate = None  # Sight checks per second with the cache (None: every tick; lower reacts later)
+    lod_distances = (5.0, 10.0)  # Eye distance from which each coarser primitive_detail level is drawn
+    primitive_detail = ((8, 8, 6), (6, 6, 4), (4, 4, 0))  # Body, head and eye slices per level (no model)
+    
+    def __init__(self, start_x=10.0, start_z=10.0, model=None):
         # Position and movement
         self.x = start_x
         self.z = start_z
         self.y = 0.7  # Height above ground
         self.target_x = start_x
         self.target_z = start_z
+        self.prev_x = start_x  # Position at the previous tick, for interpolated rendering
+        self.prev_z = start_z
         
         # Monster properties
         self.radius = 0.4  # Collision radius
         self.height = 1.0  # Monster height
         self.speed = 0.04  # Movement speed (slower than player)
         self.detection_range = 18.0  # How far monster can "see" player
+        self.perception = PerceptionCache(rate=self.perception_rate)
+        self.sight_clearance = 0.25  # Largest clearance worth measuring for the perception cache
+        self.boundary = 19.0  # Monster's own map boundary (wider than the player's)
         
         # AI and pathfinding
         self.path = []  # Current path to follow
+        self.path_goal = None  # Target the current path was planned toward
         self.current_path_index = 0
-        self.last_pathfind_time = 0
         self.pathfind_interval = 5.0  # Recalculate path every second
+        self.last_pathfind_time = -self.pathfind_interval  # Plan on the first update
         self.grid_size = 1.5  # Grid resolution for pathfinding
+        self.grid_offset = 20  # Offset to make grid coordinates positive
+        self.max_path_nodes = 1000  # A* expansion budget per search
+        self.repair_radius = 3.0  # How far the player may move before a full replan
+        self.last_replan_nodes = 0  # Debug counters: A* nodes expanded by the last replan...
+        self.total_replan_nodes = 0  # ...and by all replans
+        self.replans = 0
+        self.repairs = 0
+        self.free_occupancy = None  # Boundary-only grid used when there is no map
         self.last_player_pos = (0, 0)
         
         # State management
@@ -37,13 +65,15 @@ class Monster:
         self.patrol_points = [(8, 8), (8, -8), (8, -8), (-8, 8)]
         self.current_patrol_index = 0
         
-        # Model loading
-        self.model = None
-        self.load_model()
+        # Model loading (a model preloaded by the asset loader can be passed in)
+        self.model = model
+        if self.model is None:
+            self.load_model()
         
         # Animation
         self.bob_offset = 0
         self.bob_speed = 0.0
+        self.drawn_triangles = 0  # Triangles submitted by the last render()
         
         print(f"Monster spawned at ({self.x}, {self.z})")
     
@@ -58,59 +88,45 @@ class Monster:
     
     def world_to_grid(self, x, z):
         """Convert world coordinates to grid coordinates"""
-        grid_x = int((x + 20) / self.grid_size)  # Offset to make positive
-        grid_z = int((z + 20) / self.grid_size)
+        grid_x = int((x + self.grid_offset) / self.grid_size)  # Offset to make positive
+        grid_z = int((z + self.grid_offset) / self.grid_size)
         return (grid_x, grid_z)
     
     def grid_to_world(self, grid_x, grid_z):
         """Convert grid coordinates to world coordinates"""
-        world_x = (grid_x * self.grid_size) - 20
-        world_z = (grid_z * self.grid_size) - 20
+        world_x = (grid_x * self.grid_size) - self.grid_offset
+        world_z = (grid_z * self.grid_size) - self.grid_offset
         return (world_x, world_z)
     
-    def is_position_valid(self, x, z, collision_faces):
-        """Check if a position is valid (no collision with walls)"""
-        # Check map boundaries
-        if abs(x) > 19.0 or abs(z) > 19.0:
-            return False
-        
-        # Check collision with walls using same logic as player
-        for face in collision_faces:
-            vertices = face['vertices']
-            face_type = face['type']
-            min_y = face['min_y']
-            max_y = face['max_y']
-            
-            if face_type in ['wall', 'obstacle']:
-                if self.check_collision_with_box(x, z, vertices, min_y, max_y):
-                    return False
-        
-        return True
+    def nearest_cell(self, x, z):
+        """Grid cell whose point (see grid_to_world) is closest to (x, z)"""
+        grid_x = math.floor((x + self.grid_offset) / self.grid_size + 0.5)
+        grid_z = math.floor((z + self.grid_offset) / self.grid_size + 0.5)
+        return (grid_x, grid_z)
     
-    def check_collision_with_box(self, x, z, box_vertices, box_min_y, box_max_y):
-        """Check collision between monster and a box-shaped obstacle"""
-        monster_min_y = self.y - self.height/2
-        monster_max_y = self.y + self.height/2
-        
-        # Check vertical overlap
-        if monster_max_y < box_min_y or monster_min_y > box_max_y:
-            return False
-        
-        # checar horizontal collision
-        box_min_x = min([v[0] for v in box_vertices])
-        box_max_x = max([v[0] for v in box_vertices])
-        box_min_z = min([v[2] for v in box_vertices])
-        box_max_z = max([v[2] for v in box_vertices])
-        
-        closest_x = max(box_min_x, min(x, box_max_x))
-        closest_z = max(box_min_z, min(z, box_max_z))
+    def is_position_valid(self, x, z, collision_world):
+        """Check if a position is valid (inside the map and no collision with walls)"""
+        if collision_world is None:
+            return not (abs(x) > self.boundary or abs(z) > self.boundary)
         
-        distance = math.sqrt((x - closest_x)**2 + (z - closest_z)**2)
-        
-        return distance < self.radius
+        return collision_world.is_position_valid(x, z, self.radius, self.y, self.height, self.boundary)
+    
+    def get_occupancy(self, collision_world):
+        """Walkability grid for this monster's size, shared per map through the collision world"""
+        if collision_world is not None:
+            return collision_world.occupancy(self.grid_size, self.grid_offset, self.radius,
+                                             self.y, self.height, self.boundary,
+                                             self.occupancy_cache_path)
+        if self.free_occupancy is None:
+            self.free_occupancy = OccupancyGrid.build(None, self.grid_size, self.grid_offset,
+                                                      self.radius, self.y, self.height, self.boundary)
+        return self.free_occupancy
     
-    def get_neighbors(self, grid_pos, collision_faces):
+    def get_neighbors(self, grid_pos, collision_world):
         #Obtener posiciones vecinas válidas"""
+        if self.use_occupancy_grid:
+            return self.get_occupancy(collision_world).neighbors(grid_pos)
+        
         neighbors = []
         directions = [(-1, 0), (1, 0), (0, -1), (0, 1), 
                     (-1, -1), (-1, 1), (1, -1), (1, 1)]  # 8-directional movimiento
@@ -122,12 +138,12 @@ class Monster:
             # Convert to world coordinates and check validity
             world_x, world_z = self.grid_to_world(new_grid_x, new_grid_z)
             
-            if self.is_position_valid(world_x, world_z, collision_faces):
+            if self.is_position_valid(world_x, world_z, collision_world):
                 neighbors.append((new_grid_x, new_grid_z))
         
         return neighbors
     
-    def bfs_pathfind(self, start_pos, target_pos, collision_faces):
+    def bfs_pathfind(self, start_pos, target_pos, collision_world):
         #BFS para el camino más corto al jugador 
         start_grid = self.world_to_grid(start_pos[0], start_pos[1])
         target_grid = self.world_to_grid(target_pos[0], target_pos[1])
@@ -155,7 +171,7 @@ class Monster:
                 return world_path
             
             # ver vecinos
-            for neighbor in self.get_neighbors(current_pos, collision_faces):
+            for neighbor in self.get_neighbors(current_pos, collision_world):
                 if neighbor not in visited:
                     visited.add(neighbor)
                     new_path = path + [neighbor]
@@ -164,14 +180,144 @@ class Monster:
         # No path found
         return []
     
-    def can_see_player(self, player_x, player_z, collision_faces):
+    def astar_cells(self, start_grid, target_grid, collision_world):
+        """A* between grid cells; returns (cells after start up to target or None, nodes expanded)"""
+        if self.use_occupancy_grid:
+            occupancy = self.get_occupancy(collision_world)
+            if not occupancy.is_walkable(*target_grid):
+                return None, 0  # The monster does not fit there; don't search the whole map for it
+            neighbors = occupancy.neighbors
+        else:
+            neighbors = lambda cell: self.get_neighbors(cell, collision_world)
+        
+        return astar(start_grid, target_grid, neighbors, self.max_path_nodes)
+    
+    def astar_pathfind(self, start_pos, target_pos, collision_world, retry=False):
+        """A* path to the target as world-coordinate waypoints ([] if unreachable within budget)
+        
+        retry: this search continues a replan already counted (after a failed repair).
+        """
+        start_grid = self.world_to_grid(start_pos[0], start_pos[1])
+        target_grid = self.world_to_grid(target_pos[0], target_pos[1])
+        
+        path, expanded = self.astar_cells(start_grid, target_grid, collision_world)
+        self.count_replan(expanded, retry)
+        if not path:
+            return []
+        return [self.grid_to_world(grid_x, grid_z) for grid_x, grid_z in path]
+    
+    def repair_path(self, target_pos, collision_world):
+        """Splice a short A* search onto the unfollowed part of the current path
+        
+        Only used when the target is within repair_radius of the goal the path
+        was planned toward. The search starts from the remaining waypoint closest to
+        the new target, so it expands a handful of nodes instead of searching
+        from the monster. Returns [] when there is nothing to reuse.
+        """
+        remaining = self.path[self.current_path_index:]
+        if not remaining or self.path_goal is None:
+            return []
+        moved = math.sqrt((target_pos[0] - self.path_goal[0])**2 +
+                          (target_pos[1] - self.path_goal[1])**2)
+        if moved > self.repair_radius:
+            return []
+        
+        cells = [self.nearest_cell(x, z) for x, z in remaining]
+        target_grid = self.world_to_grid(target_pos[0], target_pos[1])
+        splice = min(range(len(cells)), key=lambda i: octile(cells[i], target_grid))
+        
+        suffix, expanded = self.astar_cells(cells[splice], target_grid, collision_world)
+        self.count_replan(expanded)
+        if suffix is None:
+            return []
+        self.repairs += 1
+        return remaining[:splice + 1] + [self.grid_to_world(grid_x, grid_z) for grid_x, grid_z in suffix]
+    
+    def count_replan(self, expanded, retry=False):
+        """Add a search's nodes to the counters; a retry's go to the replan counted before it"""
+        if retry:
+            self.last_replan_nodes += expanded
+        else:
+            self.last_replan_nodes = expanded
+            self.replans += 1
+        self.total_replan_nodes += expanded
+    
+    def find_path(self, start_pos, target_pos, collision_world, retry=False):
+        """Path with the configured pathfinder"""
+        if self.pathfinder == 'bfs':
+            return self.bfs_pathfind(start_pos, target_pos, collision_world)
+        return self.astar_pathfind(start_pos, target_pos, collision_world, retry)
+    
+    def flow_step(self, player_x, player_z, collision_world):
+        """Next waypoint toward the player from the shared flow field (None if off the field)"""
+        field = self.get_occupancy(collision_world).flow_field()
+        goal = self.nearest_cell(player_x, player_z)
+        field.update(goal)
+        
+        cell = self.nearest_cell(self.x, self.z)
+        if cell == goal:
+            return (player_x, player_z)
+        next_cell = field.next_cell(cell)
+        if next_cell is None:
+            # Standing off the field (e.g. cut a corner into a wall cell): head back onto it
+            next_cell = min(((cell[0] + dx, cell[1] + dz) for dx, dz in DIRECTIONS),
+                            key=field.distance_to_goal)
+            if field.distance_to_goal(next_cell) == math.inf:
+                return None
+        return self.grid_to_world(next_cell[0], next_cell[1])
+    
+    def can_see_player(self, player_x, player_z, collision_world, current_time=None):
         """Check if monster has line of sight to player"""
         distance = math.sqrt((player_x - self.x)**2 + (player_z - self.z)**2)
         
         if distance > self.detection_range:
             return False
         
+        if self.use_perception_cache and self.use_swept_sight and collision_world is not None:
+            span = self.sight_span(player_x, player_z)
+            if span is None:
+                return True
+            if not (collision_world.in_bounds(span[0], span[1], self.boundary) and
+                    collision_world.in_bounds(span[2], span[3], self.boundary)):
+                return False
+            return self.perception.check(
+                (self.x, self.z), (player_x, player_z), span,
+                lambda box: segment_box_distance(*span, *box) < self.radius,
+                lambda: self.find_sight_blocker(span, collision_world),
+                current_time)
+        return self.line_of_sight(player_x, player_z, collision_world)
+    
+    def sight_span(self, player_x, player_z):
+        """(x0, z0, x1, z1) of the part of the sight line that is checked, None if too close to check"""
+        distance = math.sqrt((player_x - self.x)**2 + (player_z - self.z)**2)
+        num_samples = int(distance / 0.5)  # Same span the 0.5-unit samples cover
+        if num_samples < 2:
+            return None
+        t = 1 / num_samples
+        return (self.x + t * (player_x - self.x), self.z + t * (player_z - self.z),
+                player_x - t * (player_x - self.x), player_z - t * (player_z - self.z))
+    
+    def find_sight_blocker(self, span, collision_world):
+        """(visible, box blocking the swept sight span or None, clearance if visible)
+        
+        Collisions only; the caller checks the span is inside the boundary.
+        """
+        box, clearance = collision_world.sweep_clearance(*span, self.radius, self.y, self.height,
+                                                         self.sight_clearance)
+        return box is None, box, clearance
+    
+    def line_of_sight(self, player_x, player_z, collision_world):
+        """Uncached line-of-sight test (ignores detection_range)"""
+        if self.use_swept_sight and collision_world is not None:
+            # Exact version: sweep the monster's body over the span the samples cover
+            span = self.sight_span(player_x, player_z)
+            if span is None:
+                return True
+            return collision_world.is_segment_clear(*span, self.radius, self.y, self.height,
+                                                    self.boundary)
+        
         # Simple line of sight check - sample points along the line
+        distance = math.sqrt((player_x - self.x)**2 + (player_z - self.z)**2)
         num_samples = int(distance / 0.5)  # Sample every 0.5 units
         
         for i in range(1, num_samples):
@@ -179,16 +325,16 @@ class Monster:
             check_x = self.x + t * (player_x - self.x)
             check_z = self.z + t * (player_z - self.z)
             
-            if not self.is_position_valid(check_x, check_z, collision_faces):
+            if not self.is_position_valid(check_x, check_z, collision_world):
                 return False
         
         return True
     
-    def update_ai_state(self, player_x, player_z, collision_faces, current_time):
+    def update_ai_state(self, player_x, player_z, collision_world, current_time):
         #Update monster AI state based on player position
         #Estados: patrol, hunting, following_path
         player_distance = math.sqrt((player_x - self.x)**2 + (player_z - self.z)**2)
-        can_see = self.can_see_player(player_x, player_z, collision_faces)
+        can_see = self.can_see_player(player_x, player_z, collision_world, current_time)
         
         #Estados
         if can_see and player_distance <= self.detection_range:
@@ -200,15 +346,32 @@ class Monster:
             self.state = "patrol"
             print("Monster lost sight of player, returning to patrol") #para debbug
         
+        # Flow field mode: step along the shared field every frame instead of searching
+        if self.use_flow_field and self.state == "hunting":
+            waypoint = self.flow_step(player_x, player_z, collision_world)
+            if waypoint is not None:
+                self.path = [waypoint]
+                self.path_goal = None
+                self.current_path_index = 0
+                return
+        
         # Handle pathfinding
-        if current_time - self.last_pathfind_time > self.pathfind_interval:
+        if current_time - self.last_pathfind_time >= self.pathfind_interval:
             self.last_pathfind_time = current_time
             
             if self.state == "hunting":
                 # encontrar camino a jugador
-                new_path = self.bfs_pathfind((self.x, self.z), (player_x, player_z), collision_faces)
+                new_path = []
+                replans = self.replans
+                if self.use_path_repair and self.pathfinder == 'astar':
+                    new_path = self.repair_path((player_x, player_z), collision_world)
+                if not new_path:
+                    # A repair that searched and failed already counted this replan
+                    new_path = self.find_path((self.x, self.z), (player_x, player_z), collision_world,
+                                              retry=self.replans != replans)
                 if new_path:
                     self.path = new_path
+                    self.path_goal = (player_x, player_z)
                     self.current_path_index = 0
                     self.state = "following_path"
                     self.last_player_pos = (player_x, player_z)
@@ -222,9 +385,10 @@ class Monster:
                     self.current_patrol_index = (self.current_patrol_index + 1) % len(self.patrol_points)
                     patrol_target = self.patrol_points[self.current_patrol_index]
                 
-                new_path = self.bfs_pathfind((self.x, self.z), patrol_target, collision_faces)
+                new_path = self.find_path((self.x, self.z), patrol_target, collision_world)
                 if new_path:
                     self.path = new_path
+                    self.path_goal = patrol_target
                     self.current_path_index = 0
                     self.state = "following_path"
     
@@ -260,10 +424,15 @@ class Monster:
         distance = math.sqrt((player_x - self.x)**2 + (player_z - self.z)**2)
         return distance < (self.radius + 0.5)  # Monster radius + player buffer
     
-    def update(self, player_x, player_z, collision_faces, current_time):
-        """Main update function"""
+    def save_previous_state(self):
+        """Remember the position before a tick so frames can interpolate from it"""
+        self.prev_x = self.x
+        self.prev_z = self.z
+    
+    def update(self, player_x, player_z, collision_world, current_time):
+        """Main update function (one fixed-length tick)"""
         # Update AI state and pathfinding
-        self.update_ai_state(player_x, player_z, collision_faces, current_time)
+        self.update_ai_state(player_x, player_z, collision_world, current_time)
         
         # Move along current path
         self.follow_path()
@@ -277,68 +446,83 @@ class Monster:
         
         return False
     
-    def render(self):
-        """Render the monster"""
-        glPushMatrix()
-        
-        # Position the monster
-        glTranslatef(self.x, self.y, self.z)
-        
-        # Scale the monster
-        glScalef(0.8, 0.8, 0.8)
-        
-        if self.model:
-            # Render the loaded model
-            glColor3f(0.3, 0.1, 0.1)  # Dark red color
-            self.model.render()
-        else:
-            # Render a simple geometric shape if model doesn't load
-            glColor3f(0.8, 0.2, 0.2)  # Red color
-            
-            # Draw a simple monster shape using primitives
+    def render(self, alpha=1.0, eye=None, draw_distance=None):
+        """Render the monster, alpha of the way from its previous tick position
+
+        With the camera's eye position, the model or primitives are drawn at
+        the level of detail for the monster's distance, and nothing is drawn
+        beyond draw_distance.
+        """
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        z = self.prev_z + (self.z - self.prev_z) * alpha
+        distance = 0.0
+        if eye is not None:
+            distance = math.sqrt((eye[0] - x) ** 2 + (eye[1] - self.y) ** 2 + (eye[2] - z) ** 2)
+        self.drawn_triangles = 0
+        
+        if draw_distance is None or distance <= draw_distance + self.height:
             glPushMatrix()
-            glTranslatef(0, 0, 0)
             
-            # Body (main cylinder)
-            glPushMatrix()
-            glRotatef(90, 1, 0, 0)
-            quadric = gluNewQuadric()
-            gluCylinder(quadric, 0.3, 0.3, 1.5, 8, 1)
-            gluDeleteQuadric(quadric)
-            glPopMatrix()
+            # Position the monster
+            glTranslatef(x, self.y, z)
             
-            # Head (sphere)
-            glPushMatrix()
-            glTranslatef(0, 0.8, 0)
-            quadric = gluNewQuadric()
-            gluSphere(quadric, 0.4, 8, 8)
-            gluDeleteQuadric(quadric)
-            glPopMatrix()
+            # Scale the monster
+            glScalef(0.8, 0.8, 0.8)
             
-            # Eyes (small spheres)
-            glColor3f(1.0, 0.0, 0.0)  # Bright red eyes
-            glPushMatrix()
-            glTranslatef(-0.15, 0.9, 0.3)
-            quadric = gluNewQuadric()
-            gluSphere(quadric, 0.05, 6, 6)
-            gluDeleteQuadric(quadric)
-            glPopMatrix()
-            
-            glPushMatrix()
-            glTranslatef(0.15, 0.9, 0.3)
-            quadric = gluNewQuadric()
-            gluSphere(quadric, 0.05, 6, 6)
-            gluDeleteQuadric(quadric)
-            glPopMatrix()
+            if self.model:
+                # Render the loaded model, with the eye in its scaled coordinates
+                glColor3f(0.3, 0.1, 0.1)  # Dark red color
+                model_eye = None if eye is None else ((eye[0] - x) / 0.8, (eye[1] - self.y) / 0.8,
+                                                      (eye[2] - z) / 0.8)
+                self.model.render(eye=model_eye)
+                if self.model.buffers:
+                    self.drawn_triangles = self.model.buffers.drawn_triangles
+            else:
+                # Render a simple geometric shape if model doesn't load
+                level = sum(1 for d in self.lod_distances if distance >= d)
+                self.drawn_triangles = self.draw_primitives(*self.primitive_detail[level])
             
             glPopMatrix()
         
-        glPopMatrix()
-        
         # Debug: Draw path if in debug mode
         if hasattr(self, 'debug') and self.debug and self.path:
             self.draw_debug_path()
     
+    def draw_primitives(self, body_slices, head_slices, eye_slices):
+        """Draw the stand-in monster from GLU quadrics; returns its triangle count
+
+        eye_slices of 0 leaves out the eyes.
+        """
+        glColor3f(0.8, 0.2, 0.2)  # Red color
+        quadric = gluNewQuadric()
+        
+        # Body (main cylinder)
+        glPushMatrix()
+        glRotatef(90, 1, 0, 0)
+        gluCylinder(quadric, 0.3, 0.3, 1.5, body_slices, 1)
+        glPopMatrix()
+        triangles = 2 * body_slices
+        
+        # Head (sphere)
+        glPushMatrix()
+        glTranslatef(0, 0.8, 0)
+        gluSphere(quadric, 0.4, head_slices, head_slices)
+        glPopMatrix()
+        triangles += 2 * head_slices * (head_slices - 1)
+        
+        # Eyes (small spheres)
+        if eye_slices:
+            glColor3f(1.0, 0.0, 0.0)  # Bright red eyes
+            for eye_x in (-0.15, 0.15):
+                glPushMatrix()
+                glTranslatef(eye_x, 0.9, 0.3)
+                gluSphere(quadric, 0.05, eye_slices, eye_slices)
+                glPopMatrix()
+                triangles += 2 * eye_slices * (eye_slices - 1)
+        
+        gluDeleteQuadric(quadric)
+        return triangles
+    
     def draw_debug_path(self):
         """Draw the current path for debugging"""
         glDisable(GL_LIGHTING)
@@ -384,5 +568,10 @@ class Monster:
             'state': self.state,
             'path_length': len(self.path),
             'current_waypoint': self.current_path_index,
-            'patrol_target': self.current_patrol_index
+            'patrol_target': self.current_patrol_index,
+            'replans': self.replans,
+            'repairs': self.repairs,
+            'last_replan_nodes': self.last_replan_nodes,
+            'total_replan_nodes': self.total_replan_nodes,
+            'perception': self.perception.stats()
         }
\ No newline at end of file
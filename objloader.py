@@ -2,29 +2,31 @@ import os
 import pygame
 from OpenGL.GL import *
 
+import mesh_cache
+import mesh_lod
+from mesh_arrays import FaceView, MeshArrays, parse_obj
+from mesh_renderer import MeshBuffers, build_batches
+from texture_registry import textures
+
 class OBJ:
     """Enhanced OBJ loader for the Backrooms game"""
     generate_on_init = True
+    use_cache = True
+    parser = 'numpy'  # 'numpy' (bulk tokenization) or 'text' (line by line)
+    lod_cell_sizes = (0.1, 0.4)  # Vertex clustering cell of each simplified level (() for none)
+    lod_distances = (5.0, 10.0)  # Eye distance from which each level is drawn
     
     @classmethod
-    def loadTexture(cls, imagefile):
-        """Load texture from image file"""
+    def loadTexture(cls, imagefile, decoded=None):
+        """Load texture from image file, shared through the texture registry"""
         try:
-            surf = pygame.image.load(imagefile)
-            image = pygame.image.tostring(surf, 'RGBA', 1)
-            ix, iy = surf.get_rect().size
-            texid = glGenTextures(1)
-            glBindTexture(GL_TEXTURE_2D, texid)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, ix, iy, 0, GL_RGBA, GL_UNSIGNED_BYTE, image)
-            return texid
+            return textures.acquire(imagefile, decoded=decoded)
         except Exception as e:
             return None
 
     @classmethod
-    def loadMaterial(cls, filename):
-        """Load material file (.mtl)"""
+    def parseMaterial(cls, filename):
+        """Parse material file (.mtl) without loading its textures"""
         contents = {}
         mtl = None
         dirname = os.path.dirname(filename)
@@ -40,13 +42,9 @@ class OBJ:
                 elif mtl is None:
                     raise ValueError("mtl file doesn't start with newmtl stmt")
                 elif values[0] == 'map_Kd':
-                    # load the texture referred to by this declaration
+                    # remember the texture referred to by this declaration
                     mtl[values[0]] = values[1]
-                    imagefile = os.path.join(dirname, mtl['map_Kd'])
-                    if os.path.exists(imagefile):
-                        mtl['texture_Kd'] = cls.loadTexture(imagefile)
-                    else:
-                        mtl['texture_Kd'] = None
+                    mtl['map_Kd_file'] = os.path.join(dirname, mtl['map_Kd'])
                 else:
                     try:
                         mtl[values[0]] = list(map(float, values[1:]))
@@ -58,17 +56,116 @@ class OBJ:
         
         return contents
 
-    def __init__(self, filename, swapyz=False):
-        """Load a Wavefront OBJ file"""
-        self.vertices = []
-        self.normals = []
-        self.texcoords = []
-        self.faces = []
+    @classmethod
+    def loadMaterial(cls, filename):
+        """Load material file (.mtl) and its textures"""
+        contents = cls.parseMaterial(filename)
+        cls.loadMaterialTextures(contents)
+        return contents
+
+    @classmethod
+    def loadMaterialTextures(cls, contents, decoded=None):
+        """Load the diffuse texture of every material; decoded maps image paths to pre-decoded pixels"""
+        decoded = decoded or {}
+        for mtl in contents.values():
+            if 'map_Kd_file' not in mtl:
+                continue
+            imagefile = mtl['map_Kd_file']
+            if os.path.exists(imagefile):
+                mtl['texture_Kd'] = cls.loadTexture(imagefile, decoded.get(imagefile))
+            else:
+                mtl['texture_Kd'] = None
+
+    def __init__(self, filename, swapyz=False, defer_gl=False, chunk_size=None):
+        """Load a Wavefront OBJ file, using the compiled cache when it is fresh
+
+        With defer_gl the mesh and materials are loaded but no textures or
+        buffers are created, so this can run off the GL thread (see asset_loader).
+        chunk_size splits the vertex buffers into square chunks of the XZ
+        plane that render() can cull.
+        """
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.mesh = None
+        self._vertices = None
+        self._normals = None
+        self._texcoords = None
+        self._faces = None
+        self._face_view = None
         self.mtl = {}
         self.gl_list = 0
+        self.buffers = None
+        
+        if self.use_cache:
+            self.mesh = mesh_cache.load(filename, swapyz)
+        
+        if self.mesh is not None:
+            print(f"Loading OBJ file: {filename} (cached)")
+        else:
+            if self.parser == 'text':
+                self.parse(filename, swapyz)
+            else:
+                try:
+                    print(f"Loading OBJ file: {filename}")
+                    self.mesh = parse_obj(filename, swapyz)
+                except Exception as e:
+                    print(f"Error loading OBJ file {filename}: {e}")
+                    raise
+            if self.use_cache:
+                mesh_cache.save(filename, self.mesh, swapyz)
         
         dirname = os.path.dirname(filename)
+        for mtl in self.mesh.mtllibs:
+            mtl_file = os.path.join(dirname, mtl)
+            if os.path.exists(mtl_file):
+                self.mtl = self.parseMaterial(mtl_file)
+            else:
+                print(f"--")
+        
+        print(f"Loaded: {len(self.mesh.vertices)} vertices, {self.mesh.face_count} faces")
+        
+        if not defer_gl:
+            self.loadMaterialTextures(self.mtl)
+            if self.generate_on_init:
+                self.generate()
+
+    # List views of self.mesh in the layout of the original text parser, built on
+    # first use so callers such as main.extract_collision_data keep working
+
+    @property
+    def vertices(self):
+        if self._vertices is None:
+            self._vertices = self.mesh.vertices.tolist()
+        return self._vertices
+
+    @property
+    def normals(self):
+        if self._normals is None:
+            self._normals = self.mesh.normals.tolist()
+        return self._normals
+
+    @property
+    def texcoords(self):
+        if self._texcoords is None:
+            self._texcoords = self.mesh.texcoords.tolist()
+        return self._texcoords
+
+    @property
+    def faces(self):
+        if self._faces is not None:
+            return self._faces
+        if self._face_view is None:
+            self._face_view = FaceView(self.mesh)
+        return self._face_view
+
+    def parse(self, filename, swapyz=False):
+        """Parse a Wavefront OBJ text file line by line"""
+        self._vertices = []
+        self._normals = []
+        self._texcoords = []
+        self._faces = []
         material = None
+        mtllibs = []
         
         try:
             print(f"Loading OBJ file: {filename}")
@@ -101,12 +198,8 @@ class OBJ:
                     material = values[1]
                     
                 elif values[0] == 'mtllib':
-                    # Material library
-                    mtl_file = os.path.join(dirname, values[1])
-                    if os.path.exists(mtl_file):
-                        self.mtl = self.loadMaterial(mtl_file)
-                    else:
-                        print(f"--")
+                    # Material library, loaded once parsing is done
+                    mtllibs.append(values[1])
                         
                 elif values[0] == 'f':
                     # Face definition
@@ -132,16 +225,38 @@ class OBJ:
                             
                     self.faces.append((face, norms, texcoords, material))
             
-            print(f"Loaded: {len(self.vertices)} vertices, {len(self.faces)} faces")
-            
         except Exception as e:
             print(f"Error loading OBJ file {filename}: {e}")
             raise
         
-        if self.generate_on_init:
-            self.generate()
+        self.mesh = MeshArrays.from_lists(self._vertices, self._normals, self._texcoords,
+                                          self._faces, mtllibs)
 
-    def generate(self):
+    def build_lods(self, batches):
+        """Simplified levels for the buffers built from batches (cached next to the OBJ)"""
+        if not self.lod_cell_sizes:
+            return None
+        path = mesh_lod.lod_cache_path(self.filename) if self.use_cache else None
+        return mesh_lod.load_or_build(path, batches, self.lod_cell_sizes)
+
+    def generate(self, batches=None, lods=None):
+        """Upload the mesh as vertex buffers drawn once per material
+
+        batches and lods are precomputed build_batches and build_lods results.
+        """
+        try:
+            if batches is None:
+                batches = build_batches(self.mesh, self.chunk_size)
+                lods = self.build_lods(batches)
+            self.buffers = MeshBuffers(self.mesh, batches, self.chunk_size, lods, self.lod_distances)
+            self.buffers.upload()
+        except Exception as e:
+            # Vertex buffer objects need OpenGL 1.5
+            print(f"Vertex buffers unavailable ({e}), using a display list")
+            self.buffers = None
+            self.generate_display_list()
+
+    def generate_display_list(self):
         """Generate OpenGL display list"""
         self.gl_list = glGenLists(1)
         glNewList(self.gl_list, GL_COMPILE)
@@ -195,13 +310,26 @@ class OBJ:
         glDisable(GL_TEXTURE_2D)
         glEndList()
 
-    def render(self):
-        """Render the OBJ model"""
-        if self.gl_list:
+    def render(self, frustum=None, chunk_mask=None, eye=None):
+        """Render the OBJ model, skipping chunks outside the frustum or chunk_mask if it has chunks
+
+        eye is the camera position in model coordinates, which selects the
+        level of detail of the model (or of each chunk).
+        """
+        if self.buffers:
+            self.buffers.draw(self.mtl, frustum, chunk_mask, eye)
+        elif self.gl_list:
             glCallList(self.gl_list)
 
     def free(self):
         """Free OpenGL resources"""
+        if self.buffers:
+            self.buffers.free()
+            self.buffers = None
+        for mtl in self.mtl.values():
+            if mtl.get('texture_Kd'):
+                textures.release(mtl['texture_Kd'])
+                mtl['texture_Kd'] = None
         if self.gl_list:
             glDeleteLists(self.gl_list, 1)
             self.gl_list = 0
\ No newline at end of file
@@ -0,0 +1,133 @@
+# overlay.py
+from OpenGL.GL import *
+
+def begin_2d(width, height):
+    """Switch to a pixel-space orthographic projection for overlay drawing
+
+    Saves only the enable flags, current color and blend state instead of
+    every attribute; end_2d() restores them and both matrices.
+    """
+    glPushAttrib(GL_ENABLE_BIT | GL_CURRENT_BIT | GL_COLOR_BUFFER_BIT)
+    glDisable(GL_DEPTH_TEST)
+    glDisable(GL_LIGHTING)
+    glDisable(GL_TEXTURE_2D)
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+    glMatrixMode(GL_PROJECTION)
+    glPushMatrix()
+    glLoadIdentity()
+    glOrtho(0, width, 0, height, -1, 1)
+    glMatrixMode(GL_MODELVIEW)
+    glPushMatrix()
+    glLoadIdentity()
+
+def end_2d():
+    glPopMatrix()
+    glMatrixMode(GL_PROJECTION)
+    glPopMatrix()
+    glMatrixMode(GL_MODELVIEW)
+    glPopAttrib()
+
+def draw_rect(x0, y0, x1, y1, color):
+    glColor4f(*color)
+    glBegin(GL_QUADS)
+    glVertex2f(x0, y0)
+    glVertex2f(x1, y0)
+    glVertex2f(x1, y1)
+    glVertex2f(x0, y1)
+    glEnd()
+
+class CompiledOverlay:
+    """Static overlay drawing compiled into a display list on first use and replayed after
+
+    draw_fn issues the GL calls; atlases are the glyph atlases it draws
+    with, uploaded before compiling so their texture data isn't captured
+    into the list.
+    """
+
+    def __init__(self, draw_fn, atlases=()):
+        self.draw_fn = draw_fn
+        self.atlases = atlases
+        self.display_list = 0
+
+    def compile(self):
+        for atlas in self.atlases:
+            atlas.upload()
+        self.display_list = glGenLists(1)
+        glNewList(self.display_list, GL_COMPILE)
+        self.draw_fn()
+        glEndList()
+
+    def draw(self):
+        if not self.display_list:
+            self.compile()
+        glCallList(self.display_list)
+
+    def free(self):
+        """Delete the display list (it is compiled again on the next draw)"""
+        if self.display_list:
+            glDeleteLists(self.display_list, 1)
+            self.display_list = 0
+
+class FrameCapture:
+    """The last rendered frame copied into a texture, to redraw as one full-screen quad
+
+    capture() copies the back buffer with glCopyTexImage2D, falling back to
+    glReadPixels and a texture upload if the copy fails. draw() is a
+    display list of the textured quad, so it is one call per frame.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.texture = 0
+        self.quad = CompiledOverlay(self.draw_quad)
+        self.valid = False
+
+    def capture(self):
+        """Copy the current back buffer (call after rendering, before the buffer swap)"""
+        if not self.texture:
+            self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glReadBuffer(GL_BACK)
+        try:
+            glCopyTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, 0, 0, self.width, self.height, 0)
+        except GLError:
+            pixels = glReadPixels(0, 0, self.width, self.height, GL_RGB, GL_UNSIGNED_BYTE)
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, self.width, self.height, 0, GL_RGB,
+                         GL_UNSIGNED_BYTE, pixels)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        self.valid = True
+
+    def draw_quad(self):
+        begin_2d(self.width, self.height)
+        glDisable(GL_BLEND)
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glColor4f(1.0, 1.0, 1.0, 1.0)
+        glBegin(GL_QUADS)
+        glTexCoord2f(0, 0)
+        glVertex2f(0, 0)
+        glTexCoord2f(1, 0)
+        glVertex2f(self.width, 0)
+        glTexCoord2f(1, 1)
+        glVertex2f(self.width, self.height)
+        glTexCoord2f(0, 1)
+        glVertex2f(0, self.height)
+        glEnd()
+        glBindTexture(GL_TEXTURE_2D, 0)
+        end_2d()
+
+    def draw(self):
+        """Redraw the captured frame over the whole viewport (replaces clearing it)"""
+        self.quad.draw()
+
+    def free(self):
+        self.quad.free()
+        if self.texture:
+            glDeleteTextures([self.texture])
+            self.texture = 0
+        self.valid = False
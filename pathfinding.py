@@ -0,0 +1,223 @@
+# pathfinding.py
+import hashlib
+import heapq
+import math
+import os
+import numpy as np
+
+# 8-directional movement, in the order Monster.get_neighbors has always used
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1),
+              (-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+SQRT2 = math.sqrt(2)
+
+class OccupancyGrid:
+    """Walkability of every pathfinding cell, rasterized once per map
+
+    Cell (gx, gz) stands for the world point (gx * grid_size - offset,
+    gz * grid_size - offset), matching Monster.grid_to_world. A cell is
+    walkable when an actor of the given radius/height fits there.
+    """
+
+    def __init__(self, walkable, origin, grid_size, offset):
+        self.walkable = walkable
+        self.origin = origin  # grid coordinates of walkable[0, 0]
+        self.grid_size = grid_size
+        self.offset = offset
+        self.neighbor_table = None
+        self.shared_flow_field = None
+
+    @classmethod
+    def build(cls, collision_world, grid_size, offset, radius, y, height, boundary):
+        """Rasterize a CollisionWorld (or None, for boundary-only) at grid_size"""
+        # One ring of cells past the boundary so every in-bounds cell's neighbors are covered
+        g0 = int(np.floor((offset - boundary) / grid_size)) - 1
+        g1 = int(np.ceil((offset + boundary) / grid_size)) + 1
+        g = np.arange(g0, g1 + 1)
+        world = g * grid_size - offset
+        xs = np.repeat(world, len(g))
+        zs = np.tile(world, len(g))
+
+        walkable = ~((np.abs(xs) > boundary) | (np.abs(zs) > boundary))
+        if collision_world is not None:
+            walkable &= ~collision_world.collides_many(xs, zs, radius, y, height)
+
+        return cls(walkable.reshape(len(g), len(g)), (g0, g0), grid_size, offset)
+
+    @property
+    def shape(self):
+        return self.walkable.shape
+
+    def is_walkable(self, gx, gz):
+        ix = gx - self.origin[0]
+        iz = gz - self.origin[1]
+        if 0 <= ix < self.walkable.shape[0] and 0 <= iz < self.walkable.shape[1]:
+            return bool(self.walkable[ix, iz])
+        return False
+
+    def neighbors(self, cell):
+        """Walkable 8-neighbors of a cell, from a table built on first use"""
+        if self.neighbor_table is None:
+            self.build_neighbor_table()
+        found = self.neighbor_table.get(cell)
+        if found is None:
+            # Cells off the grid (e.g. an actor standing outside the boundary)
+            found = [(cell[0] + dx, cell[1] + dz) for dx, dz in DIRECTIONS
+                     if self.is_walkable(cell[0] + dx, cell[1] + dz)]
+        return found
+
+    def build_neighbor_table(self):
+        table = {}
+        w, h = self.walkable.shape
+        for ix in range(w):
+            for iz in range(h):
+                cell = (ix + self.origin[0], iz + self.origin[1])
+                table[cell] = [(cell[0] + dx, cell[1] + dz) for dx, dz in DIRECTIONS
+                               if self.is_walkable(cell[0] + dx, cell[1] + dz)]
+        self.neighbor_table = table
+
+    def flow_field(self):
+        """The FlowField over this grid, shared by every actor that uses the grid"""
+        if self.shared_flow_field is None:
+            self.shared_flow_field = FlowField(self)
+        return self.shared_flow_field
+
+    @staticmethod
+    def cache_key(collision_world, *params):
+        """Hash of the collision boxes and rasterization parameters, for on-disk caching"""
+        h = hashlib.sha1(repr(params).encode())
+        if collision_world is not None:
+            soa = collision_world.grid.soa
+            for array in (soa.min_x, soa.max_x, soa.min_z, soa.max_z, soa.min_y, soa.max_y):
+                h.update(array.tobytes())
+        return h.hexdigest()
+
+    def save(self, path, key):
+        """Write the grid to path through a temporary file, so a partial write never replaces it"""
+        tmp_path = path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, walkable=self.walkable, origin=np.array(self.origin),
+                         grid_size=np.array(self.grid_size), offset=np.array(self.offset),
+                         key=np.array(key))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write occupancy grid cache {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path, key):
+        """Load a saved grid, or None if missing or built from different inputs"""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data['key']) != key:
+                    return None
+                return cls(data['walkable'], tuple(data['origin'].tolist()),
+                           float(data['grid_size']), float(data['offset']))
+        except (OSError, KeyError, ValueError):
+            return None
+
+def octile(a, b):
+    """Octile distance between two cells: exact path length on an empty 8-connected grid"""
+    dx = abs(a[0] - b[0])
+    dz = abs(a[1] - b[1])
+    return dx + dz + (SQRT2 - 2) * min(dx, dz)
+
+def astar(start, goal, neighbors, max_nodes=1000):
+    """A* over grid cells with unit straight and sqrt(2) diagonal steps
+
+    neighbors(cell) lists the walkable neighbors of a cell. Returns
+    (path, expanded): path runs from the cell after start up to goal, or
+    is None when the goal was not reached within max_nodes expansions.
+    """
+    if start == goal:
+        return [], 0
+
+    parents = {start: None}
+    cost = {start: 0.0}
+    closed = set()
+    heap = [(octile(start, goal), 0, start)]
+    counter = 1  # FIFO tie-break between equal f scores
+    expanded = 0
+
+    while heap and expanded < max_nodes:
+        _, _, cell = heapq.heappop(heap)
+        if cell in closed:
+            continue
+        if cell == goal:
+            path = []
+            while cell != start:
+                path.append(cell)
+                cell = parents[cell]
+            path.reverse()
+            return path, expanded
+
+        closed.add(cell)
+        expanded += 1
+        base = cost[cell]
+        for neighbor in neighbors(cell):
+            if neighbor in closed:
+                continue
+            step = SQRT2 if neighbor[0] != cell[0] and neighbor[1] != cell[1] else 1.0
+            g = base + step
+            if g < cost.get(neighbor, math.inf):
+                cost[neighbor] = g
+                parents[neighbor] = cell
+                heapq.heappush(heap, (g + octile(neighbor, goal), counter, neighbor))
+                counter += 1
+
+    return None, expanded
+
+class FlowField:
+    """Dijkstra map of path lengths to one goal cell over an OccupancyGrid
+
+    Every reachable cell stores the neighbor one step closer to the goal, so
+    any number of actors heading for the same goal steer with a dict lookup
+    instead of running their own searches.
+    """
+
+    def __init__(self, occupancy):
+        self.occupancy = occupancy
+        self.goal = None
+        self.distance = {}
+        self.toward = {}
+        self.rebuilds = 0
+
+    def update(self, goal):
+        """Recompute the field if the goal moved to another cell; returns True when it did"""
+        if goal == self.goal:
+            return False
+
+        neighbors = self.occupancy.neighbors
+        distance = {goal: 0.0}
+        toward = {goal: None}
+        heap = [(0.0, 0, goal)]
+        counter = 1
+
+        # Neighbor lists only hold walkable cells, so every edge is usable in
+        # both directions (the goal itself may be unwalkable, e.g. against a wall)
+        while heap:
+            d, _, cell = heapq.heappop(heap)
+            if d > distance[cell]:
+                continue
+            for neighbor in neighbors(cell):
+                step = SQRT2 if neighbor[0] != cell[0] and neighbor[1] != cell[1] else 1.0
+                if d + step < distance.get(neighbor, math.inf):
+                    distance[neighbor] = d + step
+                    toward[neighbor] = cell
+                    heapq.heappush(heap, (d + step, counter, neighbor))
+                    counter += 1
+
+        self.goal = goal
+        self.distance = distance
+        self.toward = toward
+        self.rebuilds += 1
+        return True
+
+    def next_cell(self, cell):
+        """Neighbor to step to from cell, or None at the goal or where the goal is unreachable"""
+        return self.toward.get(cell)
+
+    def distance_to_goal(self, cell):
+        return self.distance.get(cell, math.inf)
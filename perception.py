@@ -0,0 +1,111 @@
+# perception.py
+import math
+
+class PerceptionCache:
+    """Reuses line-of-sight work between frames without changing any result
+
+    - Blocked: for each (observer cell, target cell) pair the cache keeps the
+      wall that blocked the sight line last time. Walls don't move, so if
+      that wall (or the last wall seen from anywhere) still blocks the
+      current sight line, one box test answers False.
+    - Visible: a clear check also reports its clearance, how far the sight
+      line could shift and stay clear. While neither end of the sight line
+      has moved that far since, the answer stays True.
+    Everything else runs the full check.
+
+    rate optionally throttles checks to that many per second, reusing the
+    last answer in between even if the actors moved (this one does change
+    behaviour: the monster reacts up to 1 / rate seconds late).
+    """
+
+    def __init__(self, cell_size=0.5, rate=None, max_entries=65536):
+        self.cell_size = cell_size
+        self.rate = rate
+        self.max_entries = max_entries
+        self.blockers = {}  # (observer cell, target cell) -> blocker from the last full check
+        self.last_blocker = None
+        self.clear_span = None  # Sight line of the last full check that came out clear...
+        self.clearance = 0.0  # ...and how far it could move and stay clear
+        self.last_time = None
+        self.last_result = None
+        self.hits = 0
+        self.misses = 0
+        self.throttled = 0
+
+    def cell(self, x, z):
+        return (math.floor(x / self.cell_size), math.floor(z / self.cell_size))
+
+    def still_clear(self, span):
+        """The span moved less than the clearance of the last clear span"""
+        if self.clear_span is None:
+            return False
+        x0, z0, x1, z1 = self.clear_span
+        moved = max(math.sqrt((span[0] - x0)**2 + (span[1] - z0)**2),
+                    math.sqrt((span[2] - x1)**2 + (span[3] - z1)**2))
+        return moved < self.clearance
+
+    def lookup(self, key, span, still_blocks):
+        """Cached answer for the span, or None when the full check is needed"""
+        if self.still_clear(span):
+            return True
+        blocker = self.blockers.get(key)
+        if blocker is not None and still_blocks(blocker):
+            return False
+        if (self.last_blocker is not None and self.last_blocker is not blocker and
+                still_blocks(self.last_blocker)):
+            # Usually the same wall keeps blocking as the actors move into new cells
+            self.remember(key, self.last_blocker)
+            return False
+        return None
+
+    def check(self, observer, target, span, still_blocks, evaluate, current_time=None):
+        """Visibility from observer (x, z) to target (x, z) along span (x0, z0, x1, z1)
+
+        still_blocks(blocker) tells whether a blocker from an earlier check
+        blocks span; evaluate() does the full check and returns (visible,
+        blocker or None, clearance or None).
+        """
+        if (self.rate and current_time is not None and self.last_time is not None and
+                current_time - self.last_time < 1.0 / self.rate):
+            self.throttled += 1
+            return self.last_result
+
+        key = (self.cell(*observer), self.cell(*target))
+        visible = self.lookup(key, span, still_blocks)
+        if visible is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            visible, blocker, clearance = evaluate()
+            if blocker is not None:
+                self.remember(key, blocker)
+                self.last_blocker = blocker
+            if visible and clearance is not None:
+                self.clear_span = span
+                self.clearance = clearance
+
+        self.last_time = current_time
+        self.last_result = visible
+        return visible
+
+    def remember(self, key, blocker):
+        if len(self.blockers) >= self.max_entries:
+            self.blockers.clear()
+        self.blockers[key] = blocker
+
+    def clear(self):
+        self.blockers.clear()
+        self.last_blocker = None
+        self.clear_span = None
+        self.last_time = None
+
+    def stats(self):
+        """Hit/miss counters (a hit is an answer found without the full check)"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'throttled': self.throttled,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': len(self.blockers),
+        }
@@ -0,0 +1,156 @@
+# profiler.py
+import csv
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+
+from gl_recorder import DRAW_CALLS
+
+COLLISION_QUERIES = ('collides', 'collides_many', 'sweep_hit', 'sweep_clearance')
+
+class Section:
+    """Context manager adding the time spent inside it to a profiler section"""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        times = self.profiler.current['times']
+        times[self.name] = times.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+class Profiler:
+    """Per-frame CPU time per subsystem, GL draw calls and collision queries
+
+    Usage:
+        profiler.enable(objloader, mesh_renderer)  # Modules whose draw calls to count
+        profiler.begin_frame()
+        with profiler.section('render'):
+            render_scene()
+        profiler.end_frame()
+        profiler.export('trace.csv')
+
+    The last `history` frames are kept in a ring buffer. While disabled,
+    section() returns a shared no-op context and nothing is patched, so the
+    instrumented code pays one attribute check per section.
+    """
+
+    def __init__(self, history=600):
+        self.enabled = False
+        self.frames = deque(maxlen=history)
+        self.current = self.new_frame()
+        self.frame_start = 0.0
+        self.sections = {}
+        self.null_section = nullcontext()
+        self.patched = []
+
+    @staticmethod
+    def new_frame():
+        return {'times': {}, 'counts': {}, 'frame': 0.0}
+
+    def enable(self, *modules):
+        """Start recording, counting draw calls made through the given modules' gl* names"""
+        if self.enabled:
+            return
+        from collision import CollisionGrid
+
+        for module in modules:
+            for name in DRAW_CALLS:
+                if hasattr(module, name):
+                    self.patch(module, name, 'draw_calls')
+        for name in COLLISION_QUERIES:
+            self.patch(CollisionGrid, name, 'collision_queries')
+        self.enabled = True
+        self.current = self.new_frame()
+
+    def disable(self):
+        """Stop recording and restore everything enable() patched"""
+        for owner, name, value in reversed(self.patched):
+            setattr(owner, name, value)
+        self.patched = []
+        self.enabled = False
+
+    def patch(self, owner, name, counter):
+        original = vars(owner)[name]
+
+        def counted(*args, **kwargs):
+            counts = self.current['counts']
+            counts[counter] = counts.get(counter, 0) + 1
+            return original(*args, **kwargs)
+        counted.__name__ = name
+        self.patched.append((owner, name, original))
+        setattr(owner, name, counted)
+
+    def section(self, name):
+        """Context manager timing a subsystem (times add up if entered several times a frame)"""
+        if not self.enabled:
+            return self.null_section
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = Section(self, name)
+        return section
+
+    def count(self, name, n=1):
+        if self.enabled:
+            counts = self.current['counts']
+            counts[name] = counts.get(name, 0) + n
+
+    def begin_frame(self):
+        if self.enabled:
+            self.current = self.new_frame()
+            self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if self.enabled:
+            self.current['frame'] = time.perf_counter() - self.frame_start
+            self.frames.append(self.current)
+
+    def columns(self):
+        """Section and counter names seen in the recorded frames, in first-seen order"""
+        times, counts = {}, {}
+        for frame in self.frames:
+            times.update(dict.fromkeys(frame['times']))
+            counts.update(dict.fromkeys(frame['counts']))
+        return list(times), list(counts)
+
+    def rows(self):
+        """One dict per recorded frame: frame and section times in ms, then the counters"""
+        times, counts = self.columns()
+        rows = []
+        for i, frame in enumerate(self.frames):
+            row = {'frame': i, 'frame_ms': frame['frame'] * 1000}
+            for name in times:
+                row[f'{name}_ms'] = frame['times'].get(name, 0.0) * 1000
+            for name in counts:
+                row[name] = frame['counts'].get(name, 0)
+            rows.append(row)
+        return rows
+
+    def summary(self):
+        """Mean per frame of every time (ms) and counter over the recorded frames"""
+        rows = self.rows()
+        if not rows:
+            return {}
+        return {key: sum(row[key] for row in rows) / len(rows) for key in rows[0] if key != 'frame'}
+
+    def export(self, path):
+        """Write the recorded frames to a .json file, or CSV for any other extension"""
+        rows = self.rows()
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump({'frames': rows, 'summary': self.summary()}, f, indent=1)
+        else:
+            with open(path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ['frame'])
+                writer.writeheader()
+                writer.writerows(rows)
+        print(f"Profile of {len(rows)} frames written to {path}")
+
+profiler = Profiler()
@@ -0,0 +1,17 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+@pytest.fixture(scope='session')
+def game():
+    """main with backroom.obj loaded into its globals, without a window or GL objects"""
+    import main
+
+    main.load_map_headless(os.path.join(ROOT, 'backroom.obj'))
+    return main
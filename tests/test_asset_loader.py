@@ -0,0 +1,22 @@
+# tests/test_asset_loader.py
+import time
+
+from asset_loader import AssetLoader
+from objloader import OBJ
+
+def test_job_without_gl_tasks_is_done_once_prepared(tmp_path, monkeypatch):
+    filename = tmp_path / 'quad.obj'
+    filename.write_text("v 0 0 0\nv 1 0 0\nv 1 0 1\nv 0 0 1\nf 1 2 3 4\n")
+    monkeypatch.setattr(OBJ, 'generate_on_init', False)  # No buffers to upload
+    monkeypatch.setattr(OBJ, 'use_cache', False)
+
+    loader = AssetLoader(max_workers=1)
+    job = loader.load_obj(str(filename))
+    deadline = time.perf_counter() + 10.0
+    while not loader.update() and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    loader.shutdown()
+
+    assert job.done and job.error is None
+    assert job.gl_tasks == [] and job.model is job.prepared
+    assert job.progress() == 1.0 and loader.progress() == 1.0
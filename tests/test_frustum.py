@@ -0,0 +1,74 @@
+# tests/test_frustum.py
+import math
+import random
+
+import numpy as np
+import pytest
+
+import mesh_renderer
+from frustum import Frustum, look_at_matrix, perspective_matrix
+from gl_recorder import GLRecorder
+
+def camera_poses(game, count, headings=8, seed=1):
+    """(eye, center) for random valid player positions looking in evenly spaced directions"""
+    rng = random.Random(seed)
+    poses = []
+    while len(poses) < count * headings:
+        x = rng.uniform(-game.MAP_BOUNDARY, game.MAP_BOUNDARY)
+        z = rng.uniform(-game.MAP_BOUNDARY, game.MAP_BOUNDARY)
+        if not game.is_valid_move(x, z):
+            continue
+        for i in range(headings):
+            angle = 2 * math.pi * i / headings
+            poses.append(((x, game.EYE_Y, z), (x + math.cos(angle), game.EYE_Y, z + math.sin(angle))))
+    return poses
+
+@pytest.fixture(scope='module')
+def buffers(game):
+    return mesh_renderer.MeshBuffers(game.map_model.mesh, chunk_size=game.MAP_CHUNK_SIZE)
+
+def test_camera_planes_match_gl_matrices(game):
+    aspect = game.SCREEN_WIDTH / game.SCREEN_HEIGHT
+    projection = perspective_matrix(game.FOVY, aspect, game.ZNEAR, game.ZFAR)
+    for eye, center in camera_poses(game, 10):
+        expected = Frustum.from_matrix(projection @ look_at_matrix(eye, center, (0, 1, 0)))
+        actual = Frustum.from_camera(game.FOVY, aspect, game.ZNEAR, game.ZFAR, eye, center)
+        assert np.allclose(actual.planes, expected.planes, atol=1e-6)
+
+def test_box_tests_agree():
+    frustum = Frustum.from_camera(60.0, 1.5, 0.1, 16.0, (0, 1, 0), (1, 1, 0))
+    rng = np.random.default_rng(1)
+    mins = rng.uniform(-20, 20, (500, 3))
+    maxs = mins + rng.uniform(0, 4, (500, 3))
+    expected = [frustum.box_visible(lo, hi) for lo, hi in zip(mins, maxs)]
+    assert frustum.boxes_visible(mins, maxs).tolist() == expected
+    assert any(expected) and not all(expected)
+
+def test_culling_never_drops_a_visible_triangle(game, buffers):
+    aspect = game.SCREEN_WIDTH / game.SCREEN_HEIGHT
+    corners = buffers.vertices[buffers.indices.reshape(-1, 3)][:, :, 0:3]
+    chunk_of_tri = np.zeros(len(corners), dtype=np.int64)
+    for i, (_, _, groups) in enumerate(buffers.chunks):
+        for _, first, count in groups:
+            chunk_of_tri[first // 3:(first + count) // 3] = i
+
+    recorder = GLRecorder()
+    seen = 0
+    with recorder.patch(mesh_renderer):
+        buffers.upload()
+        for eye, center in camera_poses(game, 20):
+            frustum = Frustum.from_camera(game.FOVY, aspect, game.ZNEAR, game.ZFAR, eye, center)
+            recorder.reset()
+            buffers.draw({}, frustum)
+
+            visible_chunks = frustum.boxes_visible(buffers.chunk_mins, buffers.chunk_maxs)
+            assert buffers.drawn_chunks == sum(frustum.box_visible(lo, hi) for lo, hi, _ in buffers.chunks)
+            assert recorder.count('glDrawElements') == sum(
+                len(groups) for (_, _, groups), visible in zip(buffers.chunks, visible_chunks) if visible)
+
+            # Any triangle with a corner inside every plane must be in a drawn chunk
+            distances = corners @ frustum.planes[:, :3].T + frustum.planes[:, 3]
+            inside = (distances >= 0).all(axis=2).any(axis=1)
+            seen += int(inside.sum())
+            assert not (inside & ~visible_chunks[chunk_of_tri]).any()
+    assert seen
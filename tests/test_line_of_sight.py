@@ -0,0 +1,50 @@
+# tests/test_line_of_sight.py
+import random
+
+from monster import Monster
+
+def sight_pairs(game, monster, count, seed=1):
+    """(monster position, player position) pairs with the monster somewhere it fits"""
+    rng = random.Random(seed)
+    world = game.collision_world
+    pairs = []
+    while len(pairs) < count:
+        mx, mz = rng.uniform(-monster.boundary, monster.boundary), rng.uniform(-monster.boundary, monster.boundary)
+        if not monster.is_position_valid(mx, mz, world):
+            continue
+        px = rng.uniform(-game.MAP_BOUNDARY, game.MAP_BOUNDARY)
+        pz = rng.uniform(-game.MAP_BOUNDARY, game.MAP_BOUNDARY)
+        pairs.append(((mx, mz), (px, pz)))
+    return pairs
+
+def sight(monster, pairs, world):
+    results = []
+    for (mx, mz), (px, pz) in pairs:
+        monster.x, monster.z = mx, mz
+        results.append(monster.line_of_sight(px, pz, world))
+    return results
+
+def test_swept_sight_never_sees_through_sampled_walls(game, monkeypatch):
+    monster = Monster(model=False)
+    world = game.collision_world
+    pairs = sight_pairs(game, monster, 1000)
+
+    monkeypatch.setattr(Monster, 'use_swept_sight', False)
+    sampled = sight(monster, pairs, world)
+    monkeypatch.setattr(Monster, 'use_swept_sight', True)
+    swept = sight(monster, pairs, world)
+
+    assert any(swept) and not all(sampled)
+    seen_through = [pair for pair, a, b in zip(pairs, sampled, swept) if b and not a]
+    assert seen_through == []
+
+def test_swept_sight_blocked_by_thin_wall(game):
+    """A wall thinner than the 0.5-unit sample spacing still blocks the swept check"""
+    monster = Monster(model=False)
+    world = game.collision_world
+    box = next(b for b in world.grid.boxes
+               if b[1] - b[0] < 0.05 and b[3] - b[2] > 2.0 and b[4] < monster.y < b[5])
+    min_x, max_x, min_z, max_z = box[:4]
+    wall_x, wall_z = (min_x + max_x) / 2, (min_z + max_z) / 2
+    monster.x, monster.z = wall_x - 3.0, wall_z
+    assert not monster.line_of_sight(wall_x + 3.0, wall_z, world)
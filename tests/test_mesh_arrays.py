@@ -0,0 +1,104 @@
+# tests/test_mesh_arrays.py
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+import mesh_cache
+from conftest import ROOT
+from mesh_arrays import MeshArrays, parse_obj
+from objloader import OBJ
+
+SYNTHETIC_OBJ = """\
+# Faces before any usemtl, negative (relative) indices and every corner format
+mtllib synthetic.mtl
+v 0 0 0
+v 1 0 0
+v 1 1 0
+v 0 1 0
+v 0 0 1 1.0
+vt 0 0
+vt 1 0
+vt 1 1
+vn 0 0 1
+f 1 2 3
+f -4/-3 -3/-2 -2/-1
+usemtl red
+f 1//1 2//1 3//1 4//1
+f 1/1/1 2/2/1 5/3/1
+usemtl blue
+f 2/1 3/2 4/3
+usemtl red
+f 1 3 4/1/1
+f 1 9 2
+"""
+
+def text_parsed(filename, monkeypatch):
+    """MeshArrays.from_lists of the line-by-line text parser, with no cache and no GL"""
+    monkeypatch.setattr(OBJ, 'parser', 'text')
+    monkeypatch.setattr(OBJ, 'use_cache', False)
+    return OBJ(filename, defer_gl=True).mesh
+
+def assert_same_mesh(actual, expected):
+    for name in MeshArrays.ARRAY_FIELDS:
+        a, e = getattr(actual, name), getattr(expected, name)
+        assert a.dtype == e.dtype, name
+        assert a.shape == e.shape, name
+        assert np.array_equal(a, e), name
+    assert actual.material_names == expected.material_names
+    assert actual.mtllibs == expected.mtllibs
+
+@pytest.fixture
+def synthetic_obj(tmp_path):
+    path = tmp_path / 'synthetic.obj'
+    path.write_text(SYNTHETIC_OBJ)
+    return str(path)
+
+@pytest.fixture(scope='module')
+def backroom_obj(tmp_path_factory):
+    """backroom.obj and its materials copied to a scratch directory, so caches are written there"""
+    directory = tmp_path_factory.mktemp('backroom')
+    for name in ('backroom.obj', 'backroom.mtl'):
+        shutil.copy(os.path.join(ROOT, name), directory / name)
+    return str(directory / 'backroom.obj')
+
+def test_synthetic_numpy_parser_matches_text_parser(synthetic_obj, monkeypatch):
+    expected = text_parsed(synthetic_obj, monkeypatch)
+    assert expected.face_count == 7
+    assert expected.material_names == ['red', 'blue']
+    assert expected.material_runs.tolist() == [[-1, 0, 2], [0, 2, 2], [1, 4, 1], [0, 5, 2]]
+    assert_same_mesh(parse_obj(synthetic_obj), expected)
+
+def test_synthetic_cache_round_trip(synthetic_obj, monkeypatch):
+    expected = text_parsed(synthetic_obj, monkeypatch)
+    assert mesh_cache.load(synthetic_obj) is None
+    mesh_cache.save(synthetic_obj, parse_obj(synthetic_obj))
+    assert_same_mesh(mesh_cache.load(synthetic_obj), expected)
+    # A stale cache is ignored once the source changes
+    with open(synthetic_obj, 'a') as f:
+        f.write("f 1 2 4\n")
+    assert mesh_cache.load(synthetic_obj) is None
+
+def test_synthetic_swapyz(synthetic_obj, monkeypatch):
+    expected = text_parsed(synthetic_obj, monkeypatch)
+    swapped = parse_obj(synthetic_obj, swapyz=True)
+    assert np.array_equal(swapped.vertices, expected.vertices[:, [0, 2, 1]])
+    assert np.array_equal(swapped.normals, expected.normals[:, [0, 2, 1]])
+
+def test_backroom_numpy_parser_matches_text_parser(backroom_obj, monkeypatch):
+    assert_same_mesh(parse_obj(backroom_obj), text_parsed(backroom_obj, monkeypatch))
+
+def test_backroom_cache_round_trip(backroom_obj, monkeypatch):
+    expected = text_parsed(backroom_obj, monkeypatch)
+    mesh_cache.save(backroom_obj, parse_obj(backroom_obj))
+    assert_same_mesh(mesh_cache.load(backroom_obj), expected)
+
+def test_face_view_matches_text_parser_faces(synthetic_obj, monkeypatch):
+    monkeypatch.setattr(OBJ, 'use_cache', False)
+    monkeypatch.setattr(OBJ, 'parser', 'text')
+    expected = OBJ(synthetic_obj, defer_gl=True).faces
+    monkeypatch.setattr(OBJ, 'parser', 'numpy')
+    model = OBJ(synthetic_obj, defer_gl=True)
+    assert model.faces is model.faces  # Built once, not on every access
+    assert [tuple(face) for face in model.faces] == [tuple(face) for face in expected]
@@ -0,0 +1,50 @@
+# tests/test_mesh_lod.py
+import numpy as np
+import pytest
+
+import mesh_lod
+from mesh_renderer import build_batches
+from objloader import OBJ
+
+@pytest.fixture(scope='module')
+def batches(game):
+    return build_batches(game.map_model.mesh, game.MAP_CHUNK_SIZE)
+
+def chunk_edges(indices, rows, keep=None):
+    """{chunk: set of (a, b) vertex index pairs its triangles have as edges}"""
+    edges = {}
+    for chunk, _, first, count in rows:
+        triangles = indices[first:first + count].reshape(-1, 3)
+        pairs = np.sort(np.concatenate([triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [0, 2]]]), axis=1)
+        if keep is not None:
+            pairs = pairs[keep[pairs].all(axis=1)]
+        edges.setdefault(int(chunk), set()).update(map(tuple, pairs.tolist()))
+    return edges
+
+def test_levels_keep_every_chunk_border_edge(batches):
+    vertices, indices, groups, chunks = batches
+    rows = mesh_lod.group_rows(groups, chunks)
+    tri_chunk = np.zeros(len(indices) // 3, dtype=np.int64)
+    for chunk, _, first, count in rows:
+        tri_chunk[first // 3:(first + count) // 3] = chunk
+    border = mesh_lod.chunk_borders(vertices, indices.reshape(-1, 3), tri_chunk)
+    assert border.any()
+
+    # Edges between border vertices are where a chunk meets its neighbours
+    full = chunk_edges(indices, rows, border)
+    for level_indices, level_rows in mesh_lod.build_lods(batches, OBJ.lod_cell_sizes):
+        assert len(level_indices) < len(indices)
+        level = chunk_edges(level_indices, level_rows)
+        for chunk, edges in full.items():
+            assert edges <= level.get(chunk, set())
+        # and no level joins border vertices the chunk did not already join
+        level_border = chunk_edges(level_indices, level_rows, border)
+        assert all(edges <= full[chunk] for chunk, edges in level_border.items())
+
+def test_pinned_vertices_are_their_own_cluster(batches):
+    vertices = batches[0]
+    pinned = np.zeros(len(vertices), dtype=bool)
+    pinned[::3] = True
+    representative = mesh_lod.cluster_vertices(vertices, 0.4, pinned)
+    assert np.array_equal(representative[pinned], np.flatnonzero(pinned))
+    assert (representative[~pinned] != np.flatnonzero(~pinned)).any()
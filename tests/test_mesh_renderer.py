@@ -0,0 +1,66 @@
+# tests/test_mesh_renderer.py
+import os
+
+import numpy as np
+import pytest
+
+import mesh_renderer
+from conftest import ROOT
+from gl_recorder import GLRecorder
+from mesh_arrays import parse_obj
+from mesh_renderer import MeshBuffers
+
+@pytest.fixture(scope='module')
+def backroom_mesh():
+    return parse_obj(os.path.join(ROOT, 'backroom.obj'))
+
+def record_draw(buffers):
+    """GL calls of one draw() with no frustum, PVS or LOD culling"""
+    recorder = GLRecorder()
+    with recorder.patch(mesh_renderer):
+        buffers.upload()
+        recorder.reset()
+        buffers.draw({})
+    return recorder
+
+def test_one_draw_call_per_material(backroom_mesh):
+    buffers = MeshBuffers(backroom_mesh)
+    used_materials = np.unique(backroom_mesh.face_materials())
+    assert len(buffers.groups) == len(used_materials)
+
+    recorder = record_draw(buffers)
+    assert recorder.draw_calls() == recorder.count('glDrawElements') == len(buffers.groups)
+    assert buffers.drawn_triangles == buffers.triangle_count
+
+def test_chunked_buffers_draw_every_group(backroom_mesh):
+    buffers = MeshBuffers(backroom_mesh, chunk_size=4.0)
+    recorder = record_draw(buffers)
+    assert recorder.draw_calls() == len(buffers.groups)
+    assert buffers.drawn_chunks == len(buffers.chunks)
+    assert buffers.drawn_triangles == buffers.triangle_count
+
+def test_groups_cover_every_triangle_once(backroom_mesh):
+    buffers = MeshBuffers(backroom_mesh)
+    covered = np.zeros(len(buffers.indices), dtype=np.int64)
+    for _, first, count in buffers.groups:
+        covered[first:first + count] += 1
+    assert (covered == 1).all()
+
+def test_failed_upload_deletes_the_vertex_buffer(backroom_mesh):
+    buffers = MeshBuffers(backroom_mesh)
+    recorder = GLRecorder()
+    with recorder.patch(mesh_renderer):
+        buffer_data = mesh_renderer.glBufferData
+        def failing_buffer_data(target, *args):
+            if target == mesh_renderer.GL_ELEMENT_ARRAY_BUFFER:
+                raise RuntimeError("out of memory")
+            return buffer_data(target, *args)
+        mesh_renderer.glBufferData = failing_buffer_data
+
+        with pytest.raises(RuntimeError):
+            buffers.upload()
+    # Both buffers were created before the index upload failed
+    created = {args[1] for name, args in recorder.calls if name == 'glBindBuffer' and args[1]}
+    deleted = [args[1][0] for name, args in recorder.calls if name == 'glDeleteBuffers']
+    assert len(created) == 2 and sorted(deleted) == sorted(created)
+    assert buffers.vbo == buffers.ibo == 0
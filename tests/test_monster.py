@@ -0,0 +1,39 @@
+# tests/test_monster.py
+from monster import Monster
+
+def visible_player(game, monster):
+    """A player position in sight of the monster, 3 to 6 units away"""
+    for dx in range(-6, 7):
+        for dz in range(-6, 7):
+            x, z = monster.x + dx, monster.z + dz
+            if 3 <= (dx * dx + dz * dz) ** 0.5 <= 6 and game.is_valid_move(x, z) and \
+                    monster.line_of_sight(x, z, game.collision_world):
+                return x, z
+    raise AssertionError("no visible player position")
+
+def test_monster_plans_on_first_tick(game):
+    monster = Monster(start_x=8.0, start_z=8.0, model=False)
+    x, z = visible_player(game, monster)
+    monster.update_ai_state(x, z, game.collision_world, 0.0)
+    assert monster.state == "following_path" and monster.path
+
+def test_failed_repair_and_full_search_count_one_replan(game):
+    monster = Monster(start_x=8.0, start_z=8.0, model=False)
+    x, z = visible_player(game, monster)
+    monster.update_ai_state(x, z, game.collision_world, 0.0)
+    assert monster.replans == 1
+
+    # With a one-node budget a search only reaches a target cell the path already has
+    path_cells = {monster.world_to_grid(*waypoint) for waypoint in monster.path}
+    path_cells.add(monster.world_to_grid(monster.x, monster.z))
+    moved = next((x + dx, z + dz) for dx, dz in ((2.5, 0.0), (-2.5, 0.0), (0.0, 2.5), (0.0, -2.5))
+                 if game.is_valid_move(x + dx, z + dz) and
+                 monster.world_to_grid(x + dx, z + dz) not in path_cells and
+                 monster.line_of_sight(x + dx, z + dz, game.collision_world))
+    monster.max_path_nodes = 1
+    total = monster.total_replan_nodes
+    monster.update_ai_state(*moved, game.collision_world, monster.pathfind_interval)
+    assert monster.replans == 2 and monster.repairs == 0
+    info = monster.get_state_info()
+    assert (info['replans'], info['repairs'], info['last_replan_nodes']) == (2, 0, 2)
+    assert monster.last_replan_nodes == monster.total_replan_nodes - total == 2
@@ -0,0 +1,16 @@
+# tests/test_pathfinding.py
+import numpy as np
+
+from pathfinding import OccupancyGrid
+
+def test_grid_cache_round_trips_at_the_given_path(tmp_path):
+    walkable = np.random.default_rng(1).random((12, 9)) < 0.7
+    grid = OccupancyGrid(walkable, (0, 0), 1.5, 20.0)
+    path = str(tmp_path / 'monster_grid.cache')  # No .npz suffix
+    grid.save(path, 'key')
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['monster_grid.cache']
+    loaded = OccupancyGrid.load(path, 'key')
+    assert np.array_equal(loaded.walkable, walkable)
+    assert (loaded.origin, loaded.grid_size, loaded.offset) == (grid.origin, grid.grid_size, grid.offset)
+    assert OccupancyGrid.load(path, 'other key') is None
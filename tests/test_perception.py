@@ -0,0 +1,46 @@
+# tests/test_perception.py
+import os
+
+import pytest
+
+from conftest import ROOT
+from monster import Monster
+from perception import PerceptionCache
+
+def test_rate_reuses_the_last_answer_between_checks():
+    cache = PerceptionCache(rate=10)
+    evaluations = []
+    def evaluate():
+        evaluations.append(True)
+        return False, None, None
+    for tick in range(60):
+        cache.check((0.0, 0.0), (5.0, 0.0), (0.5, 0.0, 4.5, 0.0), lambda box: False, evaluate, tick / 60)
+    stats = cache.stats()
+    assert len(evaluations) == stats['misses'] == 10
+    assert stats['throttled'] == 50 and stats['hits'] == 0
+
+def test_blocker_of_the_cell_pair_answers_without_the_full_check():
+    cache = PerceptionCache()
+    wall = (2.0, 2.1, -1.0, 1.0)
+    blocks = lambda box: box == wall
+    assert not cache.check((0.0, 0.0), (5.0, 0.0), (0.5, 0.0, 4.5, 0.0), blocks, lambda: (False, wall, None))
+    assert not cache.check((0.1, 0.0), (5.0, 0.1), (0.6, 0.0, 4.5, 0.1), blocks, pytest.fail)
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_headless_outcome_does_not_depend_on_the_cache(game, monkeypatch, seed):
+    answers = []  # Cached answers, None for a miss
+    lookup = PerceptionCache.lookup
+    def recorded_lookup(self, *args):
+        answers.append(lookup(self, *args))
+        return answers[-1]
+    monkeypatch.setattr(PerceptionCache, 'lookup', recorded_lookup)
+
+    outcomes = []
+    for cached in (False, True):
+        monkeypatch.setattr(Monster, 'use_perception_cache', cached)
+        result = game.run_headless(os.path.join(ROOT, 'backroom.obj'), ticks=3000, seed=seed)
+        del result['ticks_per_second']
+        outcomes.append(result)
+    assert outcomes[0] == outcomes[1]
+    assert None in answers and any(answer is not None for answer in answers)
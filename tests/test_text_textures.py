@@ -0,0 +1,41 @@
+# tests/test_text_textures.py
+import texture_registry
+from gl_recorder import GLRecorder
+from texture_registry import TextTextureCache
+
+def deleted_textures(recorder):
+    return [texid for name, args in recorder.calls if name == 'glDeleteTextures' for texid in args[0]]
+
+def test_texture_count_stays_bounded():
+    recorder = GLRecorder()
+    cache = TextTextureCache(capacity=8)
+    with recorder.patch(texture_registry):
+        peak = 0
+        for frame in range(1200):
+            # A clock that changes every second plus a title that never does
+            cache.get(f"Time: {frame // 60}s")
+            cache.get("GAME OVER")
+            peak = max(peak, len(cache.entries))
+            assert recorder.count('glGenTextures') - len(deleted_textures(recorder)) == len(cache.entries)
+        cache.clear()
+
+    created = recorder.count('glGenTextures')
+    assert peak <= cache.capacity
+    assert created == cache.created == 21  # 20 clock strings and the title, each uploaded once
+    deleted = deleted_textures(recorder)
+    assert len(deleted) == len(set(deleted)) == created == cache.deleted
+    assert not cache.entries
+
+def test_hits_reuse_the_texture():
+    recorder = GLRecorder()
+    cache = TextTextureCache(capacity=2)
+    with recorder.patch(texture_registry):
+        first = cache.get("A")
+        assert cache.get("A") == first
+        cache.get("B")
+        cache.get("A")  # A becomes most recent, so C evicts B
+        cache.get("C")
+        assert set(key[0] for key in cache.entries) == {"A", "C"}
+        cache.clear()
+    assert recorder.count('glGenTextures') == 3
+    assert cache.hits == 2
@@ -0,0 +1,45 @@
+# tests/test_timestep.py
+import os
+
+import pytest
+
+from conftest import ROOT
+from timestep import FixedTimestep
+
+def test_ticks_per_frame_follow_the_accumulated_time():
+    timestep = FixedTimestep(rate=60)
+    assert list(timestep.ticks(0.5 / 60)) == []
+    assert timestep.alpha == pytest.approx(0.5)
+    assert len(list(timestep.ticks(2.0 / 60))) == 2
+    assert timestep.ticks_run == 2
+    assert timestep.alpha == pytest.approx(0.5)
+
+def test_tick_times_are_counted_not_summed():
+    timestep = FixedTimestep(rate=60)
+    times = [t for _ in range(1000) for t in timestep.ticks(1 / 144)]
+    assert times == [i * timestep.step for i in range(len(times))]
+
+def test_long_frames_are_clamped():
+    timestep = FixedTimestep(rate=60, max_frame_time=0.25)
+    assert len(list(timestep.ticks(10.0))) == 15
+
+def test_reset():
+    timestep = FixedTimestep(rate=60)
+    list(timestep.ticks(0.1))
+    timestep.reset()
+    assert timestep.ticks_run == 0 and timestep.accumulator == 0.0 and timestep.time == 0.0
+
+def test_reset_game_restarts_the_tick_clock(game):
+    timestep = FixedTimestep(rate=60)
+    list(timestep.ticks(0.2))
+    game.reset_game(model=False, timestep=timestep)
+    assert timestep.time == 0.0
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_headless_outcome_does_not_depend_on_frame_rate(game, seed):
+    outcomes = {}
+    for fps in (30, 60, 144, 0):  # 0: uneven 1-50 ms frames
+        result = game.run_headless(os.path.join(ROOT, 'backroom.obj'), ticks=1500, seed=seed, fps=fps)
+        del result['ticks_per_second']
+        outcomes[fps] = result
+    assert all(outcome == outcomes[60] for outcome in outcomes.values())
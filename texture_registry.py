@@ -0,0 +1,159 @@
+# texture_registry.py
+import os
+import threading
+from collections import OrderedDict
+import pygame
+from OpenGL.GL import *
+
+class TextureRegistry:
+    """Process-wide cache of GL textures keyed by image path and decode options
+
+    Each acquire() of a cached texture bumps its reference count; the GL
+    texture is deleted when release() drops the count to zero.
+    """
+
+    def __init__(self):
+        self.entries = {}  # key -> [texid, refcount, bytes]
+        self.keys_by_id = {}
+        self.decode_count = 0
+        self.hit_count = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(imagefile, fmt='RGBA', flip=True, filtering=GL_LINEAR):
+        return (os.path.realpath(imagefile), fmt, flip, int(filtering))
+
+    def contains(self, imagefile, fmt='RGBA', flip=True, filtering=GL_LINEAR):
+        return self.make_key(imagefile, fmt, flip, filtering) in self.entries
+
+    def decode(self, imagefile, fmt='RGBA', flip=True):
+        """Decode an image to (pixels, (width, height)); safe to call from worker threads"""
+        surf = pygame.image.load(imagefile)
+        image = pygame.image.tostring(surf, fmt, flip)
+        with self.lock:
+            self.decode_count += 1
+        return image, surf.get_rect().size
+
+    def acquire(self, imagefile, fmt='RGBA', flip=True, filtering=GL_LINEAR, decoded=None):
+        """Return a texture id for the image, decoding and uploading it only once
+
+        decoded may hold the result of decode() done ahead of time on another thread.
+        """
+        key = self.make_key(imagefile, fmt, flip, filtering)
+        entry = self.entries.get(key)
+        if entry:
+            entry[1] += 1
+            self.hit_count += 1
+            return entry[0]
+
+        image, (ix, iy) = decoded or self.decode(imagefile, fmt, flip)
+
+        texid = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texid)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, filtering)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, filtering)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, ix, iy, 0, GL_RGBA, GL_UNSIGNED_BYTE, image)
+
+        self.entries[key] = [texid, 1, len(image)]
+        self.keys_by_id[texid] = key
+        return texid
+
+    def release(self, texid):
+        """Drop one reference to a texture, deleting it when unused"""
+        key = self.keys_by_id.get(texid)
+        if key is None:
+            return
+        entry = self.entries[key]
+        entry[1] -= 1
+        if entry[1] <= 0:
+            glDeleteTextures([texid])
+            del self.entries[key]
+            del self.keys_by_id[texid]
+
+    def clear(self):
+        """Delete every texture regardless of reference counts"""
+        if self.keys_by_id:
+            glDeleteTextures(list(self.keys_by_id))
+        self.entries.clear()
+        self.keys_by_id.clear()
+
+    def texture_bytes(self):
+        """Bytes of pixel data currently uploaded"""
+        return sum(entry[2] for entry in self.entries.values())
+
+    def stats(self):
+        """Decode/hit counters and live texture totals"""
+        return {
+            'decodes': self.decode_count,
+            'hits': self.hit_count,
+            'live_textures': len(self.entries),
+            'references': sum(entry[1] for entry in self.entries.values()),
+            'texture_bytes': self.texture_bytes(),
+        }
+
+class TextTextureCache:
+    """Rendered text textures keyed by (text, color, font size), least recently used evicted
+
+    The cache owns the textures: callers must not delete them, and a texture
+    may be deleted once more than `capacity` other strings have been drawn.
+    """
+
+    def __init__(self, capacity=64, font_name=None):
+        self.capacity = capacity
+        self.font_name = font_name
+        self.fonts = {}  # size -> pygame font
+        self.entries = OrderedDict()  # (text, color, size) -> (texid, width, height)
+        self.created = 0
+        self.deleted = 0
+        self.hits = 0
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            pygame.font.init()
+            font = self.fonts[size] = pygame.font.Font(self.font_name, size)
+        return font
+
+    def get(self, text, color=(255, 255, 255), size=74):
+        """(texid, width, height) of the text rendered in color at size, uploading it on a miss"""
+        key = (text, tuple(color), size)
+        entry = self.entries.get(key)
+        if entry:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        surface = self.font(size).render(text, True, color)
+        data = pygame.image.tostring(surface, "RGBA", True)
+        width, height = surface.get_size()
+        texid = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texid)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, data)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        self.created += 1
+
+        entry = self.entries[key] = (texid, width, height)
+        while len(self.entries) > self.capacity:
+            _, (old, _, _) = self.entries.popitem(last=False)
+            glDeleteTextures([old])
+            self.deleted += 1
+        return entry
+
+    def clear(self):
+        """Delete every cached texture (on shutdown or when the GL context goes away)"""
+        if self.entries:
+            glDeleteTextures([texid for texid, _, _ in self.entries.values()])
+            self.deleted += len(self.entries)
+        self.entries.clear()
+
+    def stats(self):
+        return {
+            'live_textures': len(self.entries),
+            'created': self.created,
+            'deleted': self.deleted,
+            'hits': self.hits,
+        }
+
+textures = TextureRegistry()
+text_textures = TextTextureCache()
@@ -0,0 +1,37 @@
+# timestep.py
+class FixedTimestep:
+    """Runs game logic at a fixed rate however often frames are drawn
+
+    Each frame adds its duration to an accumulator and ticks() yields one
+    simulation time per whole step in it. What is left over, as a fraction
+    of a step (alpha), is how far rendering should interpolate between the
+    previous and the current tick.
+    """
+
+    def __init__(self, rate=60, max_frame_time=0.25):
+        self.step = 1.0 / rate
+        self.max_frame_time = max_frame_time  # Long stalls are dropped instead of replayed
+        self.accumulator = 0.0
+        self.ticks_run = 0
+
+    @property
+    def time(self):
+        """Simulation time of the next tick (counted, so it never drifts)"""
+        return self.ticks_run * self.step
+
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.step, 1.0)
+
+    def ticks(self, frame_time):
+        """Yield the simulation time of every tick due after a frame of frame_time seconds"""
+        self.accumulator += min(frame_time, self.max_frame_time)
+        while self.accumulator >= self.step:
+            current_time = self.time
+            self.accumulator -= self.step
+            self.ticks_run += 1
+            yield current_time
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.ticks_run = 0
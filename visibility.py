@@ -0,0 +1,239 @@
+# visibility.py
+"""Potentially visible sets: which map chunks can be seen from each cell of the player area
+
+Built offline from the collision geometry and kept in a cache file next to
+the map; the game only loads that file and draws without a PVS when it is
+missing or stale. Run as a script to build the cache and report how much
+of the map is visible on average:
+
+    python visibility.py [map.obj]
+"""
+import hashlib
+import math
+import os
+import sys
+
+import numpy as np
+
+def occlusion_raster(collision_world, resolution, min_y, max_y):
+    """(blocked, origin): XZ raster cells whose collision faces together cover min_y..max_y
+
+    A wall built from several stacked faces (skirting, wallpaper, ...) only
+    blocks sight where the faces leave no vertical gap between floor and
+    ceiling, so their height intervals are merged per cell.
+    """
+    soa = collision_world.grid.soa
+    if not len(soa):
+        return np.zeros((0, 0), dtype=bool), (0.0, 0.0)
+    origin = (float(soa.min_x.min()) - resolution, float(soa.min_z.min()) - resolution)
+    shape = (int((soa.max_x.max() - origin[0]) / resolution) + 2,
+             int((soa.max_z.max() - origin[1]) / resolution) + 2)
+
+    intervals = {}
+    for box_min_x, box_max_x, box_min_z, box_max_z, box_min_y, box_max_y in collision_world.grid.boxes:
+        if box_max_y < min_y or box_min_y > max_y:
+            continue
+        for ix in range(int((box_min_x - origin[0]) / resolution), int((box_max_x - origin[0]) / resolution) + 1):
+            for iz in range(int((box_min_z - origin[1]) / resolution), int((box_max_z - origin[1]) / resolution) + 1):
+                intervals.setdefault((ix, iz), []).append((box_min_y, box_max_y))
+
+    blocked = np.zeros(shape, dtype=bool)
+    for cell, spans in intervals.items():
+        covered = min_y
+        for low, high in sorted(spans):
+            if low > covered:
+                break
+            covered = max(covered, high)
+        blocked[cell] = covered >= max_y
+    return blocked, origin
+
+def ray_lengths(blocked, origin, resolution, x, z, directions, max_distance):
+    """Distance along each direction from (x, z) to the first blocked raster cell
+
+    Marches in blocks of steps, dropping rays once they hit, since most
+    stop at a nearby wall.
+    """
+    lengths = np.full(len(directions), max_distance)
+    active = np.arange(len(directions))
+    all_steps = np.arange(0.0, max_distance, resolution / 2)
+    for start in range(0, len(all_steps), 32):
+        steps = all_steps[start:start + 32]
+        xs = x + directions[active, 0:1] * steps
+        zs = z + directions[active, 1:2] * steps
+        ix = np.floor((xs - origin[0]) / resolution).astype(np.int64)
+        iz = np.floor((zs - origin[1]) / resolution).astype(np.int64)
+        inside = (ix >= 0) & (ix < blocked.shape[0]) & (iz >= 0) & (iz < blocked.shape[1])
+        hit = ~inside
+        hit[inside] = blocked[ix[inside], iz[inside]]
+        stopped = hit.any(axis=1)
+        lengths[active[stopped]] = steps[hit[stopped].argmax(axis=1)]
+        active = active[~stopped]
+        if not len(active):
+            break
+    return lengths
+
+def rays_reach(x, z, directions, lengths, mins, maxs):
+    """Boolean per box: some ray from (x, z) enters the XZ box before its length runs out"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv_x = 1.0 / directions[:, 0:1]
+        inv_z = 1.0 / directions[:, 1:2]
+        tx0, tx1 = (mins[:, 0] - x) * inv_x, (maxs[:, 0] - x) * inv_x
+        tz0, tz1 = (mins[:, 2] - z) * inv_z, (maxs[:, 2] - z) * inv_z
+    # A ray parallel to a slab is inside it everywhere or nowhere
+    parallel_x = directions[:, 0:1] == 0
+    inside_x = (mins[:, 0] <= x) & (x <= maxs[:, 0])
+    tx0 = np.where(parallel_x, np.where(inside_x, -np.inf, np.inf), tx0)
+    tx1 = np.where(parallel_x, np.where(inside_x, np.inf, -np.inf), tx1)
+    parallel_z = directions[:, 1:2] == 0
+    inside_z = (mins[:, 2] <= z) & (z <= maxs[:, 2])
+    tz0 = np.where(parallel_z, np.where(inside_z, -np.inf, np.inf), tz0)
+    tz1 = np.where(parallel_z, np.where(inside_z, np.inf, -np.inf), tz1)
+
+    t_enter = np.maximum(np.minimum(tx0, tx1), np.minimum(tz0, tz1))
+    t_exit = np.minimum(np.maximum(tx0, tx1), np.maximum(tz0, tz1))
+    return ((t_enter <= t_exit) & (t_exit >= 0) & (t_enter <= lengths[:, None])).any(axis=0)
+
+class PotentiallyVisibleSet:
+    """Map chunks visible from each cell of a square grid over the player area
+
+    visible[ix, iz] is a boolean mask over the chunks. It is sampled: rays
+    are cast in all directions from a few valid player positions in each
+    cell and stop at floor-to-ceiling walls, and chunk boxes are widened
+    by a margin to cover what falls between rays. Cells with no valid
+    position see everything.
+    """
+
+    def __init__(self, visible, origin, cell_size):
+        self.visible = visible
+        self.origin = origin
+        self.cell_size = cell_size
+
+    @classmethod
+    def build(cls, collision_world, chunk_mins, chunk_maxs, boundary, is_valid, cell_size=1.0,
+              rays=720, samples=3, resolution=0.1, min_y=0.05, max_y=2.15, margin=0.5):
+        """Cast rays from each cell of the square -boundary..boundary; is_valid(x, z) filters sample points"""
+        blocked, raster_origin = occlusion_raster(collision_world, resolution, min_y, max_y)
+        angles = np.linspace(0, 2 * math.pi, rays, endpoint=False)
+        directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+        mins = np.asarray(chunk_mins, dtype=float) - margin
+        maxs = np.asarray(chunk_maxs, dtype=float) + margin
+        max_distance = 2 * boundary + float(np.max(maxs[:, [0, 2]] - mins[:, [0, 2]])) + 2 * margin
+
+        cells = int(math.ceil(2 * boundary / cell_size))
+        origin = (-boundary, -boundary)
+        visible = np.ones((cells, cells, len(mins)), dtype=bool)
+        # samples x samples points spread over each cell, up to 0.05 units from its edges
+        offsets = np.linspace(0.05, 0.95, samples) * cell_size
+        for ix in range(cells):
+            for iz in range(cells):
+                x0 = origin[0] + ix * cell_size
+                z0 = origin[1] + iz * cell_size
+                points = [(x0 + dx, z0 + dz) for dx in offsets for dz in offsets
+                          if is_valid(x0 + dx, z0 + dz)]
+                if not points:
+                    continue
+                seen = np.zeros(len(mins), dtype=bool)
+                for x, z in points:
+                    lengths = ray_lengths(blocked, raster_origin, resolution, x, z, directions, max_distance)
+                    seen |= rays_reach(x, z, directions, lengths, mins, maxs)
+                visible[ix, iz] = seen
+        return cls(visible, origin, cell_size)
+
+    def cell(self, x, z):
+        return (int(math.floor((x - self.origin[0]) / self.cell_size)),
+                int(math.floor((z - self.origin[1]) / self.cell_size)))
+
+    def visible_chunks(self, x, z):
+        """Chunk mask for a viewer at (x, z), or None (draw everything) outside the grid"""
+        ix, iz = self.cell(x, z)
+        if 0 <= ix < self.visible.shape[0] and 0 <= iz < self.visible.shape[1]:
+            return self.visible[ix, iz]
+        return None
+
+    def visible_fraction(self):
+        """Mean fraction of chunks visible per cell"""
+        return float(self.visible.mean()) if self.visible.size else 1.0
+
+    @staticmethod
+    def cache_key(collision_world, chunk_mins, chunk_maxs, *params):
+        """Hash of the collision boxes, chunk bounds and build parameters, for on-disk caching"""
+        h = hashlib.sha1(repr(params).encode())
+        soa = collision_world.grid.soa
+        for array in (soa.min_x, soa.max_x, soa.min_z, soa.max_z, soa.min_y, soa.max_y,
+                      np.asarray(chunk_mins, dtype=float), np.asarray(chunk_maxs, dtype=float)):
+            h.update(np.ascontiguousarray(array).tobytes())
+        return h.hexdigest()
+
+    def save(self, path, key):
+        """Write the PVS to path through a temporary file, so a partial write never replaces it"""
+        tmp_path = path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, visible=self.visible, origin=np.array(self.origin),
+                         cell_size=np.array(self.cell_size), key=np.array(key))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write PVS cache {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path, key):
+        """Load a saved PVS, or None if missing or built from different inputs"""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data['key']) != key:
+                    return None
+                return cls(data['visible'], tuple(data['origin'].tolist()), float(data['cell_size']))
+        except (OSError, KeyError, ValueError):
+            return None
+
+    @classmethod
+    def load_cached(cls, path, collision_world, chunk_mins, chunk_maxs, boundary, cell_size=1.0):
+        """The cached PVS at path if it was built from these inputs, else None"""
+        return cls.load(path, cls.cache_key(collision_world, chunk_mins, chunk_maxs, boundary, cell_size))
+
+    @classmethod
+    def load_or_build(cls, path, collision_world, chunk_mins, chunk_maxs, boundary, is_valid,
+                      cell_size=1.0):
+        """The cached PVS at path if it matches the inputs, else build it and save it there"""
+        key = cls.cache_key(collision_world, chunk_mins, chunk_maxs, boundary, cell_size)
+        pvs = cls.load(path, key) if path else None
+        if pvs is None:
+            print("Building potentially visible sets...")
+            pvs = cls.build(collision_world, chunk_mins, chunk_maxs, boundary, is_valid, cell_size)
+            if path:
+                pvs.save(path, key)
+        return pvs
+
+def pvs_cache_path(map_filename):
+    return map_filename + '.pvs.cache.npz'
+
+def main(filename='backroom.obj'):
+    """Build (or load) the map's PVS cache and report the visible fraction"""
+    import time
+    import main as game
+    from mesh_renderer import build_batches
+
+    game.load_map_headless(filename)
+    _, indices, _, chunks = build_batches(game.map_model.mesh, game.MAP_CHUNK_SIZE)
+    chunk_mins = [chunk[0] for chunk in chunks]
+    chunk_maxs = [chunk[1] for chunk in chunks]
+
+    start = time.perf_counter()
+    pvs = PotentiallyVisibleSet.load_or_build(pvs_cache_path(filename), game.collision_world,
+                                              chunk_mins, chunk_maxs, game.MAP_BOUNDARY,
+                                              game.is_valid_move)
+    elapsed = time.perf_counter() - start
+
+    triangles = np.array([sum(count for _, _, count in chunk[2]) // 3 for chunk in chunks])
+    cells = pvs.visible.reshape(-1, len(chunks))
+    print(f"{filename}: {len(chunks)} chunks, {cells.shape[0]} cells of {pvs.cell_size} units "
+          f"({elapsed:.1f} s)")
+    print(f"  visible chunks per cell:    {pvs.visible_fraction() * 100:.1f}% "
+          f"(min {cells.mean(axis=1).min() * 100:.0f}%, max {cells.mean(axis=1).max() * 100:.0f}%)")
+    print(f"  visible triangles per cell: {(cells @ triangles).mean() / triangles.sum() * 100:.1f}%")
+    return pvs
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -3,10 +3,18 @@ import pygame
 from OpenGL.GL import *
 from OpenGL.GLU import *
 
+from glyph_atlas import get_atlas
+from overlay import CompiledOverlay, begin_2d, draw_rect, end_2d
+
+TITLE_SIZE = 150
+INSTRUCTIONS_SIZE = 40
+
 class WinScreen:
     def __init__(self):
         self.font = None
         self.init_font()
+        self.overlay = CompiledOverlay(self.draw_overlay,
+                                       [get_atlas(TITLE_SIZE), get_atlas(INSTRUCTIONS_SIZE)])
     
     def init_font(self):
         """Initialize font for text"""
@@ -17,215 +25,36 @@ class WinScreen:
             print(f"Error initializing font: {e}")
     
     def draw_win_screen(self):
-        """Draw YOU WON screen"""
-        # Save current OpenGL state
-        glPushAttrib(GL_ALL_ATTRIB_BITS)
-        glPushMatrix()
-        
-        # Configure for 2D rendering
-        glDisable(GL_DEPTH_TEST)
-        glDisable(GL_LIGHTING)
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        
-        # Switch to orthographic projection
-        glMatrixMode(GL_PROJECTION)
-        glPushMatrix()
-        glLoadIdentity()
-        glOrtho(0, 1200, 0, 800, -1, 1)  # Screen size
-        
-        glMatrixMode(GL_MODELVIEW)
-        glLoadIdentity()
+        """Draw YOU WON screen (a display list compiled on first use)"""
+        self.overlay.draw()
+    
+    def draw_overlay(self):
+        """GL calls of the screen, compiled once into self.overlay"""
+        begin_2d(1200, 800)  # Screen size
         
         # Semi-transparent background (golden/yellow tint for victory)
-        glColor4f(0.2, 0.2, 0.0, 0.8)
-        glBegin(GL_QUADS)
-        glVertex2f(0, 0)
-        glVertex2f(1200, 0)
-        glVertex2f(1200, 800)
-        glVertex2f(0, 800)
-        glEnd()
+        draw_rect(0, 0, 1200, 800, (0.2, 0.2, 0.0, 0.8))
         
         # Draw victory text
         self.draw_you_won_text()
         
         # Draw instructions
-        #self.draw_instructions()
+        self.draw_instructions()
         
-        # Restore projection
-        glMatrixMode(GL_PROJECTION)
-        glPopMatrix()
-        glMatrixMode(GL_MODELVIEW)
-        
-        # Restore OpenGL state
-        glPopMatrix()
-        glPopAttrib()
+        end_2d()
     
     def draw_you_won_text(self):
-        """Draw 'YOU WON' text using OpenGL primitives"""
-        glColor3f(0.0, 1.0, 0.0)  # Green color for victory
-        glLineWidth(6.0)
-        
-        # Draw "YOU WON" using lines
-        glBegin(GL_LINES)
-        
-        # Y
-        glVertex2f(350, 500)
-        glVertex2f(375, 450)
-        glVertex2f(375, 450)
-        glVertex2f(400, 500)
-        glVertex2f(375, 450)
-        glVertex2f(375, 400)
-        
-        # O
-        glVertex2f(420, 400)
-        glVertex2f(420, 500)
-        glVertex2f(420, 500)
-        glVertex2f(470, 500)
-        glVertex2f(470, 500)
-        glVertex2f(470, 400)
-        glVertex2f(470, 400)
-        glVertex2f(420, 400)
-        
-        # U
-        glVertex2f(490, 500)
-        glVertex2f(490, 420)
-        glVertex2f(490, 420)
-        glVertex2f(490, 400)
-        glVertex2f(490, 400)
-        glVertex2f(540, 400)
-        glVertex2f(540, 400)
-        glVertex2f(540, 420)
-        glVertex2f(540, 420)
-        glVertex2f(540, 500)
-        
-        glEnd()
-        
-        # "WON" on second line
-        glBegin(GL_LINES)
-        
-        # W
-        glVertex2f(450, 350)
-        glVertex2f(465, 250)
-        glVertex2f(465, 250)
-        glVertex2f(480, 300)
-        glVertex2f(480, 300)
-        glVertex2f(495, 250)
-        glVertex2f(495, 250)
-        glVertex2f(510, 350)
-        
-        # O
-        glVertex2f(530, 250)
-        glVertex2f(530, 350)
-        glVertex2f(530, 350)
-        glVertex2f(580, 350)
-        glVertex2f(580, 350)
-        glVertex2f(580, 250)
-        glVertex2f(580, 250)
-        glVertex2f(530, 250)
-        
-        # N
-        glVertex2f(600, 250)
-        glVertex2f(600, 350)
-        glVertex2f(600, 350)
-        glVertex2f(650, 250)
-        glVertex2f(650, 250)
-        glVertex2f(650, 350)
-        
-        glEnd()
-        
-        glLineWidth(1.0)
+        """Draw 'YOU WON' with the glyph atlas (one draw call per string)"""
+        get_atlas(TITLE_SIZE).draw("YOU WON", 600, 360, (0.0, 1.0, 0.0), align='center')
     
-    # def draw_instructions(self):
-    #     """Draw instruction text"""
-    #     glColor3f(1.0, 1.0, 1.0)  # White
-    #     glLineWidth(2.0)
-        
-    #     # Draw "Press R to play again" (simplified)
-    #     glBegin(GL_LINES)
-        
-        # # P
-        # glVertex2f(400, 180)
-        # glVertex2f(400, 120)
-        # glVertex2f(400, 180)
-        # glVertex2f(430, 180)
-        # glVertex2f(430, 180)
-        # glVertex2f(430, 150)
-        # glVertex2f(430, 150)
-        # glVertex2f(400, 150)
-        
-        # # R
-        # glVertex2f(440, 120)
-        # glVertex2f(440, 180)
-        # glVertex2f(440, 180)
-        # glVertex2f(470, 180)
-        # glVertex2f(470, 180)
-        # glVertex2f(470, 150)
-        # glVertex2f(470, 150)
-        # glVertex2f(440, 150)
-        # glVertex2f(440, 150)
-        # glVertex2f(470, 120)
-        
-        # # E
-        # glVertex2f(480, 120)
-        # glVertex2f(480, 180)
-        # glVertex2f(480, 180)
-        # glVertex2f(510, 180)
-        # glVertex2f(480, 150)
-        # glVertex2f(505, 150)
-        # glVertex2f(480, 120)
-        # glVertex2f(510, 120)
-        
-        # # S (twice for "SS")
-        # for offset in [20, 40]:
-        #     x_off = 510 + offset
-        #     glVertex2f(x_off, 180)
-        #     glVertex2f(x_off + 20, 180)
-        #     glVertex2f(x_off, 180)
-        #     glVertex2f(x_off, 150)
-        #     glVertex2f(x_off, 150)
-        #     glVertex2f(x_off + 20, 150)
-        #     glVertex2f(x_off + 20, 150)
-        #     glVertex2f(x_off + 20, 120)
-        #     glVertex2f(x_off + 20, 120)
-        #     glVertex2f(x_off, 120)
-        
-        # glEnd()
-        
-        # # "R to play again" on next line
-        # glBegin(GL_LINES)
-        
-        # # R
-        # glVertex2f(450, 80)
-        # glVertex2f(450, 40)
-        # glVertex2f(450, 80)
-        # glVertex2f(480, 80)
-        # glVertex2f(480, 80)
-        # glVertex2f(480, 60)
-        # glVertex2f(480, 60)
-        # glVertex2f(450, 60)
-        # glVertex2f(450, 60)
-        # glVertex2f(480, 40)
-        
-        # # T
-        # glVertex2f(490, 80)
-        # glVertex2f(520, 80)
-        # glVertex2f(505, 80)
-        # glVertex2f(505, 40)
-        
-        # # O
-        # glVertex2f(530, 40)
-        # glVertex2f(530, 80)
-        # glVertex2f(530, 80)
-        # glVertex2f(560, 80)
-        # glVertex2f(560, 80)
-        # glVertex2f(560, 40)
-        # glVertex2f(560, 40)
-        # glVertex2f(530, 40)
-        
-        # glEnd()
-        
-        glLineWidth(1.0)
+    def draw_instructions(self):
+        """Draw instruction text"""
+        get_atlas(INSTRUCTIONS_SIZE).draw("Press R to play again or ESC to exit", 600, 200,
+                                          (1.0, 1.0, 1.0), align='center')
+    
+    def free(self):
+        """Delete the display list"""
+        self.overlay.free()
     
     def handle_win_input(self):
         """Handle input during win screen"""